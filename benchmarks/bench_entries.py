@@ -0,0 +1,106 @@
+"""
+Benchmark splitting pages into entries on the biggest pages of a dump (like
+"a" or "die", which have dozens of language sections). Compares the linear
+splitter with the regular expression that was used before.
+
+Usage:
+    poetry run python benchmarks/bench_entries.py [dump file] [pages]
+
+Without a dump file, large synthetic pages are used.
+"""
+
+import heapq
+import re
+import sys
+import timeit
+
+from wiktionary_de_parser import WiktionaryParser
+from wiktionary_de_parser.dump_processor import WiktionaryDump
+from wiktionary_de_parser.records import WiktionaryPage
+
+ENTRY_PATTERN = re.compile(
+    r"(=== {{Wortart(?:[\w\W](?!^===? ))+)", re.MULTILINE
+)
+
+LANGUAGE_SECTION = """== a ({{{{Sprache|Sprache {index}}}}}) ==
+=== {{{{Wortart|Buchstabe|Sprache {index}}}}} ===
+
+{{{{Worttrennung}}}}
+:a
+
+{{{{Aussprache}}}}
+:{{{{IPA}}}} {{{{Lautschrift|aː}}}}
+
+{{{{Bedeutungen}}}}
+:[1] erster Buchstabe des Alphabets
+:[2] Tonbezeichnung
+
+==== {{{{Übersetzungen}}}} ====
+{{{{Ü-Tabelle|Ü-links=
+*{{{{en}}}}: [1] {{{{Ü|en|a}}}}
+|Ü-rechts=
+*{{{{fr}}}}: [1] {{{{Ü|fr|a}}}}
+}}}}
+
+"""
+
+
+def synthetic_pages(count: int) -> list[WiktionaryPage]:
+    return [
+        WiktionaryPage(
+            page_id=page_id,
+            name=f"a{page_id}",
+            wikitext="".join(
+                LANGUAGE_SECTION.format(index=index)
+                for index in range(40 + page_id)
+            ),
+        )
+        for page_id in range(count)
+    ]
+
+
+def biggest_pages(dump_file_path: str, count: int) -> list[WiktionaryPage]:
+    dump = WiktionaryDump(dump_file_path=dump_file_path)
+    pages = (page for page in dump.pages() if page.wikitext)
+
+    return heapq.nlargest(count, pages, key=lambda page: len(page.wikitext))
+
+
+def split_regex(pages: list[WiktionaryPage]):
+    for page in pages:
+        ENTRY_PATTERN.findall(page.wikitext)
+
+
+def split_linear(parser: WiktionaryParser, pages: list[WiktionaryPage]):
+    for page in pages:
+        for _ in parser.entries_from_page(page):
+            pass
+
+
+if __name__ == "__main__":
+    dump_file_path = sys.argv[1] if len(sys.argv) > 1 else None
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    if dump_file_path:
+        pages = biggest_pages(dump_file_path, count)
+    else:
+        pages = synthetic_pages(count)
+
+    parser = WiktionaryParser()
+    size = sum(len(page.wikitext) for page in pages)
+    entries = sum(1 for page in pages for _ in parser.entries_from_page(page))
+    print(
+        f"{len(pages)} pages, {size / 1e6:.1f} M characters, {entries} entries"
+    )
+    print("Biggest: " + ", ".join(page.name for page in pages[:5]) + "\n")
+
+    baseline = min(
+        timeit.repeat(lambda: split_regex(pages), number=1, repeat=3)
+    )
+    seconds = min(
+        timeit.repeat(lambda: split_linear(parser, pages), number=1, repeat=3)
+    )
+    print(f"{'regex':<8} {baseline * 1000:8.1f} ms")
+    print(
+        f"{'linear':<8} {seconds * 1000:8.1f} ms  ({baseline / seconds:.0f}x)"
+    )
@@ -0,0 +1,97 @@
+"""
+Benchmark a German-only export: parsing every entry and filtering the
+results afterwards compared with filtering with "where", which runs the
+cheap language parser first and skips the other parsers for other languages.
+
+Usage:
+    poetry run python benchmarks/bench_filter.py [dump file] [pages]
+
+Without a dump file, synthetic pages (half of the entries German) are used.
+"""
+
+import itertools
+import sys
+import timeit
+
+from wiktionary_de_parser import WiktionaryParser
+from wiktionary_de_parser.dump_processor import WiktionaryDump
+from wiktionary_de_parser.records import WiktionaryPage
+
+LANGUAGE_SECTION = """== Rock ({{{{Sprache|{language}}}}}) ==
+=== {{{{Wortart|Substantiv|{language}}}}}, {{{{m}}}} ===
+
+{{{{Worttrennung}}}}
+:Rock, {{{{Pl.}}}} Rö·cke
+
+{{{{Aussprache}}}}
+:{{{{IPA}}}} {{{{Lautschrift|ʁɔk}}}}, {{{{Lautschrift|rɔk}}}}
+:{{{{Hörbeispiele}}}} {{{{Audio|De-Rock.ogg}}}}
+:{{{{Reime}}}} {{{{Reim|ɔk|Deutsch}}}}
+
+{{{{Bedeutungen}}}}
+:[1] {{{{K|Kleidung}}}} Kleidungsstück, das von der Hüfte abwärts reicht
+:[2] {{{{kPl.}}}} [[Rockmusik]]
+
+"""
+
+
+def synthetic_pages(count: int) -> list[WiktionaryPage]:
+    return [
+        WiktionaryPage(
+            page_id=page_id,
+            name="Rock",
+            wikitext=LANGUAGE_SECTION.format(language="Deutsch")
+            + LANGUAGE_SECTION.format(language="Englisch"),
+        )
+        for page_id in range(count)
+    ]
+
+
+def dump_pages(dump_file_path: str, count: int) -> list[WiktionaryPage]:
+    dump = WiktionaryDump(dump_file_path=dump_file_path)
+    pages = (page for page in dump.pages() if page.wikitext)
+
+    return list(itertools.islice(pages, count))
+
+
+def german(language) -> bool:
+    return language.lang_code == "de"
+
+
+def export_filter_after(parser: WiktionaryParser, pages: list[WiktionaryPage]):
+    return [
+        result
+        for page in pages
+        for entry in parser.entries_from_page(page)
+        if german((result := parser.parse_entry(entry)).language)
+    ]
+
+
+def export_where(parser: WiktionaryParser, pages: list[WiktionaryPage]):
+    return [
+        result
+        for page in pages
+        for entry in parser.entries_from_page(page)
+        if (result := parser.parse_entry(entry, where={"language": german}))
+    ]
+
+
+if __name__ == "__main__":
+    dump_file_path = sys.argv[1] if len(sys.argv) > 1 else None
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    if dump_file_path:
+        pages = dump_pages(dump_file_path, count)
+    else:
+        pages = synthetic_pages(count)
+
+    parser = WiktionaryParser(validate=False)
+    assert export_filter_after(parser, pages) == export_where(parser, pages)
+
+    baseline = timeit.timeit(
+        lambda: export_filter_after(parser, pages), number=1
+    )
+    seconds = timeit.timeit(lambda: export_where(parser, pages), number=1)
+    print(f"{len(pages)} pages")
+    print(f"{'parse, then filter':<20} {baseline:8.2f} s")
+    print(f"{'where':<20} {seconds:8.2f} s  ({baseline / seconds:.1f}x)")
@@ -0,0 +1,195 @@
+"""
+Benchmark the creation (and pickling) of the page and entry records and of
+the parse results. Compares the dataclass records with pydantic models, which
+were used before, and validated with trusted (unvalidated) results.
+
+Usage:
+    poetry run python benchmarks/bench_models.py [number of pages]
+"""
+
+import io
+import pickle
+import sys
+import timeit
+from xml.sax.saxutils import escape
+
+from pydantic import BaseModel
+
+from wiktionary_de_parser import WiktionaryParser
+from wiktionary_de_parser.dump_processor import (
+    MEDIAWIKI_NAMESPACE,
+    WiktionaryDump,
+)
+from wiktionary_de_parser.models import (
+    Language,
+    Lemma,
+    ParsedWiktionaryPageEntry,
+    WiktionaryPage,
+    WiktionaryPageEntry,
+    construct_trusted,
+    validate_page,
+)
+
+WIKITEXT = """== Abend ({{Sprache|Deutsch}}) ==
+=== {{Wortart|Substantiv|Deutsch}}, {{m}} ===
+
+{{Worttrennung}}
+:Abend, {{Pl.}} Aben·de
+
+=== {{Wortart|Substantiv|Deutsch}}, {{m}}, {{Wortart|Nachname|Deutsch}} ===
+
+{{Worttrennung}}
+:Abend, {{Pl.}} Abends
+"""
+
+
+class PydanticPage(BaseModel):
+    page_id: int
+    name: str
+    wikitext: str | None
+    redirect_to: str | None = None
+
+
+class PydanticPageEntry(BaseModel):
+    page: PydanticPage
+    index: int
+    wikitext: str
+
+
+def dump_xml(count: int) -> bytes:
+    pages = "".join(
+        f"""<page><title>Seite {page_id}</title><ns>0</ns><id>{page_id}</id>
+<revision><model>wikitext</model><text>{escape(WIKITEXT)}</text></revision>
+</page>"""
+        for page_id in range(count)
+    )
+
+    return (
+        f'<mediawiki xmlns="{MEDIAWIKI_NAMESPACE}">{pages}</mediawiki>'
+    ).encode()
+
+
+def report(name: str, seconds: float, count: int, baseline: float | None):
+    line = f"{name:<36} {seconds / count * 1e6:8.2f} µs/page"
+    if baseline:
+        line += f"  ({baseline / seconds:.1f}x)"
+    print(line)
+
+
+def bench_records(count: int):
+    page_data = {
+        "page_id": 1,
+        "name": "Abend",
+        "wikitext": WIKITEXT,
+        "redirect_to": None,
+    }
+    page = WiktionaryPage(**page_data)
+    pydantic_page = PydanticPage(**page_data)
+
+    baseline = timeit.timeit(lambda: PydanticPage(**page_data), number=count)
+    report("pydantic page", baseline, count, None)
+    seconds = timeit.timeit(lambda: validate_page(page_data), number=count)
+    report("validate_page(...)", seconds, count, baseline)
+    seconds = timeit.timeit(lambda: WiktionaryPage(**page_data), number=count)
+    report("WiktionaryPage(...)", seconds, count, baseline)
+
+    baseline = timeit.timeit(
+        lambda: PydanticPageEntry(
+            page=pydantic_page, index=0, wikitext=WIKITEXT
+        ),
+        number=count,
+    )
+    report("pydantic entry", baseline, count, None)
+    seconds = timeit.timeit(
+        lambda: WiktionaryPageEntry(page=page, index=0, wikitext=WIKITEXT),
+        number=count,
+    )
+    report("WiktionaryPageEntry(...)", seconds, count, baseline)
+
+    # Pages are pickled when they are sent between processes
+    pydantic_pages = [
+        PydanticPage(**{**page_data, "page_id": i}) for i in range(count)
+    ]
+    pages = [
+        WiktionaryPage(**{**page_data, "page_id": i}) for i in range(count)
+    ]
+
+    baseline = timeit.timeit(
+        lambda: pickle.loads(pickle.dumps(pydantic_pages)), number=1
+    )
+    report("pickle pydantic pages", baseline, count, None)
+    seconds = timeit.timeit(lambda: pickle.loads(pickle.dumps(pages)), number=1)
+    report("pickle WiktionaryPage", seconds, count, baseline)
+
+
+def bench_results(count: int):
+    meanings = [
+        {
+            "text": "Tageszeit, zu der die Sonne untergeht",
+            "tags": ["Plural"],
+            "sublist": [{"text": "Vorabend", "raw_tags": ["übertragen"]}],
+        }
+        for _ in range(3)
+    ]
+    results = {
+        "name": "Abend",
+        "hyphenation": ["Abend"],
+        "flexion": {"Genus": "m", "Nominativ Singular": "Abend"},
+        "ipa": ["ˈaːbn̩t", "ˈaːbm̩t"],
+        "language": Language(lang="Deutsch", lang_code="de"),
+        "lemma": Lemma(lemma="Abend"),
+        "pos": {"Substantiv": []},
+        "rhymes": ["aːbn̩t"],
+    }
+
+    for name, values in (
+        ("", results),
+        (" + meanings", {**results, "meanings": meanings}),
+    ):
+        baseline = timeit.timeit(
+            lambda values=values: ParsedWiktionaryPageEntry(**values),
+            number=count,
+        )
+        report(f"validated result{name}", baseline, count, None)
+        seconds = timeit.timeit(
+            lambda values=values: construct_trusted(
+                ParsedWiktionaryPageEntry, dict(values)
+            ),
+            number=count,
+        )
+        report(f"trusted result{name}", seconds, count, baseline)
+
+
+def bench_dump(count: int):
+    # Reading pages and splitting them into entries
+    xml = dump_xml(count)
+    parser = WiktionaryParser()
+    results: dict[bool, float] = {}
+
+    for validate in (True, False):
+        dump = WiktionaryDump(dump_file_path="unused", validate=validate)
+
+        def read(dump=dump):
+            for page in dump.iter_pages(io.BytesIO(xml)):
+                for _ in parser.entries_from_page(page):
+                    pass
+
+        results[validate] = timeit.timeit(read, number=1)
+
+    report("pages + entries (validate=True)", results[True], count, None)
+    report(
+        "pages + entries (validate=False)",
+        results[False],
+        count,
+        results[True],
+    )
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{count} pages\n")
+    bench_records(count)
+    print()
+    bench_results(count)
+    print()
+    bench_dump(count)
@@ -0,0 +1,93 @@
+"""
+Benchmark parsing pages in parallel with fixed chunks of pages compared with
+adaptive, size-aware tasks, pages sent through shared memory compared with
+pickled pages, and processes compared with threads (which only scale on
+free-threaded Python builds). Prints the load balance report of every run.
+
+Usage:
+    poetry run python benchmarks/bench_parallel.py [dump file] [pages] [workers]
+
+Without a dump file, synthetic pages are used: most are small, a few are
+huge (like "a" or "die").
+"""
+
+import itertools
+import random
+import sys
+import time
+
+from wiktionary_de_parser import WiktionaryParser
+from wiktionary_de_parser.dump_processor import WiktionaryDump
+from wiktionary_de_parser.parallel import LoadBalanceReport
+from wiktionary_de_parser.records import WiktionaryPage
+
+LANGUAGE_SECTION = """== Rock ({{{{Sprache|Sprache {index}}}}}) ==
+=== {{{{Wortart|Substantiv|Sprache {index}}}}}, {{{{m}}}} ===
+
+{{{{Worttrennung}}}}
+:Rock, {{{{Pl.}}}} Rö·cke
+
+{{{{Aussprache}}}}
+:{{{{IPA}}}} {{{{Lautschrift|ʁɔk}}}}
+:{{{{Reime}}}} {{{{Reim|ɔk|Deutsch}}}}
+
+{{{{Bedeutungen}}}}
+:[1] Kleidungsstück, das von der Hüfte abwärts reicht
+
+"""
+
+
+def synthetic_pages(count: int) -> list[WiktionaryPage]:
+    rnd = random.Random(0)
+
+    return [
+        WiktionaryPage(
+            page_id=page_id,
+            name=f"Rock {page_id}",
+            wikitext="".join(
+                LANGUAGE_SECTION.format(index=index)
+                for index in range(200 if rnd.random() < 0.005 else 1)
+            ),
+        )
+        for page_id in range(count)
+    ]
+
+
+def dump_pages(dump_file_path: str, count: int) -> list[WiktionaryPage]:
+    dump = WiktionaryDump(dump_file_path=dump_file_path)
+    pages = (page for page in dump.pages() if not page.redirect_to)
+
+    return list(itertools.islice(pages, count))
+
+
+def run(pages: list[WiktionaryPage], workers: int, **kwargs):
+    parser = WiktionaryParser(validate=False)
+    report = LoadBalanceReport()
+    start = time.perf_counter()
+
+    for _ in parser.parse_pages(
+        pages, workers=workers, ordered=False, report=report, **kwargs
+    ):
+        pass
+
+    seconds = time.perf_counter() - start
+    print(f"{kwargs or 'adaptive'}: {seconds:.2f} s")
+    print(report)
+    print()
+
+
+if __name__ == "__main__":
+    dump_file_path = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] else None
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    if dump_file_path:
+        pages = dump_pages(dump_file_path, count)
+    else:
+        pages = synthetic_pages(count)
+
+    run(pages, workers, chunk_size=count // workers // 2)
+    run(pages, workers, chunk_size=100)
+    run(pages, workers)
+    run(pages, workers, shared_memory_size=0)
+    run(pages, workers, executor="thread")
@@ -0,0 +1,81 @@
+"""
+Benchmark reading a dump and parsing its entries on one thread compared with
+reading the dump in a background thread ("prefetch" of WiktionaryDump.pages).
+
+Usage:
+    poetry run python benchmarks/bench_prefetch.py [dump file] [pages]
+
+Without a dump file, a synthetic dump is created in a temporary directory.
+"""
+
+import bz2
+import itertools
+import sys
+import tempfile
+import time
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from wiktionary_de_parser import WiktionaryParser
+from wiktionary_de_parser.dump_processor import (
+    MEDIAWIKI_NAMESPACE,
+    WiktionaryDump,
+)
+
+WIKITEXT = """== Abend ({{Sprache|Deutsch}}) ==
+=== {{Wortart|Substantiv|Deutsch}}, {{m}} ===
+
+{{Worttrennung}}
+:Abend, {{Pl.}} Aben·de
+
+{{Aussprache}}
+:{{IPA}} {{Lautschrift|ˈaːbn̩t}}
+:{{Reime}} {{Reim|aːbn̩t|Deutsch}}
+"""
+
+
+def write_dump(path: Path, count: int):
+    pages = "".join(
+        f"""<page><title>Seite {page_id}</title><ns>0</ns><id>{page_id}</id>
+<revision><model>wikitext</model><text>{escape(WIKITEXT)}</text></revision>
+</page>"""
+        for page_id in range(count)
+    )
+    xml = f'<mediawiki xmlns="{MEDIAWIKI_NAMESPACE}">{pages}</mediawiki>'
+    path.write_bytes(bz2.compress(xml.encode()))
+
+
+def run(dump: WiktionaryDump, count: int, prefetch: int) -> float:
+    parser = WiktionaryParser(validate=False)
+    start = time.perf_counter()
+    pages = dump.pages(decompressor="bz2", prefetch=prefetch)
+
+    for page in itertools.islice(pages, count):
+        for entry in parser.entries_from_page(page):
+            parser.parse_entry(entry)
+
+    pages.close()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        if len(sys.argv) > 1 and sys.argv[1]:
+            dump_file_path = Path(sys.argv[1])
+        else:
+            dump_file_path = Path(directory) / "dump.xml.bz2"
+            write_dump(dump_file_path, count)
+
+        dump = WiktionaryDump(dump_file_path=dump_file_path)
+        baseline = run(dump, count, prefetch=0)
+        print(f"{count} pages")
+        print(f"{'no prefetch':<16} {baseline:8.2f} s")
+
+        for prefetch in (100, 1000):
+            seconds = run(dump, count, prefetch=prefetch)
+            print(
+                f"{f'prefetch={prefetch}':<16} {seconds:8.2f} s  "
+                f"({baseline / seconds:.2f}x)"
+            )
@@ -0,0 +1,97 @@
+"""
+Benchmark the startup time: cold imports of the package and its modules, the
+creation of the first WiktionaryParser and the first parsed entry. Every
+measurement runs in a new interpreter, so nothing is imported yet.
+
+Usage:
+    poetry run python benchmarks/bench_startup.py [number of runs]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = (
+    "pydantic",
+    "mwparserfromhell",
+    "wikitextparser",
+    "lxml",
+    "requests",
+    "tqdm",
+)
+
+WIKITEXT = """== Abend ({{Sprache|Deutsch}}) ==
+=== {{Wortart|Substantiv|Deutsch}}, {{m}} ===
+
+{{Worttrennung}}
+:Abend, {{Pl.}} Aben·de
+
+{{Aussprache}}
+:{{IPA}} {{Lautschrift|ˈaːbn̩t}}
+:{{Reime}} {{Reim|aːbn̩t|Deutsch}}
+
+{{Bedeutungen}}
+:[1] Tageszeit, zu der die Sonne untergeht
+"""
+
+SETUP = f"""
+from wiktionary_de_parser.records import WiktionaryPage, WiktionaryPageEntry
+page = WiktionaryPage(page_id=1, name="Abend", wikitext={WIKITEXT!r})
+entry = WiktionaryPageEntry(page=page, index=0, wikitext=page.wikitext)
+"""
+
+SCENARIOS = {
+    "import wiktionary_de_parser": ("import wiktionary_de_parser", ""),
+    "import parser.parse_flexion": (
+        "import wiktionary_de_parser.parser.parse_flexion",
+        "",
+    ),
+    "import dump_processor": ("import wiktionary_de_parser.dump_processor", ""),
+    "first WiktionaryParser()": (
+        "from wiktionary_de_parser import WiktionaryParser\n"
+        "parser = WiktionaryParser()",
+        "",
+    ),
+    "first parse_entry": (
+        "from wiktionary_de_parser import WiktionaryParser\n"
+        "WiktionaryParser().parse_entry(entry, include_meanings=True)",
+        SETUP,
+    ),
+}
+
+SCRIPT = """
+import json, sys, time
+{setup}
+before = set(sys.modules)
+start = time.perf_counter()
+{code}
+seconds = time.perf_counter() - start
+loaded = sorted(
+    name for name in {heavy!r} if name in sys.modules and name not in before
+)
+print(json.dumps({{"seconds": seconds, "loaded": loaded}}))
+"""
+
+
+def measure(code: str, setup: str) -> dict:
+    script = SCRIPT.format(code=code, setup=setup, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+
+    return json.loads(output)
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(f"{runs} runs (median)\n")
+
+    for name, (code, setup) in SCENARIOS.items():
+        results = [measure(code, setup) for _ in range(runs)]
+        seconds = statistics.median(result["seconds"] for result in results)
+        loaded = ", ".join(results[0]["loaded"]) or "-"
+        print(f"{name:<30} {seconds * 1000:8.1f} ms  loads: {loaded}")
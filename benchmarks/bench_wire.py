@@ -0,0 +1,125 @@
+"""
+Benchmark sending parse results from a worker process to the parent:
+pickled models compared with the compact format of wire.py. Prints the time
+spent in the workers (encoding and pickling) and in the parent (unpickling
+and decoding) per result, and the size of the pickled results. With
+"decode=False", "parse_pages" yields EncodedResult and decodes nothing.
+
+Usage:
+    poetry run python benchmarks/bench_wire.py [dump file] [pages]
+
+Without a dump file, the pages of the test dump are used (repeated).
+"""
+
+import itertools
+import pickle
+import sys
+import time
+from test.test_data.dump_data import dump_pages as test_dump_pages
+
+from wiktionary_de_parser import WiktionaryParser
+from wiktionary_de_parser.dump_processor import WiktionaryDump
+from wiktionary_de_parser.records import WiktionaryPage
+from wiktionary_de_parser.wire import ResultDecoder, ResultEncoder
+
+# Results per task
+TASK_SIZE = 100
+
+
+def sample_pages(count: int) -> list[WiktionaryPage]:
+    pages = [
+        WiktionaryPage(page_id=page_id, name=title, wikitext=text)
+        for page_id, title, _, model, text, redirect_to in test_dump_pages
+        if model == "wikitext" and not redirect_to
+    ]
+
+    return list(itertools.islice(itertools.cycle(pages), count))
+
+
+def dump_pages(dump_file_path: str, count: int) -> list[WiktionaryPage]:
+    dump = WiktionaryDump(dump_file_path=dump_file_path)
+    pages = (page for page in dump.pages() if page.wikitext)
+
+    return list(itertools.islice(pages, count))
+
+
+def pickle_models(tasks: list[list]) -> list[bytes]:
+    return [pickle.dumps(task, pickle.HIGHEST_PROTOCOL) for task in tasks]
+
+
+def unpickle_models(data: list[bytes]):
+    for task in data:
+        pickle.loads(task)
+
+
+def pickle_compact(tasks: list[list]) -> list[bytes]:
+    encoder = ResultEncoder()
+
+    return [
+        pickle.dumps(encoder.encode_all(task), pickle.HIGHEST_PROTOCOL)
+        for task in tasks
+    ]
+
+
+def unpickle_compact(data: list[bytes]):
+    decoder = ResultDecoder()
+
+    for task in data:
+        decoder.wrap_all(pickle.loads(task))
+
+
+def unpickle_compact_decode(data: list[bytes]):
+    decoder = ResultDecoder()
+
+    for task in data:
+        for _ in decoder.decode_all(pickle.loads(task)):
+            pass
+
+
+def per_result(function, argument, count: int) -> float:
+    start = time.perf_counter()
+    function(argument)
+
+    return (time.perf_counter() - start) / count * 1e6
+
+
+if __name__ == "__main__":
+    dump_file_path = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] else None
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    if dump_file_path:
+        pages = dump_pages(dump_file_path, count)
+    else:
+        pages = sample_pages(count)
+
+    parser = WiktionaryParser()
+    results = [
+        parser.parse_entry(entry, include_meanings=True)
+        for page in pages
+        for entry in parser.entries_from_page(page)
+    ]
+    print(f"{len(results)} results, microseconds per result")
+    print(f"{'':<24} {'worker':>8} {'parent':>8} {'MB':>8}")
+    tasks = [
+        results[index : index + TASK_SIZE]
+        for index in range(0, len(results), TASK_SIZE)
+    ]
+    pickled_models = pickle_models(tasks)
+    pickled_compact = pickle_compact(tasks)
+
+    for name, pickle_tasks, unpickle, data in [
+        ("pickled models", pickle_models, unpickle_models, pickled_models),
+        ("compact", pickle_compact, unpickle_compact, pickled_compact),
+        (
+            "compact, decoded",
+            pickle_compact,
+            unpickle_compact_decode,
+            pickled_compact,
+        ),
+    ]:
+        print(
+            f"{name:<24} "
+            f"{per_result(pickle_tasks, tasks, len(results)):>8.1f} "
+            f"{per_result(unpickle, data, len(results)):>8.1f} "
+            f"{sum(map(len, data)) / 1e6:>8.2f}"
+        )
@@ -0,0 +1,12 @@
+from test.test_data.dump_data import build_multistream_dump
+
+import pytest
+
+from wiktionary_de_parser.dump_processor import WiktionaryDump
+
+
+@pytest.fixture
+def multistream_dump(tmp_path):
+    dump_path, _ = build_multistream_dump(tmp_path)
+
+    return WiktionaryDump(dump_file_path=dump_path)
@@ -0,0 +1,132 @@
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves files from "server.directory" and supports HTTP range requests.
+    If "server.drop_after" is set, the connection of the next request (the
+    next "server.drop_count" requests) is closed after that many bytes of the
+    body were sent. "server.chunk_delay"
+    slows down the body (seconds per 4 KiB), and requests with the range
+    "server.fail_range" get an error after 10 times that delay.
+    """
+
+    server: "LocalFileServer"
+
+    def do_HEAD(self):
+        self.send_file(body=False)
+
+    def do_GET(self):
+        self.send_file(body=True)
+
+    def send_file(self, body: bool):
+        self.server.requests.append((self.command, self.headers.get("Range")))
+        path = self.server.directory / self.path.lstrip("/")
+
+        if not path.is_file():
+            self.send_error(404)
+            return
+
+        data = path.read_bytes()
+        start, end = 0, len(data) - 1
+        range_header = self.headers.get("Range")
+
+        if range_header and range_header == self.server.fail_range:
+            time.sleep(10 * self.server.chunk_delay)
+            self.send_error(500)
+            return
+
+        if range_header and self.server.support_ranges:
+            match = re.fullmatch(r"bytes=(\d+)-(\d*)", range_header)
+            assert match
+            start = int(match[1])
+            end = int(match[2]) if match[2] else len(data) - 1
+
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            end = min(end, len(data) - 1)
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{end}/{len(data)}"
+            )
+        else:
+            self.send_response(200)
+
+        content = data[start : end + 1]
+        self.send_header("Content-Length", str(len(content)))
+        if self.server.support_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+        if not body:
+            return
+
+        with self.server.lock:
+            drop_after = self.server.drop_after
+            self.server.drop_count -= 1
+            if self.server.drop_count <= 0:
+                self.server.drop_after = None
+                self.server.drop_count = 1
+
+        if drop_after is not None:
+            self.wfile.write(content[:drop_after])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        if self.server.chunk_delay:
+            for i in range(0, len(content), 4096):
+                self.wfile.write(content[i : i + 4096])
+                self.wfile.flush()
+                time.sleep(self.server.chunk_delay)
+            return
+
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalFileServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, directory):
+        super().__init__(("127.0.0.1", 0), RangeRequestHandler)
+        self.directory = directory
+        self.drop_after: int | None = None
+        self.drop_count = 1
+        self.support_ranges = True
+        self.fail_range: str | None = None
+        self.chunk_delay = 0.0
+        self.requests: list[tuple[str, str | None]] = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+@pytest.fixture
+def http_server(tmp_path):
+    directory = tmp_path / "server"
+    directory.mkdir()
+    server = LocalFileServer(directory)
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
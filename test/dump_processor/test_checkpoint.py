@@ -0,0 +1,181 @@
+import json
+from test.test_data.dump_data import build_multistream_dump, dump_pages
+
+import pytest
+
+from wiktionary_de_parser.dump_processor import WiktionaryDump
+from wiktionary_de_parser.dump_processor.checkpoint import (
+    Checkpoint,
+    CheckpointWriter,
+)
+
+NAMES = ["Abend", "Haus", "Abends", "Zeit: Raum", "house"]
+
+
+def take(pages, count: int) -> list[str]:
+    """
+    Process "count" pages and stop (the caller asks for one more page, like
+    a loop that is killed while it waits for the next page).
+    """
+    names = [next(pages).name for _ in range(count)]
+    next(pages, None)
+    pages.close()
+
+    return names
+
+
+class TestCheckpoint:
+    def test_save_and_load(self, tmp_path):
+        path = tmp_path / "checkpoint.json"
+        checkpoint = Checkpoint(offset=123, page_id=4, state={"size": 10})
+
+        assert Checkpoint.load(path) is None
+        checkpoint.save(path)
+
+        assert Checkpoint.load(path) == checkpoint
+        assert json.loads(path.read_text())["offset"] == 123
+        assert [p.name for p in tmp_path.iterdir()] == ["checkpoint.json"]
+
+    def test_writer(self, multistream_dump, tmp_path):
+        path = tmp_path / "checkpoint.json"
+        offsets = multistream_dump.page_offsets()
+
+        def writer():
+            return CheckpointWriter(multistream_dump, path, every=2)
+
+        assert take(multistream_dump.pages(checkpoint=writer()), 1) == ["Abend"]
+        assert Checkpoint.load(path) is None
+
+        take(multistream_dump.pages(checkpoint=writer()), 2)
+        # Saved every 2 pages, at the page that was processed last
+        assert Checkpoint.load(path) == Checkpoint(offsets[3], 3)
+
+        list(multistream_dump.pages(checkpoint=writer()))
+        assert Checkpoint.load(path) == Checkpoint(offsets[7], 7)
+
+    def test_missing_index(self, multistream_dump, tmp_path):
+        multistream_dump.index_file_path.unlink()
+
+        # Before any page is read
+        with pytest.raises(FileNotFoundError, match="multistream index"):
+            CheckpointWriter(multistream_dump, tmp_path / "checkpoint.json")
+
+    def test_index_of_other_dump(self, multistream_dump, tmp_path):
+        other = tmp_path / "other"
+        other.mkdir()
+        # The index of the first stream only
+        _, index_path = build_multistream_dump(other, dump_pages[:2])
+        dump = WiktionaryDump(
+            dump_file_path=multistream_dump.dump_file_path,
+            index_file_path=index_path,
+        )
+        pages = dump.pages(checkpoint=CheckpointWriter(dump, tmp_path / "c"))
+
+        assert [next(pages).name for _ in range(2)] == ["Abend", "Haus"]
+        # When "Haus" is done
+        with pytest.raises(ValueError, match="Page 3 is not in the index"):
+            next(pages)
+
+    def test_offsets_beyond_dump(self, multistream_dump, tmp_path):
+        data = multistream_dump.dump_file_path.read_bytes()
+        multistream_dump.dump_file_path.write_bytes(data[:100])
+
+        with pytest.raises(ValueError, match="doesn't belong to the dump"):
+            CheckpointWriter(multistream_dump, tmp_path / "checkpoint.json")
+
+
+class TestResume:
+    @pytest.mark.parametrize("count", range(1, 6))
+    @pytest.mark.parametrize("prefetch", [0, 2])
+    def test_pages(self, multistream_dump, tmp_path, count, prefetch):
+        path = tmp_path / "checkpoint.json"
+        writer = CheckpointWriter(multistream_dump, path, every=1)
+        pages = multistream_dump.pages(
+            decompressor="bz2", prefetch=prefetch, checkpoint=writer
+        )
+        names = take(pages, count)
+
+        resumed = multistream_dump.pages(decompressor="bz2", resume_from=path)
+
+        assert names + [page.name for page in resumed] == NAMES
+
+    def test_first_run(self, multistream_dump, tmp_path):
+        # Without a checkpoint file, the run starts at the beginning
+        pages = multistream_dump.pages(resume_from=tmp_path / "missing.json")
+
+        assert [page.name for page in pages] == NAMES
+
+    def test_exactly_once(self, multistream_dump, tmp_path):
+        path = tmp_path / "checkpoint.json"
+        output: list[str] = []
+        writer = CheckpointWriter(
+            multistream_dump, path, every=2, state=lambda: len(output)
+        )
+
+        for page in multistream_dump.pages(checkpoint=writer):
+            if page.name == "Zeit: Raum":
+                # Killed after the checkpoint at "Haus", "Abends" would be
+                # output twice without truncating the output
+                break
+            output.append(page.name)
+
+        checkpoint = Checkpoint.load(path)
+        assert checkpoint.page_id == 3
+        del output[checkpoint.state :]
+
+        for page in multistream_dump.pages(resume_from=checkpoint):
+            output.append(page.name)
+
+        assert output == NAMES
+
+    def test_killed_before_first_save(self, multistream_dump, tmp_path):
+        path = tmp_path / "checkpoint.json"
+        output: list[str] = []
+        writer = CheckpointWriter(
+            multistream_dump, path, every=10, state=lambda: len(output)
+        )
+
+        for page in multistream_dump.pages(checkpoint=writer):
+            if page.name == "Zeit: Raum":
+                break
+            output.append(page.name)
+
+        checkpoint = Checkpoint.load(path)
+        assert checkpoint is None
+        # The run starts at the beginning, so its output is dropped as well
+        del output[checkpoint.state if checkpoint else 0 :]
+
+        for page in multistream_dump.pages(resume_from=checkpoint):
+            output.append(page.name)
+
+        assert output == NAMES
+
+    def test_parallel(self, multistream_dump, tmp_path):
+        path = tmp_path / "checkpoint.json"
+        writer = CheckpointWriter(multistream_dump, path, every=1)
+        pages = multistream_dump.pages_parallel(
+            workers=2, streams_per_task=1, checkpoint=writer
+        )
+        names = take(pages, 2)
+
+        resumed = multistream_dump.pages_parallel(
+            workers=2, ordered=False, streams_per_task=1, resume_from=path
+        )
+
+        assert names + sorted(page.name for page in resumed) == NAMES
+
+    def test_parallel_unordered(self, multistream_dump, tmp_path):
+        writer = CheckpointWriter(multistream_dump, tmp_path / "checkpoint")
+
+        with pytest.raises(ValueError, match="ordered"):
+            next(
+                multistream_dump.pages_parallel(
+                    ordered=False, checkpoint=writer
+                )
+            )
+
+    def test_checkpoint_of_other_dump(self, multistream_dump):
+        offsets = multistream_dump.stream_offsets()
+
+        with pytest.raises(ValueError, match="Page 3 of the checkpoint"):
+            next(multistream_dump.pages(resume_from=Checkpoint(offsets[0], 3)))
@@ -0,0 +1,90 @@
+import subprocess
+import sys
+
+import pytest
+
+from wiktionary_de_parser.dump_processor import WiktionaryDump
+from wiktionary_de_parser.dump_processor.checkpoint import Checkpoint
+
+FAKE_DECOMPRESSOR = f"""#!{sys.executable}
+import bz2
+import sys
+
+assert sys.argv[1:3] == ["-d", "-c"]
+if len(sys.argv) > 3:
+    with open(sys.argv[3], "rb") as f:
+        sys.stdout.buffer.write(bz2.decompress(f.read()))
+else:
+    sys.stdout.buffer.write(bz2.decompress(sys.stdin.buffer.read()))
+"""
+
+FAILING_DECOMPRESSOR = f"""#!{sys.executable}
+import sys
+
+sys.exit(2)
+"""
+
+
+@pytest.fixture
+def bin_path(tmp_path, monkeypatch):
+    path = tmp_path / "bin"
+    path.mkdir()
+    monkeypatch.setenv("PATH", str(path))
+
+    return path
+
+
+def install(bin_path, name, script):
+    tool = bin_path / name
+    tool.write_text(script)
+    tool.chmod(0o755)
+
+    return tool
+
+
+class TestDecompressor:
+    def test_fallback_to_bz2(self, bin_path, multistream_dump):
+        assert WiktionaryDump.find_decompressor() is None
+        assert len(list(multistream_dump.pages())) == 5
+
+    def test_find_decompressor(self, bin_path):
+        pbzip2 = install(bin_path, "pbzip2", FAKE_DECOMPRESSOR)
+        assert WiktionaryDump.find_decompressor() == str(pbzip2)
+
+        lbzip2 = install(bin_path, "lbzip2", FAKE_DECOMPRESSOR)
+        assert WiktionaryDump.find_decompressor() == str(lbzip2)
+        assert WiktionaryDump.find_decompressor("pbzip2") == str(pbzip2)
+        assert WiktionaryDump.find_decompressor("bz2") is None
+
+        with pytest.raises(FileNotFoundError):
+            WiktionaryDump.find_decompressor("missing")
+
+    def test_external_decompressor(self, bin_path, multistream_dump):
+        expected = list(multistream_dump.pages(decompressor="bz2"))
+        install(bin_path, "lbzip2", FAKE_DECOMPRESSOR)
+
+        assert list(multistream_dump.pages()) == expected
+
+    def test_stop_early(self, bin_path, multistream_dump):
+        install(bin_path, "lbzip2", FAKE_DECOMPRESSOR)
+        pages = multistream_dump.pages()
+
+        assert next(pages).name == "Abend"
+        pages.close()
+
+    def test_failing_decompressor(self, bin_path, multistream_dump):
+        install(bin_path, "lbzip2", FAILING_DECOMPRESSOR)
+
+        with pytest.raises(subprocess.CalledProcessError):
+            list(multistream_dump.pages())
+
+    def test_resume(self, bin_path, multistream_dump):
+        install(bin_path, "lbzip2", FAKE_DECOMPRESSOR)
+        offsets = multistream_dump.page_offsets()
+        pages = multistream_dump.pages(resume_from=Checkpoint(offsets[3], 3))
+
+        assert [page.name for page in pages] == [
+            "Abends",
+            "Zeit: Raum",
+            "house",
+        ]
@@ -0,0 +1,364 @@
+import hashlib
+import json
+import os
+import random
+import string
+from test.test_data.dump_data import build_multistream_dump
+
+import pytest
+import requests
+
+from wiktionary_de_parser.dump_processor import WiktionaryDump
+from wiktionary_de_parser.dump_processor.download import (
+    checksums_url_for,
+    find_checksum,
+    part_path_for,
+    segments_path_for,
+)
+
+DUMP_NAME = "dewiktionary-latest-pages-articles-multistream.xml.bz2"
+DUMP_DATA = os.urandom(300_000)
+
+
+@pytest.fixture
+def served_dump(http_server):
+    (http_server.directory / DUMP_NAME).write_bytes(DUMP_DATA)
+    (http_server.directory / "dewiktionary-latest-md5sums.txt").write_text(
+        f"{hashlib.md5(b'index').hexdigest()}  "
+        "dewiktionary-20240101-pages-articles-multistream-index.txt.bz2\n"
+        f"{hashlib.md5(DUMP_DATA).hexdigest()}  "
+        "dewiktionary-20240101-pages-articles-multistream.xml.bz2\n"
+    )
+
+    return http_server
+
+
+@pytest.fixture
+def dump(served_dump, tmp_path):
+    return WiktionaryDump(
+        dump_dir_path=tmp_path / "dump",
+        dump_download_url=f"{served_dump.url}/{DUMP_NAME}",
+    )
+
+
+class TestChecksums:
+    def test_checksums_url(self):
+        assert checksums_url_for(
+            f"https://dumps.wikimedia.org/dewiktionary/latest/{DUMP_NAME}",
+            "sha1",
+        ) == (
+            "https://dumps.wikimedia.org/dewiktionary/latest/"
+            "dewiktionary-latest-sha1sums.txt"
+        )
+
+        with pytest.raises(ValueError):
+            checksums_url_for(DUMP_NAME, "sha256")
+
+    def test_find_checksum(self):
+        checksums = (
+            "aaa  dewiktionary-20240101-pages-articles.xml.bz2\n"
+            "BBB  dewiktionary-20240101-pages-articles-multistream.xml.bz2\n"
+        )
+
+        assert find_checksum(checksums, DUMP_NAME) == "bbb"
+        assert (
+            find_checksum(
+                checksums, "dewiktionary-20240101-pages-articles.xml.bz2"
+            )
+            == "aaa"
+        )
+        assert find_checksum(checksums, "dewiktionary-latest-x.bz2") is None
+
+
+class TestDownload:
+    def test_download(self, dump):
+        dump.download_dump(chunk_size=4096)
+
+        assert dump.dump_file_path.read_bytes() == DUMP_DATA
+        assert not part_path_for(dump.dump_file_path).exists()
+
+    def test_existing_file_is_kept(self, dump, served_dump):
+        dump.dump_file_path.write_bytes(b"local")
+        dump.download_dump()
+
+        assert dump.dump_file_path.read_bytes() == b"local"
+        assert served_dump.requests == []
+
+    def test_resume_after_dropped_connection(self, dump, served_dump):
+        served_dump.drop_after = 100_000
+        dump.download_dump(chunk_size=4096)
+
+        assert dump.dump_file_path.read_bytes() == DUMP_DATA
+        assert served_dump.requests[0] == ("GET", None)
+        assert served_dump.requests[1][1].startswith("bytes=")
+        assert served_dump.requests[1][1] != "bytes=0-"
+
+    def test_retries_after_progress(self, dump, served_dump):
+        # More drops than retries, but every connection receives bytes
+        served_dump.drop_after = 50_000
+        served_dump.drop_count = 5
+        dump.download_dump(chunk_size=4096)
+
+        assert dump.dump_file_path.read_bytes() == DUMP_DATA
+        assert len(served_dump.requests) == 6
+
+    def test_resume_part_file(self, dump, served_dump):
+        part_path = part_path_for(dump.dump_file_path)
+        part_path.write_bytes(DUMP_DATA[:1234])
+        dump.download_dump()
+
+        assert dump.dump_file_path.read_bytes() == DUMP_DATA
+        assert served_dump.requests == [("GET", "bytes=1234-")]
+
+    def test_complete_part_file(self, dump, served_dump):
+        part_path_for(dump.dump_file_path).write_bytes(DUMP_DATA)
+        dump.download_dump()
+
+        assert dump.dump_file_path.read_bytes() == DUMP_DATA
+
+    def test_server_without_range_support(self, dump, served_dump):
+        served_dump.support_ranges = False
+        part_path_for(dump.dump_file_path).write_bytes(b"x" * 1234)
+        dump.download_dump()
+
+        assert dump.dump_file_path.read_bytes() == DUMP_DATA
+
+    def test_verify_checksum(self, dump, served_dump):
+        dump.download_dump(verify_checksum="md5")
+
+        assert dump.dump_file_path.read_bytes() == DUMP_DATA
+        assert len(served_dump.requests) == 2
+
+    def test_verify_existing_file(self, dump, served_dump):
+        dump.dump_file_path.write_bytes(DUMP_DATA)
+        dump.download_dump(verify_checksum="md5")
+
+        # Only the checksum file
+        assert len(served_dump.requests) == 1
+
+    def test_existing_file_mismatch(self, dump, served_dump):
+        dump.dump_file_path.write_bytes(b"local")
+
+        with pytest.raises(ValueError, match="Delete .* to download it again"):
+            dump.download_dump(verify_checksum="md5")
+
+        assert dump.dump_file_path.read_bytes() == b"local"
+
+    def test_checksum_mismatch(self, dump, served_dump):
+        part_path = part_path_for(dump.dump_file_path)
+        # Corrupt data at the beginning of the part file
+        part_path.write_bytes(b"\0" * 1234)
+
+        with pytest.raises(ValueError, match="checksum mismatch"):
+            dump.download_dump(verify_checksum="md5")
+
+        assert not dump.dump_file_path.exists()
+        assert not part_path.exists()
+
+
+class TestSegmentedDownload:
+    def test_download(self, dump, served_dump):
+        dump.download_dump(chunk_size=4096, connections=4)
+
+        assert dump.dump_file_path.read_bytes() == DUMP_DATA
+        ranges = sorted(
+            header for method, header in served_dump.requests if header
+        )
+        assert ranges == [
+            "bytes=0-74999",
+            "bytes=150000-224999",
+            "bytes=225000-299999",
+            "bytes=75000-149999",
+        ]
+        part_path = part_path_for(dump.dump_file_path)
+        assert not part_path.exists()
+        assert not segments_path_for(part_path).exists()
+
+    def test_retry_dropped_segment(self, dump, served_dump):
+        served_dump.drop_after = 10_000
+        dump.download_dump(chunk_size=4096, connections=3)
+
+        assert dump.dump_file_path.read_bytes() == DUMP_DATA
+
+    def test_failed_segment_stops_the_others(self, dump, served_dump):
+        served_dump.fail_range = "bytes=0-99999"
+        served_dump.chunk_delay = 0.05
+
+        with pytest.raises(requests.HTTPError):
+            dump.download_dump(chunk_size=4096, connections=3)
+
+        part_path = part_path_for(dump.dump_file_path)
+        segments = json.loads(segments_path_for(part_path).read_text())
+        data = part_path.read_bytes()
+        # The other segments stopped before they were complete, and exactly
+        # the bytes they wrote until then are saved
+        assert segments["segments"][0] == [0, 100_000]
+        for (start, end), first in zip(
+            segments["segments"][1:], (100_000, 200_000), strict=True
+        ):
+            assert first < start < end
+            assert data[first:start] == DUMP_DATA[first:start]
+            assert data[start:end] == bytes(end - start)
+
+    def test_resume_segments(self, dump, served_dump):
+        part_path = part_path_for(dump.dump_file_path)
+        data = bytearray(DUMP_DATA)
+        data[1000:2000] = b"\0" * 1000
+        data[250_000:] = b"\0" * 50_000
+        part_path.write_bytes(data)
+        segments_path_for(part_path).write_text(
+            '{"size": 300000, "segments": [[1000, 2000], [250000, 300000]]}'
+        )
+
+        dump.download_dump(verify_checksum="md5")
+
+        assert dump.dump_file_path.read_bytes() == DUMP_DATA
+        assert ("GET", "bytes=1000-1999") in served_dump.requests
+        assert ("GET", "bytes=250000-299999") in served_dump.requests
+
+    def test_resume_single_connection_part(self, dump, served_dump):
+        part_path_for(dump.dump_file_path).write_bytes(DUMP_DATA[:100_000])
+        dump.download_dump(connections=2)
+
+        assert dump.dump_file_path.read_bytes() == DUMP_DATA
+        assert ("GET", "bytes=100000-199999") in served_dump.requests
+        assert ("GET", "bytes=200000-299999") in served_dump.requests
+
+    def test_fallback_without_range_support(self, dump, served_dump):
+        served_dump.support_ranges = False
+        dump.download_dump(connections=4)
+
+        assert dump.dump_file_path.read_bytes() == DUMP_DATA
+        assert served_dump.requests == [("HEAD", None), ("GET", None)]
+
+
+def random_pages(count: int):
+    rnd = random.Random(0)
+
+    return [
+        (
+            page_id,
+            f"Seite {page_id}",
+            0,
+            "wikitext",
+            "".join(rnd.choices(string.ascii_letters, k=500)),
+            None,
+        )
+        for page_id in range(1, count + 1)
+    ]
+
+
+@pytest.fixture
+def served_multistream_dump(http_server, tmp_path):
+    dump_path, _ = build_multistream_dump(
+        http_server.directory, pages=random_pages(1000), pages_per_stream=100
+    )
+    local_dump = WiktionaryDump(dump_file_path=dump_path)
+    dump = WiktionaryDump(
+        dump_dir_path=tmp_path / "dump",
+        dump_download_url=f"{http_server.url}/{dump_path.name}",
+    )
+
+    return dump, local_dump
+
+
+class TestDownloadPages:
+    def test_download_pages(self, served_multistream_dump):
+        dump, local_dump = served_multistream_dump
+
+        assert list(dump.download_pages()) == list(local_dump.pages())
+        assert (
+            dump.dump_file_path.read_bytes()
+            == local_dump.dump_file_path.read_bytes()
+        )
+        assert not part_path_for(dump.dump_file_path).exists()
+
+    def test_pages_before_download_is_finished(self, served_multistream_dump):
+        dump, _ = served_multistream_dump
+        pages = dump.download_pages(chunk_size=64)
+
+        assert next(pages).name == "Seite 1"
+        assert not dump.dump_file_path.exists()
+        assert part_path_for(dump.dump_file_path).exists()
+
+        pages.close()
+
+    def test_resume(self, served_multistream_dump, http_server):
+        dump, local_dump = served_multistream_dump
+        pages = dump.download_pages(chunk_size=64)
+        next(pages)
+        pages.close()
+
+        part_size = part_path_for(dump.dump_file_path).stat().st_size
+        assert 0 < part_size < local_dump.dump_file_path.stat().st_size
+
+        http_server.drop_after = 100_000
+        http_server.requests.clear()
+
+        assert list(dump.download_pages(chunk_size=64)) == list(
+            local_dump.pages()
+        )
+        assert (
+            dump.dump_file_path.read_bytes()
+            == local_dump.dump_file_path.read_bytes()
+        )
+        ranges = [header for _, header in http_server.requests]
+        assert len(ranges) == 2
+        assert ranges[0] == f"bytes={part_size}-"
+
+    def test_server_without_range_support(
+        self, served_multistream_dump, http_server
+    ):
+        dump, local_dump = served_multistream_dump
+        http_server.support_ranges = False
+        part_path_for(dump.dump_file_path).write_bytes(
+            local_dump.dump_file_path.read_bytes()[:100]
+        )
+
+        assert list(dump.download_pages()) == list(local_dump.pages())
+        assert (
+            dump.dump_file_path.read_bytes()
+            == local_dump.dump_file_path.read_bytes()
+        )
+
+    def test_checksum_mismatch(self, served_multistream_dump, http_server):
+        dump, _ = served_multistream_dump
+        checksums_path = http_server.directory / "checksums.txt"
+        checksums_path.write_text(f"{'0' * 32}  {dump.dump_file_path.name}\n")
+
+        with pytest.raises(ValueError, match="checksum mismatch"):
+            list(
+                dump.download_pages(
+                    verify_checksum="md5",
+                    checksums_url=f"{http_server.url}/checksums.txt",
+                )
+            )
+
+        assert not dump.dump_file_path.exists()
+
+    def test_retries_after_progress(self, served_multistream_dump, http_server):
+        dump, local_dump = served_multistream_dump
+        size = local_dump.dump_file_path.stat().st_size
+        http_server.drop_after = size // 6
+        http_server.drop_count = 5
+
+        assert list(dump.download_pages(chunk_size=64)) == list(
+            local_dump.pages()
+        )
+        assert len(http_server.requests) == 6
+
+    def test_existing_file_mismatch(self, served_multistream_dump, http_server):
+        dump, local_dump = served_multistream_dump
+        dump.dump_file_path.write_bytes(local_dump.dump_file_path.read_bytes())
+        checksums_path = http_server.directory / "checksums.txt"
+        checksums_path.write_text(f"{'0' * 32}  {dump.dump_file_path.name}\n")
+
+        with pytest.raises(ValueError, match="Delete .* to download it again"):
+            next(
+                dump.download_pages(
+                    verify_checksum="md5",
+                    checksums_url=f"{http_server.url}/checksums.txt",
+                )
+            )
+
+        assert dump.dump_file_path.exists()
@@ -0,0 +1,117 @@
+import pytest
+
+from wiktionary_de_parser.dump_processor import WiktionaryDump
+from wiktionary_de_parser.dump_processor.multistream import index_path_for
+
+
+class TestMultistreamIndex:
+    def test_index_path(self):
+        assert index_path_for(
+            "dewiktionary-latest-pages-articles-multistream.xml.bz2"
+        ) == ("dewiktionary-latest-pages-articles-multistream-index.txt.bz2")
+
+        with pytest.raises(ValueError):
+            index_path_for("dewiktionary-latest-pages-articles.xml.bz2")
+
+    def test_index_url(self, tmp_path):
+        dump = WiktionaryDump(dump_dir_path=tmp_path)
+
+        assert dump.index_download_url == (
+            "https://dumps.wikimedia.org/dewiktionary/latest/"
+            "dewiktionary-latest-pages-articles-multistream-index.txt.bz2"
+        )
+        assert dump.index_file_path == (
+            tmp_path
+            / "dewiktionary-latest-pages-articles-multistream-index.txt.bz2"
+        )
+
+    def test_load_index(self, multistream_dump):
+        index = multistream_dump.load_index()
+
+        assert len(index) == 7
+        assert index["Zeit: Raum"][1] == 6
+        # pages of the same stream share an offset
+        assert index["Abend"][0] == index["Vorlage:Wortart"][0]
+        assert index["Abend"][0] != index["Haus"][0]
+
+    def test_get_page(self, multistream_dump):
+        page = multistream_dump.get_page("Haus")
+
+        assert page is not None
+        assert page.page_id == 3
+        assert page.name == "Haus"
+        assert page.wikitext.startswith("== Haus ({{Sprache|Deutsch}}) ==")
+
+    def test_get_page_in_last_stream(self, multistream_dump):
+        page = multistream_dump.get_page("house")
+
+        assert page is not None
+        assert page.page_id == 7
+
+    def test_get_missing_page(self, multistream_dump):
+        assert multistream_dump.get_page("Nacht") is None
+        # Pages outside of the main namespace are ignored
+        assert multistream_dump.get_page("Vorlage:Wortart") is None
+
+    def test_get_pages(self, multistream_dump):
+        pages = list(
+            multistream_dump.get_pages(["house", "Abend", "Nacht", "Abends"])
+        )
+
+        assert [page.name for page in pages] == ["Abend", "Abends", "house"]
+        assert pages[1].redirect_to == "abends"
+
+    def test_get_pages_matches_pages(self, multistream_dump):
+        pages = list(multistream_dump.pages())
+        titles = [page.name for page in pages]
+
+        assert titles == ["Abend", "Haus", "Abends", "Zeit: Raum", "house"]
+        assert list(multistream_dump.get_pages(titles)) == pages
+
+    def test_validate(self, multistream_dump):
+        dump = WiktionaryDump(
+            dump_file_path=multistream_dump.dump_file_path, validate=True
+        )
+
+        assert list(dump.pages()) == list(multistream_dump.pages())
+
+    def test_missing_index(self, tmp_path):
+        dump = WiktionaryDump(dump_dir_path=tmp_path)
+
+        with pytest.raises(FileNotFoundError):
+            dump.get_page("Abend")
+
+
+class TestParallelPages:
+    def test_stream_offsets(self, multistream_dump):
+        offsets = multistream_dump.stream_offsets()
+
+        assert len(offsets) == 4
+        assert offsets == sorted(offsets)
+
+    def test_read_streams(self, multistream_dump):
+        offsets = multistream_dump.stream_offsets()
+        pages = multistream_dump.read_streams(offsets[1], offsets[3])
+
+        assert [page.name for page in pages] == ["Haus", "Abends", "Zeit: Raum"]
+
+    @pytest.mark.parametrize("streams_per_task", [1, 3, 10])
+    def test_ordered(self, multistream_dump, streams_per_task):
+        pages = list(
+            multistream_dump.pages_parallel(
+                workers=2, streams_per_task=streams_per_task
+            )
+        )
+
+        assert pages == list(multistream_dump.pages())
+
+    def test_unordered(self, multistream_dump):
+        pages = list(
+            multistream_dump.pages_parallel(
+                workers=2, ordered=False, streams_per_task=1
+            )
+        )
+
+        assert sorted(pages, key=lambda page: page.page_id) == list(
+            multistream_dump.pages()
+        )
@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from wiktionary_de_parser.dump_processor import WiktionaryDump
+from wiktionary_de_parser.utils.concurrency import prefetched
+
+
+class TestPrefetch:
+    @pytest.mark.parametrize("prefetch", [1, 3, 1000])
+    def test_pages(self, multistream_dump, prefetch):
+        assert list(multistream_dump.pages(prefetch=prefetch)) == list(
+            multistream_dump.pages()
+        )
+
+    def test_stop_early(self, multistream_dump):
+        pages = multistream_dump.pages(decompressor="bz2", prefetch=2)
+
+        assert next(pages).name == "Abend"
+        pages.close()
+        assert not any(t.name == "prefetch" for t in threading.enumerate())
+
+    def test_buffer_is_bounded(self):
+        read = 0
+        closed = threading.Event()
+
+        def generate():
+            nonlocal read
+            try:
+                for item in range(1000):
+                    read += 1
+                    yield item
+            finally:
+                closed.set()
+
+        items = prefetched(generate(), size=10, batch_size=5)
+
+        assert next(items) == 0
+        # Two batches in the queue, one being filled and the one being read
+        assert read <= 10 + 5 + 5 + 1
+        items.close()
+        assert closed.is_set()
+
+    def test_exception(self):
+        def generate():
+            yield 1
+            raise ValueError("broken")
+
+        items = prefetched(generate(), size=10)
+
+        with pytest.raises(ValueError, match="broken"):
+            list(items)
+
+    def test_missing_dump(self, tmp_path):
+        dump = WiktionaryDump(dump_file_path=tmp_path / "missing.xml.bz2")
+
+        with pytest.raises(FileNotFoundError):
+            next(dump.pages(prefetch=10))
@@ -0,0 +1,124 @@
+import random
+from test.test_data.dump_data import dump_pages
+
+import mwparserfromhell
+import pytest
+import wikitextparser
+
+from wiktionary_de_parser import WiktionaryParser
+from wiktionary_de_parser.parser import Parser
+from wiktionary_de_parser.parser.context import (
+    MWPARSERFROMHELL,
+    WIKITEXTPARSER,
+    EntryContext,
+    index_sections,
+)
+from wiktionary_de_parser.records import WiktionaryPage, WiktionaryPageEntry
+
+WIKITEXT = """=== {{Wortart|Substantiv|Deutsch}}, {{m}} ===
+
+{{Worttrennung}}
+:Abend, {{Pl.}} Aben·de
+
+{{Aussprache}}
+:{{IPA}} {{Lautschrift|ˈaːbn̩t}}
+:{{Reime}} {{Reim|aːbn̩t|Deutsch}}
+
+{{Bedeutungen}}
+:[1] Tageszeit
+{{Aussprache}}
+:zweiter Abschnitt"""
+
+
+class TestEntryContext:
+    def test_index_sections(self):
+        sections = index_sections(WIKITEXT)
+
+        assert list(sections) == ["Worttrennung", "Aussprache", "Bedeutungen"]
+        assert WIKITEXT[slice(*sections["Worttrennung"])] == (
+            ":Abend, {{Pl.}} Aben·de\n"
+        )
+
+    def test_section(self):
+        context = EntryContext(WIKITEXT)
+
+        assert context.section("Aussprache") == (
+            ":{{IPA}} {{Lautschrift|ˈaːbn̩t}}\n"
+            ":{{Reime}} {{Reim|aːbn̩t|Deutsch}}\n"
+        )
+        assert context.section("Bedeutungen") == ":[1] Tageszeit"
+        assert context.section("Herkunft") is None
+
+    @pytest.mark.parametrize(
+        "wikitext", [text for *_, text, _ in dump_pages if text]
+    )
+    @pytest.mark.parametrize(
+        "heading", ["Worttrennung", "Aussprache", "Bedeutungen"]
+    )
+    def test_same_as_find_paragraph(self, wikitext, heading):
+        assert EntryContext(wikitext).section(heading) == (
+            Parser.find_paragraph(heading, wikitext)
+        )
+
+    def test_random_wikitext(self):
+        parts = ["{{Aussprache}}", "{{Aussprache", "\n", "{{", "}}", "x", "|"]
+        rng = random.Random(0)
+
+        for _ in range(5000):
+            wikitext = "".join(rng.choices(parts, k=rng.randint(0, 15)))
+            assert EntryContext(wikitext).section("Aussprache") == (
+                Parser.find_paragraph("Aussprache", wikitext)
+            ), wikitext
+
+
+class TestParseTrees:
+    def test_tree(self):
+        context = EntryContext(WIKITEXT)
+        tree = context.tree(MWPARSERFROMHELL, "Aussprache")
+
+        assert isinstance(tree, mwparserfromhell.wikicode.Wikicode)
+        assert str(tree) == context.section("Aussprache")
+        assert context.tree(MWPARSERFROMHELL, "Aussprache") is tree
+        assert isinstance(
+            context.tree(WIKITEXTPARSER, "Aussprache"),
+            wikitextparser.WikiText,
+        )
+        assert context.tree(MWPARSERFROMHELL, "Herkunft") is None
+
+    def test_unknown_library(self):
+        with pytest.raises(ValueError):
+            EntryContext(WIKITEXT).tree("unknown", "Aussprache")
+
+    def test_sections_are_parsed_once(self, monkeypatch):
+        calls: list[tuple[str, str]] = []
+
+        def counting(library, parse):
+            def wrapper(text, *args, **kwargs):
+                calls.append((library, text))
+                return parse(text, *args, **kwargs)
+
+            return wrapper
+
+        monkeypatch.setattr(
+            mwparserfromhell,
+            "parse",
+            counting(MWPARSERFROMHELL, mwparserfromhell.parse),
+        )
+        monkeypatch.setattr(
+            wikitextparser,
+            "parse",
+            counting(WIKITEXTPARSER, wikitextparser.parse),
+        )
+        page = WiktionaryPage(page_id=1, name="Abend", wikitext=WIKITEXT)
+        entry = WiktionaryPageEntry(page=page, index=0, wikitext=WIKITEXT)
+        result = WiktionaryParser().parse_entry(entry, include_meanings=True)
+
+        assert result.ipa == ["ˈaːbn̩t"]
+        assert result.rhymes == ["aːbn̩t"]
+        aussprache = (
+            MWPARSERFROMHELL,
+            EntryContext(WIKITEXT).section("Aussprache"),
+        )
+        assert calls.count(aussprache) == 1
+        # The meanings parser parses the list items again
+        assert calls.count((WIKITEXTPARSER, ":[1] Tageszeit")) == 1
@@ -16,3 +16,22 @@ class TestFlexionParsing:
         for key_expected, value_excpected in expected.items():
             assert key_expected in parse_result
             assert parse_result[key_expected] == value_excpected
+
+    @pytest.mark.parametrize(
+        "text,expected",
+        [
+            ("{{Deutsch Verb Übersicht}}", None),
+            ("{{Deutsch Verb Übersicht|a=b}x}}", None),
+            (
+                "{{Deutsch Verb Übersicht\n|a=b}}",
+                "{{Deutsch Verb Übersicht\n|a=b}}",
+            ),
+            (
+                "{{Deutsch Verb Übersicht|a}x {{Deutsch Verb Übersicht|b}}",
+                "{{Deutsch Verb Übersicht|b}}",
+            ),
+            ("{{Deutsch Verb Übersicht|a\n" * 3, None),
+        ],
+    )
+    def test_find_table(self, text, expected):
+        assert ParseFlexion.find_table(text) == expected
@@ -3,6 +3,7 @@ from test.test_data.hyphenation_data import hyphenation_data
 import pytest
 
 from wiktionary_de_parser.parser.parse_hyphenation import ParseHyphenation
+from wiktionary_de_parser.records import WiktionaryPage, WiktionaryPageEntry
 
 
 class TestHyphenationParsing:
@@ -11,3 +12,11 @@ class TestHyphenationParsing:
     def test_parsing_hyphenation(self, title, test_input, expected):
         result = ParseHyphenation.parse(title, test_input)
         assert result == expected
+
+    @pytest.mark.parametrize("title,test_input,expected", hyphenation_data)
+    def test_run(self, title, test_input, expected):
+        # With the sections of the entry context
+        page = WiktionaryPage(page_id=1, name=title, wikitext=test_input)
+        entry = WiktionaryPageEntry(page=page, index=0, wikitext=test_input)
+
+        assert ParseHyphenation(entry).run() == expected
@@ -0,0 +1,110 @@
+"""
+Malformed wikitext that made regular expressions of the parsers scan the
+rest of the page for every match attempt (quadratic time), and random pages
+built from wikitext fragments. Every page is about 100 kB.
+
+The html tags of "slow_meanings_pages" still take quadratic time (minutes),
+they are only parsed with a time budget.
+"""
+
+import random
+
+HEAD = """== Test ({{Sprache|Deutsch}}) ==
+=== {{Wortart|Substantiv|Deutsch}}, {{m}} ===
+
+"""
+SIZE = 100_000
+
+
+def repeat(text: str) -> str:
+    return text * (SIZE // len(text))
+
+
+adversarial_pages = [
+    # Unclosed flexion tables
+    ("flexion_unclosed", HEAD + repeat("{{Deutsch Substantiv Übersicht\n")),
+    # Parameters without "=" in a flexion table
+    (
+        "flexion_pipes",
+        HEAD + "{{Deutsch Substantiv Übersicht\n" + repeat("|") + "\n}}\n",
+    ),
+    (
+        "flexion_no_equals",
+        HEAD + "{{Deutsch Substantiv Übersicht\n" + repeat("|a") + "\n}}\n",
+    ),
+    # Unclosed "Wortart" templates, on many lines and on one line
+    (
+        "wortart_lines",
+        "== Test ({{Sprache|Deutsch}}) ==\n" + repeat("=== {{Wortart|a\n"),
+    ),
+    (
+        "wortart_line",
+        "== Test ({{Sprache|Deutsch}}) ==\n=== " + repeat("{{Wortart|a"),
+    ),
+    # Unclosed html tags
+    ("html_unclosed", HEAD + "{{Worttrennung}}\n:" + repeat("<") + "\n"),
+    # Unclosed templates and repeated headings
+    ("braces", HEAD + repeat("{{")),
+    ("lemma", HEAD + repeat("{{Grundformverweis")),
+    ("headings", HEAD + repeat("{{Aussprache}}\n")),
+    (
+        "grammatical_features",
+        HEAD.replace("Substantiv", "Deklinierte Form")
+        + repeat("{{Grammatische Merkmale}}\n"),
+    ),
+    # Long lines of meanings
+    ("meanings_parens", HEAD + "{{Bedeutungen}}\n:[1] (" + repeat("a ") + "\n"),
+]
+
+FRAGMENTS = [
+    "{{",
+    "}}",
+    "|",
+    "=",
+    "\n",
+    "<",
+    ">",
+    "</ref>",
+    "[[",
+    "]]",
+    "(",
+    ")",
+    "·",
+    ", ",
+    ":[1] ",
+    "=== ",
+    "== Test ({{Sprache|Deutsch}}) ==\n",
+    "{{Wortart|",
+    "{{Deutsch Substantiv Übersicht\n",
+    "{{Aussprache}}\n",
+    "{{Bedeutungen}}\n",
+    "{{Worttrennung}}\n",
+    "{{Lautschrift|",
+    "{{Reim|",
+    "{{Grundformverweis|",
+    "Genus=",
+    "abc",
+]
+
+
+def random_page(seed: int) -> str:
+    rnd = random.Random(seed)
+    parts = []
+    size = 0
+
+    while size < SIZE:
+        fragment = rnd.choice(FRAGMENTS) * rnd.choice([1, 1, 1, 10, 100])
+        parts.append(fragment)
+        size += len(fragment)
+
+    return HEAD + "".join(parts)
+
+
+adversarial_pages += [
+    (f"random_{seed}", random_page(seed)) for seed in range(5)
+]
+
+slow_meanings_pages = [
+    # Html tags that are never closed in a long meaning
+    ("meanings_tags", HEAD + "{{Bedeutungen}}\n:[1] " + repeat("<a>") + "\n"),
+]
@@ -0,0 +1,129 @@
+import bz2
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+NAMESPACE = "http://www.mediawiki.org/xml/export-0.11/"
+
+DUMP_HEADER = f"""<mediawiki xmlns="{NAMESPACE}" version="0.11" xml:lang="de">
+  <siteinfo>
+    <sitename>Wiktionary</sitename>
+    <dbname>dewiktionary</dbname>
+  </siteinfo>
+"""
+
+DUMP_FOOTER = "</mediawiki>\n"
+
+# (page_id, title, namespace id, model, wikitext, redirect title)
+dump_pages = [
+    (
+        1,
+        "Abend",
+        0,
+        "wikitext",
+        """== Abend ({{Sprache|Deutsch}}) ==
+=== {{Wortart|Substantiv|Deutsch}}, {{m}} ===
+
+{{Worttrennung}}
+:Abend, {{Pl.}} Aben·de
+
+{{Aussprache}}
+:{{IPA}} {{Lautschrift|ˈaːbn̩t}}
+:{{Reime}} {{Reim|aːbn̩t|Deutsch}}
+""",
+        None,
+    ),
+    (2, "Vorlage:Wortart", 10, "wikitext", "Template text", None),
+    (
+        3,
+        "Haus",
+        0,
+        "wikitext",
+        """== Haus ({{Sprache|Deutsch}}) ==
+=== {{Wortart|Substantiv|Deutsch}}, {{n}} ===
+
+{{Worttrennung}}
+:Haus, {{Pl.}} Häu·ser
+""",
+        None,
+    ),
+    (4, "Abends", 0, "wikitext", "#WEITERLEITUNG [[abends]]", "abends"),
+    (5, "MediaWiki:Common.css", 0, "css", "body {}", None),
+    (
+        6,
+        "Zeit: Raum",
+        0,
+        "wikitext",
+        """== Zeit: Raum ({{Sprache|Deutsch}}) ==
+=== {{Wortart|Redewendung|Deutsch}} ===
+""",
+        None,
+    ),
+    (
+        7,
+        "house",
+        0,
+        "wikitext",
+        """== house ({{Sprache|Englisch}}) ==
+=== {{Wortart|Substantiv|Englisch}} ===
+
+{{Worttrennung}}
+:house, {{Pl.}} hous·es
+""",
+        None,
+    ),
+]
+
+
+def page_xml(page_id, title, ns, model, text, redirect_to) -> str:
+    redirect = (
+        f"    <redirect title={quoteattr(redirect_to)} />\n"
+        if redirect_to
+        else ""
+    )
+
+    return f"""  <page>
+    <title>{escape(title)}</title>
+    <ns>{ns}</ns>
+    <id>{page_id}</id>
+{redirect}    <revision>
+      <id>{page_id + 1000}</id>
+      <model>{model}</model>
+      <format>text/x-wiki</format>
+      <text xml:space="preserve">{escape(text)}</text>
+    </revision>
+  </page>
+"""
+
+
+def build_multistream_dump(
+    directory: Path, pages=dump_pages, pages_per_stream: int = 2
+) -> tuple[Path, Path]:
+    """
+    Write a small multistream dump and its index file to "directory", the
+    same way Wikimedia creates them: one bz2 stream for the header, one
+    stream per "pages_per_stream" pages and one stream for the footer.
+    """
+    name = "dewiktionary-test-pages-articles-multistream"
+    dump_path = directory / f"{name}.xml.bz2"
+    index_path = directory / f"{name}-index.txt.bz2"
+
+    streams = [bz2.compress(DUMP_HEADER.encode())]
+    index_lines: list[str] = []
+    offset = len(streams[0])
+
+    for start in range(0, len(pages), pages_per_stream):
+        chunk = pages[start : start + pages_per_stream]
+        data = "".join(page_xml(*page) for page in chunk)
+        streams.append(bz2.compress(data.encode()))
+
+        for page_id, title, *_ in chunk:
+            index_lines.append(f"{offset}:{page_id}:{title}\n")
+
+        offset += len(streams[-1])
+
+    streams.append(bz2.compress(DUMP_FOOTER.encode()))
+
+    dump_path.write_bytes(b"".join(streams))
+    index_path.write_bytes(bz2.compress("".join(index_lines).encode()))
+
+    return dump_path, index_path
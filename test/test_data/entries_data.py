@@ -0,0 +1,62 @@
+# (wikitext, expected entries)
+entries_test_data = [
+    ("", []),
+    ("Keine Einträge", []),
+    (
+        """== Becken ({{Sprache|Deutsch}}) ==
+=== {{Wortart|Substantiv|Deutsch}}, {{n}} ===
+
+{{Bedeutungen}}
+:[1] Schüssel
+""",
+        [
+            """=== {{Wortart|Substantiv|Deutsch}}, {{n}} ===
+
+{{Bedeutungen}}
+:[1] Schüssel
+"""
+        ],
+    ),
+    # Two entries of the same language, a second language and a translation
+    # table (level 4), which belongs to the entry before it
+    (
+        """== instrument ({{Sprache|Englisch}}) ==
+=== {{Wortart|Substantiv|Englisch}} ===
+:[1] Instrument
+
+==== {{Übersetzungen}} ====
+{{Ü-Tabelle}}
+
+=== {{Wortart|Verb|Englisch}} ===
+:[1] instrumentieren
+
+== instrument ({{Sprache|Französisch}}) ==
+=== {{Wortart|Substantiv|Französisch}}, {{m}} ===
+:[1] Instrument""",
+        [
+            """=== {{Wortart|Substantiv|Englisch}} ===
+:[1] Instrument
+
+==== {{Übersetzungen}} ====
+{{Ü-Tabelle}}
+""",
+            """=== {{Wortart|Verb|Englisch}} ===
+:[1] instrumentieren
+""",
+            """=== {{Wortart|Substantiv|Französisch}}, {{m}} ===
+:[1] Instrument""",
+        ],
+    ),
+    # Headings only end an entry at the beginning of a line
+    (
+        "=== {{Wortart|Substantiv}} === == x\n=== {{Wortart|Verb}} ===\n",
+        [
+            "=== {{Wortart|Substantiv}} === == x",
+            "=== {{Wortart|Verb}} ===\n",
+        ],
+    ),
+    # Without any text after it, "=== {{Wortart" is no entry
+    ("=== {{Wortart", []),
+    ("=== {{Wortart\n== x", []),
+    ("=== {{Wortart\n\n== x", ["=== {{Wortart\n"]),
+]
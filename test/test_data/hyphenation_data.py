@@ -202,4 +202,15 @@ hyphenation_data = [
         """,
         ["zie", "hen"],
     ),
+    (
+        # A heading in an html comment isn't the section
+        "Abend",
+        """
+<!--{{Worttrennung}}
+:Foo·bar-->
+{{Worttrennung}}
+:A·bend, {{Pl.}} Aben·de
+        """,
+        ["A", "bend"],
+    ),
 ]
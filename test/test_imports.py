@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = (
+    "pydantic",
+    "mwparserfromhell",
+    "wikitextparser",
+    "lxml",
+    "requests",
+    "tqdm",
+)
+
+
+def loaded_modules(code: str) -> set[str]:
+    script = f"import sys\n{code}\nprint(' '.join(sys.modules))"
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+
+    return set(output.split())
+
+
+class TestLazyImports:
+    @pytest.mark.parametrize(
+        "code",
+        [
+            "import wiktionary_de_parser",
+            "from wiktionary_de_parser import WiktionaryParser\n"
+            "WiktionaryParser()",
+            "import wiktionary_de_parser.parser.parse_flexion",
+            "import wiktionary_de_parser.parser.parse_pos",
+        ],
+    )
+    def test_no_heavy_imports(self, code):
+        assert loaded_modules(code).isdisjoint(HEAVY_MODULES)
+
+    def test_dump_processor_without_download(self):
+        modules = loaded_modules("import wiktionary_de_parser.dump_processor")
+
+        assert "lxml" in modules
+        assert modules.isdisjoint({"pydantic", "requests", "tqdm"})
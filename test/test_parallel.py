@@ -0,0 +1,345 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from wiktionary_de_parser import parallel
+from wiktionary_de_parser.parallel import (
+    PAGE_OVERHEAD,
+    AdaptiveBatcher,
+    LoadBalanceReport,
+    TaskStats,
+    WorkerInitError,
+    init_worker,
+    parse_pages_chunk,
+    release_shared_pages,
+    share_pages,
+)
+from wiktionary_de_parser.records import WiktionaryPage
+from wiktionary_de_parser.utils.concurrency import (
+    TaskRunner,
+    thread_safe_cache,
+)
+from wiktionary_de_parser.utils.shared_memory import SharedRingBuffer
+
+
+def make_pages(*sizes: int) -> list[WiktionaryPage]:
+    return [
+        WiktionaryPage(page_id=page_id, name=str(page_id), wikitext="x" * size)
+        for page_id, size in enumerate(sizes)
+    ]
+
+
+class TestAdaptiveBatcher:
+    def test_batches_by_size(self):
+        batcher = AdaptiveBatcher(initial_task_size=1000 + 2 * PAGE_OVERHEAD)
+        pages = make_pages(400, 400, 400, 100)
+        batches = [batch for (batch,) in batcher.batches(pages)]
+
+        assert batches == [pages[:3], pages[3:]]
+
+    def test_big_pages_get_own_task(self):
+        batcher = AdaptiveBatcher(initial_task_size=1000)
+        pages = make_pages(10, 5000, 10, 10, 2000)
+        batches = [batch for (batch,) in batcher.batches(pages)]
+
+        assert batches == [pages[:1], pages[1:2], pages[2:4], pages[4:]]
+
+    def test_task_size_adapts(self):
+        batcher = AdaptiveBatcher(
+            task_seconds=0.1, min_task_size=100, max_task_size=10**6
+        )
+
+        batcher.record(seconds=1.0, size=10_000)
+        assert batcher.task_size == 1000
+
+        # Parsing got faster: tasks get bigger
+        for _ in range(50):
+            batcher.record(seconds=0.01, size=10_000)
+        assert batcher.task_size > 90_000
+
+        batcher.record(seconds=0.0, size=10_000)
+        batcher.record(seconds=100.0, size=10)
+        assert batcher.task_size == 100
+
+    def test_task_size_changes_during_iteration(self):
+        batcher = AdaptiveBatcher(
+            initial_task_size=2 * (100 + PAGE_OVERHEAD), min_task_size=100
+        )
+        batches = batcher.batches(make_pages(*[100] * 10))
+
+        assert len(next(batches)[0]) == 2
+
+        batcher.record(seconds=batcher.task_seconds, size=1500)
+        assert len(next(batches)[0]) == 5
+
+
+class TestLoadBalanceReport:
+    def test_report(self):
+        report = LoadBalanceReport()
+        report.add_task(TaskStats(worker=1, pages=10, size=1000, seconds=1.0))
+        report.add_task(TaskStats(worker=1, pages=5, size=500, seconds=0.5))
+        report.add_task(TaskStats(worker=2, pages=3, size=3000, seconds=1.5))
+        report.wall_seconds = 2.0
+
+        assert report.workers[1].tasks == 2
+        assert report.workers[1].pages == 15
+        assert report.task_sizes == [1000, 500, 3000]
+        assert report.utilization() == {1: 0.75, 2: 0.75}
+        assert "2 workers, 3 tasks" in str(report)
+
+
+class TestThreadSafeCache:
+    def test_runs_once(self):
+        calls = []
+        barrier = threading.Barrier(8)
+
+        @thread_safe_cache
+        def load(name):
+            calls.append(name)
+            time.sleep(0.05)
+            return [name]
+
+        def call(name):
+            barrier.wait()
+            return load(name)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(call, ["a"] * 4 + ["b"] * 4))
+
+        assert sorted(calls) == ["a", "b"]
+        assert all(result is results[0] for result in results[:4])
+        assert all(result is results[4] for result in results[4:])
+
+    def test_cache_clear(self):
+        calls = []
+
+        @thread_safe_cache
+        def load():
+            calls.append(1)
+
+        load()
+        load.cache_clear()
+        load()
+        assert len(calls) == 2
+
+
+def total(numbers: list[int]) -> int:
+    if 13 in numbers:
+        raise ValueError("Unlucky")
+    if 666 in numbers:
+        os._exit(1)
+    return sum(numbers)
+
+
+def split_numbers(numbers: list[int]) -> list[tuple[list[int]]]:
+    return [([number],) for number in numbers]
+
+
+class TestTaskRunner:
+    @staticmethod
+    def run(make_executor, tasks, **kwargs) -> tuple[TaskRunner, list]:
+        runner = TaskRunner(
+            make_executor,
+            total,
+            tasks,
+            max_in_flight=4,
+            split=split_numbers,
+            **kwargs,
+        )
+        return runner, list(runner)
+
+    def test_results(self):
+        tasks = [([1, 2],), ([3],), ([4, 5, 6],)]
+        _, parts = self.run(ThreadPoolExecutor, tasks)
+
+        assert parts == [
+            [(([1, 2],), 3, None)],
+            [(([3],), 3, None)],
+            [(([4, 5, 6],), 15, None)],
+        ]
+
+    def test_split_and_retry(self):
+        calls = []
+
+        def count_calls(numbers):
+            calls.append(numbers)
+            return total(numbers)
+
+        runner = TaskRunner(
+            ThreadPoolExecutor,
+            count_calls,
+            [([1, 13, 2],), ([3],)],
+            max_in_flight=4,
+            retries=1,
+            split=split_numbers,
+        )
+        first, second = list(runner)
+
+        assert [(args, result) for args, result, _ in first] == [
+            (([1],), 1),
+            (([13],), None),
+            (([2],), 2),
+        ]
+        assert isinstance(first[1][2], ValueError)
+        assert second == [(([3],), 3, None)]
+        # The task, the parts and the retry of [13]
+        assert calls.count([13]) == 2
+        assert runner.retried == 4
+
+    def test_fatal(self):
+        runner = TaskRunner(
+            ThreadPoolExecutor,
+            total,
+            [([1],), ([13],)],
+            max_in_flight=4,
+            fatal=(ValueError,),
+        )
+
+        with pytest.raises(ValueError, match="Unlucky"):
+            list(runner)
+
+    def test_on_done_after_yield(self):
+        done = []
+        runner = TaskRunner(
+            ThreadPoolExecutor,
+            total,
+            [([1],), ([2],)],
+            max_in_flight=4,
+            on_done=done.append,
+        )
+        parts = iter(runner)
+
+        next(parts)
+        assert done == []
+        next(parts)
+        assert done == [[1]]
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_crash(self, ordered):
+        tasks = [([1, 2],), ([3, 666, 4],), ([5],), ([6, 7],), ([8],)]
+        runner, parts = self.run(
+            lambda: ProcessPoolExecutor(max_workers=2),
+            tasks,
+            ordered=ordered,
+            retries=0,
+        )
+        results = {
+            tuple(args[0]): result
+            for task_parts in parts
+            for args, result, _ in task_parts
+        }
+        errors = [
+            error for task_parts in parts for _, _, error in task_parts if error
+        ]
+
+        assert results == {
+            (1, 2): 3,
+            (3,): 3,
+            (666,): None,
+            (4,): 4,
+            (5,): 5,
+            (6, 7): 13,
+            (8,): 8,
+        }
+        assert len(errors) == 1
+        assert isinstance(errors[0], BrokenProcessPool)
+        assert runner.broken >= 2
+
+
+@pytest.fixture
+def ring_buffer():
+    buffer = SharedRingBuffer(100)
+    yield buffer
+    buffer.close()
+
+
+class TestSharedRingBuffer:
+    def test_allocate(self, ring_buffer):
+        assert ring_buffer.allocate(40) == 0
+        assert ring_buffer.allocate(40) == 40
+        # Full, until the oldest region is released
+        assert ring_buffer.allocate(30) is None
+        ring_buffer.release(0)
+        assert ring_buffer.allocate(30) == 0
+        assert ring_buffer.allocate(20) is None
+        assert ring_buffer.allocate(10) == 30
+
+    def test_release_out_of_order(self, ring_buffer):
+        assert ring_buffer.allocate(50) == 0
+        assert ring_buffer.allocate(50) == 50
+        ring_buffer.release(50)
+        # The older region is still in use
+        assert ring_buffer.allocate(10) is None
+        ring_buffer.release(0)
+        assert ring_buffer.allocate(100) == 0
+
+    def test_too_big(self, ring_buffer):
+        assert ring_buffer.allocate(101) is None
+        assert ring_buffer.allocate(0) is None
+
+    def test_write(self, ring_buffer):
+        assert ring_buffer.write([b"abc", b"", b"de"]) == [0, 3, 3]
+        assert bytes(ring_buffer.memory.buf[:5]) == b"abcde"
+
+
+@pytest.fixture
+def worker_globals(monkeypatch):
+    # "init_worker" sets the globals of the worker, restore them afterwards
+    for name in (
+        "worker_parser",
+        "worker_include_meanings",
+        "worker_shared_memory",
+        "worker_encoder",
+        "worker_init_error",
+    ):
+        monkeypatch.setattr(parallel, name, getattr(parallel, name))
+
+
+class TestSharePages:
+    PAGES = [
+        WiktionaryPage(page_id=1, name="Ärger", wikitext="Ärger ß"),
+        WiktionaryPage(page_id=2, name="B", wikitext=None, redirect_to="C"),
+        WiktionaryPage(page_id=3, name="D", wikitext="ü" * 10),
+    ]
+
+    def test_round_trip(self, ring_buffer, worker_globals, monkeypatch):
+        (task,) = share_pages(ring_buffer, self.PAGES)
+
+        assert task[0] == (1, "Ärger", None, 0, len("Ärger ß".encode()))
+        assert task[1] is self.PAGES[1]
+
+        init_worker(False, {"language"}, None, False, ring_buffer.name)
+        pages = []
+        monkeypatch.setattr(
+            parallel,
+            "parse_pages_with",
+            lambda parser, include_meanings, chunk: (
+                pages.extend(chunk),
+                None,
+                [],
+            ),
+        )
+        parse_pages_chunk(task)
+        parallel.worker_shared_memory.close()
+
+        assert pages == self.PAGES
+
+    def test_init_error(self, worker_globals):
+        init_worker(False, None, None, False, "missing-shared-memory")
+
+        with pytest.raises(WorkerInitError, match="FileNotFoundError"):
+            parse_pages_chunk(self.PAGES)
+
+    def test_buffer_full(self, ring_buffer):
+        (task,) = share_pages(ring_buffer, [self.PAGES[2]] * 6)
+        assert all(isinstance(page, WiktionaryPage) for page in task)
+
+    def test_release(self, ring_buffer):
+        (task,) = share_pages(ring_buffer, self.PAGES)
+        release_shared_pages(ring_buffer, task)
+
+        assert not ring_buffer.allocations
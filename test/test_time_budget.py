@@ -0,0 +1,158 @@
+import json
+import signal
+import threading
+import time
+from test.test_data.adversarial_data import (
+    HEAD,
+    adversarial_pages,
+    slow_meanings_pages,
+)
+
+import pytest
+
+from wiktionary_de_parser import WiktionaryParser
+from wiktionary_de_parser.records import WiktionaryPage
+from wiktionary_de_parser.utils.time_budget import (
+    EntryTimer,
+    TimeBudgetExceeded,
+)
+
+pages = [
+    WiktionaryPage(page_id=page_id, name=name, wikitext=wikitext)
+    for page_id, (name, wikitext) in enumerate(adversarial_pages)
+]
+slow_pages = [
+    WiktionaryPage(page_id=1000 + page_id, name=name, wikitext=wikitext)
+    for page_id, (name, wikitext) in enumerate(slow_meanings_pages)
+]
+
+
+@pytest.fixture(scope="module")
+def parser():
+    parser = WiktionaryParser(validate=False)
+    # Load the language codes and parser tables before timing
+    page = WiktionaryPage(page_id=0, name="Test", wikitext=HEAD)
+    parser.parse_entry(next(parser.entries_from_page(page)))
+
+    return parser
+
+
+def run_in_thread(function) -> BaseException | None:
+    errors = []
+
+    def run():
+        try:
+            function()
+        except Exception as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+
+    return errors[0] if errors else None
+
+
+class TestEntryTimer:
+    def test_result(self):
+        with EntryTimer(1.0, 1.0, "Abend", 0) as timer:
+            assert timer.run("ipa", lambda: "ˈaːbn̩t") == "ˈaːbn̩t"
+
+    def test_parser_budget(self):
+        start = time.perf_counter()
+
+        with pytest.raises(TimeBudgetExceeded) as error:
+            with EntryTimer(None, 0.05, "Abend", 2) as timer:
+                timer.run("ipa", lambda: time.sleep(5))
+
+        # Interrupted
+        assert time.perf_counter() - start < 1
+        assert error.value.scope == "parser"
+        assert error.value.parser_name == "ipa"
+        assert error.value.seconds >= 0.05
+        assert "parser 'ipa' of entry 2 of page 'Abend'" in str(error.value)
+
+    def test_entry_budget(self):
+        with pytest.raises(TimeBudgetExceeded) as error:
+            with EntryTimer(0.1, 0.5, "Abend", 0) as timer:
+                timer.run("ipa", lambda: time.sleep(0.06))
+                timer.run("pos", lambda: time.sleep(0.06))
+
+        assert error.value.scope == "entry"
+        assert error.value.parser_name == "pos"
+        assert error.value.budget == 0.1
+
+    def test_handler_is_restored(self):
+        previous = signal.getsignal(signal.SIGALRM)
+
+        with EntryTimer(1.0, None, "Abend", 0) as timer:
+            timer.run("ipa", lambda: None)
+
+        assert signal.getsignal(signal.SIGALRM) is previous
+        assert signal.getitimer(signal.ITIMER_REAL)[0] == 0
+
+    def test_thread(self):
+        # Signals only work in the main thread, the parser runs to the end
+        start = time.perf_counter()
+
+        def run():
+            with EntryTimer(None, 0.02, "Abend", 0) as timer:
+                timer.run("ipa", lambda: time.sleep(0.1))
+
+        error = run_in_thread(run)
+
+        assert isinstance(error, TimeBudgetExceeded)
+        assert time.perf_counter() - start >= 0.1
+
+
+class TestAdversarialPages:
+    @pytest.mark.parametrize("page", pages, ids=lambda page: page.name)
+    def test_upper_bound(self, parser, page):
+        start = time.perf_counter()
+
+        for entry in parser.entries_from_page(page):
+            parser.parse_entry(entry)
+
+        assert time.perf_counter() - start < 1
+
+    @pytest.mark.parametrize("page", slow_pages, ids=lambda page: page.name)
+    def test_parser_budget(self, page):
+        parser = WiktionaryParser(validate=False, parser_time_budget=0.2)
+        (entry,) = parser.entries_from_page(page)
+        start = time.perf_counter()
+
+        with pytest.raises(TimeBudgetExceeded, match="parser 'meanings'"):
+            parser.parse_entry(entry, include_meanings=True)
+
+        assert time.perf_counter() - start < 1
+
+    def test_entry_budget(self):
+        parser = WiktionaryParser(validate=False, entry_time_budget=0.2)
+        (entry,) = parser.entries_from_page(slow_pages[0])
+        lazy = parser.parse_entry_lazy(entry)
+
+        assert lazy.language.lang_code == "de"
+        with pytest.raises(TimeBudgetExceeded, match="budget of the entry"):
+            lazy.meanings  # noqa: B018
+
+    def test_parse_pages(self, tmp_path):
+        parser = WiktionaryParser(validate=False, parser_time_budget=0.2)
+        quarantine = tmp_path / "quarantine.jsonl"
+        start = time.perf_counter()
+        results = list(
+            parser.parse_pages(
+                [*slow_pages, *pages],
+                workers=2,
+                include_meanings=True,
+                quarantine=quarantine,
+            )
+        )
+
+        assert time.perf_counter() - start < 30
+        assert len(results) == sum(
+            1 for page in pages for _ in parser.entries_from_page(page)
+        )
+
+        (failure,) = map(json.loads, quarantine.read_text().splitlines())
+        assert failure["name"] == "meanings_tags"
+        assert failure["error"].startswith("TimeBudgetExceeded")
@@ -0,0 +1,616 @@
+import json
+import os
+import random
+import re
+from importlib.metadata import EntryPoint
+from test.test_data.dump_data import dump_pages
+from test.test_data.entries_data import entries_test_data
+
+import pytest
+
+from wiktionary_de_parser import WiktionaryParser
+from wiktionary_de_parser.dump_processor.checkpoint import (
+    Checkpoint,
+    CheckpointWriter,
+)
+from wiktionary_de_parser.models import (
+    NOT_COMPUTED,
+    Language,
+    ParsedWiktionaryPageEntry,
+    WiktionaryPage,
+)
+from wiktionary_de_parser.parallel import LoadBalanceReport, PageError
+from wiktionary_de_parser.parser import Parser, registry
+from wiktionary_de_parser.parser.parse_ipa import ParseIpa
+
+pages = [
+    WiktionaryPage(page_id=page_id, name=title, wikitext=text)
+    for page_id, title, _, model, text, redirect_to in dump_pages
+    if model == "wikitext" and not redirect_to
+]
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return WiktionaryParser()
+
+
+class TestEntriesFromPage:
+    # The expression that was used to split pages before
+    ENTRY_PATTERN = re.compile(
+        r"(=== {{Wortart(?:[\w\W](?!^===? ))+)", re.MULTILINE
+    )
+
+    @staticmethod
+    def split(parser: WiktionaryParser, wikitext: str) -> list[str]:
+        page = WiktionaryPage(page_id=1, name="Test", wikitext=wikitext)
+        return [entry.wikitext for entry in parser.entries_from_page(page)]
+
+    @pytest.mark.parametrize("wikitext,expected", entries_test_data)
+    def test_entries(self, parser, wikitext, expected):
+        assert self.split(parser, wikitext) == expected
+        assert self.ENTRY_PATTERN.findall(wikitext) == expected
+
+    @pytest.mark.parametrize("page", pages, ids=lambda page: page.name)
+    def test_pages(self, parser, page):
+        assert self.split(parser, page.wikitext) == (
+            self.ENTRY_PATTERN.findall(page.wikitext)
+        )
+
+    def test_random_wikitext(self, parser):
+        parts = ["=== {{Wortart|X}}", "\n", "== ", "=== ", "==== ", "x", " "]
+        rng = random.Random(0)
+
+        for _ in range(5000):
+            wikitext = "".join(rng.choices(parts, k=rng.randint(0, 20)))
+            assert self.split(parser, wikitext) == (
+                self.ENTRY_PATTERN.findall(wikitext)
+            ), wikitext
+
+    def test_index(self, parser):
+        page = WiktionaryPage(
+            page_id=1, name="instrument", wikitext=entries_test_data[3][0]
+        )
+        entries = list(parser.entries_from_page(page))
+
+        assert [entry.index for entry in entries] == [0, 1, 2]
+        assert all(entry.page is page for entry in entries)
+
+
+class TestParseEntry:
+    @pytest.mark.parametrize("page", pages, ids=lambda page: page.name)
+    @pytest.mark.parametrize("include_meanings", [True, False])
+    def test_without_validation(self, parser, page, include_meanings):
+        for entry in parser.entries_from_page(page):
+            validated = parser.parse_entry(entry, include_meanings)
+            trusted = parser.parse_entry(
+                entry, include_meanings, validate=False
+            )
+
+            assert isinstance(trusted, ParsedWiktionaryPageEntry)
+            assert trusted == validated
+            assert trusted.model_dump() == validated.model_dump()
+            # The output doesn't depend on "validate"
+            assert list(trusted.model_dump()) == list(validated.model_dump())
+            assert trusted.model_dump_json() == validated.model_dump_json()
+
+    def test_parser_setting(self):
+        parser = WiktionaryParser(validate=False)
+        entry = next(parser.entries_from_page(pages[0]))
+        result = parser.parse_entry(entry)
+
+        assert result.name == "Abend"
+        assert result.language == Language(lang="Deutsch", lang_code="de")
+        assert result.meanings is None
+        assert result.model_fields_set == {
+            "name",
+            "flexion",
+            "hyphenation",
+            "ipa",
+            "language",
+            "lemma",
+            "pos",
+            "rhymes",
+        }
+
+
+class TestFieldSelection:
+    FIELDS = {"lemma", "pos", "flexion"}
+
+    @pytest.fixture
+    def entry(self, parser):
+        return next(parser.entries_from_page(pages[0]))
+
+    @pytest.mark.parametrize("validate", [True, False])
+    def test_fields(self, parser, entry, monkeypatch, validate):
+        expected = parser.parse_entry(entry)
+
+        def fail(self):
+            raise AssertionError(f"{self.name} should not run")
+
+        monkeypatch.setattr(ParseIpa, "run", fail)
+        result = parser.parse_entry(
+            entry, validate=validate, fields=self.FIELDS
+        )
+
+        for field in ("lemma", "pos", "flexion", "name"):
+            assert getattr(result, field) == getattr(expected, field)
+        for field in ("hyphenation", "ipa", "language", "rhymes", "meanings"):
+            assert getattr(result, field) is NOT_COMPUTED
+
+    def test_parser_default(self, entry):
+        parser = WiktionaryParser(fields=self.FIELDS)
+        result = parser.parse_entry(entry)
+
+        assert result.lemma.lemma == "Abend"
+        assert result.ipa is NOT_COMPUTED
+        # Overridden per call
+        assert parser.parse_entry(entry, fields={"ipa"}).ipa == ["ˈaːbn̩t"]
+
+    def test_include_meanings(self, parser, entry):
+        result = parser.parse_entry(entry, include_meanings=True, fields=[])
+
+        assert result.meanings is None
+        assert result.lemma is NOT_COMPUTED
+
+    def test_not_computed(self):
+        assert not NOT_COMPUTED
+        assert NOT_COMPUTED is not None
+
+    def test_unknown_field(self, parser, entry):
+        with pytest.raises(ValueError, match="ipaa"):
+            parser.parse_entry(entry, fields={"ipaa"})
+        with pytest.raises(ValueError):
+            WiktionaryParser(fields={"ipaa"})
+
+
+class TestWhere:
+    PAGE = WiktionaryPage(
+        page_id=1,
+        name="Rock",
+        wikitext="""== Rock ({{Sprache|Deutsch}}) ==
+=== {{Wortart|Substantiv|Deutsch}}, {{m}} ===
+
+{{Aussprache}}
+:{{IPA}} {{Lautschrift|ʁɔk}}
+
+== rock ({{Sprache|Englisch}}) ==
+=== {{Wortart|Substantiv|Englisch}} ===
+
+{{Aussprache}}
+:{{IPA}} {{Lautschrift|ɹɒk}}
+""",
+    )
+
+    @staticmethod
+    def german(language):
+        return language.lang_code == "de"
+
+    @pytest.mark.parametrize("validate", [True, False])
+    def test_where(self, parser, validate):
+        results = [
+            parser.parse_entry(
+                entry, validate=validate, where={"language": self.german}
+            )
+            for entry in parser.entries_from_page(self.PAGE)
+        ]
+
+        assert results[1] is None
+        assert results[0] == parser.parse_entry(
+            next(parser.entries_from_page(self.PAGE))
+        )
+
+    def test_cheap_parsers_first(self, parser, monkeypatch):
+        calls = []
+        run = ParseIpa.run
+
+        def counting_run(self):
+            calls.append(self.entry.index)
+            return run(self)
+
+        monkeypatch.setattr(ParseIpa, "run", counting_run)
+        where = {"language": self.german, "ipa": lambda ipa: True}
+
+        for entry in parser.entries_from_page(self.PAGE):
+            parser.parse_entry(entry, where=where)
+
+        # The IPA parser only runs for the German entry
+        assert calls == [0]
+
+    def test_where_with_fields(self):
+        parser = WiktionaryParser(
+            fields={"lemma"}, where={"pos": lambda pos: "Substantiv" in pos}
+        )
+        result = parser.parse_entry(next(parser.entries_from_page(self.PAGE)))
+
+        assert result.pos == {"Substantiv": []}
+        assert result.lemma.lemma == "Rock"
+        assert result.ipa is NOT_COMPUTED
+
+    def test_name(self, parser):
+        entry = next(parser.entries_from_page(self.PAGE))
+
+        assert parser.parse_entry(entry, where={"name": str.islower}) is None
+
+    def test_unknown_field(self, parser):
+        entry = next(parser.entries_from_page(self.PAGE))
+
+        with pytest.raises(ValueError):
+            parser.parse_entry(entry, where={"ipaa": bool})
+
+
+class TestParseEntryLazy:
+    @pytest.mark.parametrize("page", pages, ids=lambda page: page.name)
+    @pytest.mark.parametrize("include_meanings", [True, False])
+    def test_to_model(self, parser, page, include_meanings):
+        for entry in parser.entries_from_page(page):
+            lazy = parser.parse_entry_lazy(entry)
+
+            assert lazy.to_model(include_meanings) == parser.parse_entry(
+                entry, include_meanings
+            )
+
+    @pytest.mark.parametrize("include_meanings", [True, False])
+    def test_field_order(self, parser, monkeypatch, include_meanings):
+        entry = next(parser.entries_from_page(pages[0]))
+        orders = []
+        create_result = parser.create_result
+
+        def recording_create_result(results, validate=None):
+            orders.append(list(results))
+            return create_result(results, validate)
+
+        monkeypatch.setattr(parser, "create_result", recording_create_result)
+        parser.parse_entry(entry, include_meanings)
+        parser.parse_entry_lazy(entry).to_model(include_meanings)
+
+        assert orders[0] == orders[1]
+
+    def test_fields_on_access(self, parser, monkeypatch):
+        entry = next(parser.entries_from_page(pages[0]))
+        calls = []
+        run = ParseIpa.run
+
+        def counting_run(self):
+            calls.append(self.name)
+            return run(self)
+
+        monkeypatch.setattr(ParseIpa, "run", counting_run)
+        lazy = parser.parse_entry_lazy(entry)
+
+        assert lazy.name == "Abend"
+        assert lazy.computed_fields == set()
+        assert lazy.ipa == ["ˈaːbn̩t"]
+        assert lazy.ipa == ["ˈaːbn̩t"]
+        assert calls == ["ipa"]
+        assert lazy.computed_fields == {"ipa"}
+        assert "ipa=" in repr(lazy)
+
+    def test_accessed_meanings(self, parser):
+        entry = next(parser.entries_from_page(pages[0]))
+        lazy = parser.parse_entry_lazy(entry)
+
+        assert lazy.meanings is None
+        assert "meanings" in lazy.to_model().model_fields_set
+
+    def test_unknown_attribute(self, parser):
+        lazy = parser.parse_entry_lazy(next(parser.entries_from_page(pages[0])))
+
+        with pytest.raises(AttributeError):
+            lazy.ipaa  # noqa: B018
+
+
+def is_german(language) -> bool:
+    return language.lang_code == "de"
+
+
+def fails_for_english(language) -> bool:
+    if language.lang_code == "en":
+        raise ValueError("Broken entry")
+    return True
+
+
+def crashes_worker(name) -> bool:
+    if name == "Absturz":
+        os._exit(1)
+    return True
+
+
+class TestParsePages:
+    PAGES = [
+        WiktionaryPage(
+            page_id=index * 100 + page.page_id,
+            name=page.name,
+            wikitext=page.wikitext,
+        )
+        for index in range(20)
+        for page in [*pages, TestWhere.PAGE]
+    ]
+
+    @staticmethod
+    def parse_sequential(parser, pages, include_meanings=False):
+        return [
+            result
+            for page in pages
+            for entry in parser.entries_from_page(page)
+            if (result := parser.parse_entry(entry, include_meanings))
+        ]
+
+    @pytest.mark.parametrize("include_meanings", [True, False])
+    def test_ordered(self, parser, include_meanings):
+        results = list(
+            parser.parse_pages(
+                self.PAGES,
+                workers=2,
+                chunk_size=7,
+                include_meanings=include_meanings,
+            )
+        )
+
+        assert results == self.parse_sequential(
+            parser, self.PAGES, include_meanings
+        )
+
+    def test_unordered(self, parser):
+        results = parser.parse_pages(
+            self.PAGES, workers=3, chunk_size=5, ordered=False
+        )
+
+        assert sorted(map(repr, results)) == sorted(
+            map(repr, self.parse_sequential(parser, self.PAGES))
+        )
+
+    def test_parser_settings(self):
+        parser = WiktionaryParser(
+            validate=False, fields={"language"}, where={"language": is_german}
+        )
+        results = list(parser.parse_pages(self.PAGES, workers=2))
+
+        assert results == self.parse_sequential(parser, self.PAGES)
+        assert {result.language.lang_code for result in results} == {"de"}
+        assert all(result.ipa is NOT_COMPUTED for result in results)
+
+    def test_threads(self):
+        # Predicates don't need to be picklable in threads
+        parser = WiktionaryParser(
+            validate=False,
+            where={"language": lambda language: language.lang_code == "de"},
+        )
+        report = LoadBalanceReport()
+        results = list(
+            parser.parse_pages(
+                self.PAGES,
+                workers=3,
+                chunk_size=5,
+                executor="thread",
+                report=report,
+            )
+        )
+
+        assert results == self.parse_sequential(parser, self.PAGES)
+        assert {result.language.lang_code for result in results} == {"de"}
+        assert sum(w.pages for w in report.workers.values()) == len(self.PAGES)
+
+    @pytest.mark.parametrize("shared_memory_size", [0, 2000])
+    def test_shared_memory_size(self, parser, shared_memory_size):
+        # With 2000 bytes, some tasks don't fit and are pickled
+        results = parser.parse_pages(
+            self.PAGES,
+            workers=2,
+            chunk_size=3,
+            shared_memory_size=shared_memory_size,
+        )
+
+        assert list(results) == self.parse_sequential(parser, self.PAGES)
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_decode(self, parser, ordered):
+        results = parser.parse_pages(
+            self.PAGES, workers=3, chunk_size=5, ordered=ordered, decode=False
+        )
+        models = [result.to_model() for result in results]
+
+        assert sorted(map(repr, models)) == sorted(
+            map(repr, self.parse_sequential(parser, self.PAGES))
+        )
+
+    def test_unknown_executor(self, parser):
+        with pytest.raises(ValueError, match="Unknown executor"):
+            next(parser.parse_pages(self.PAGES, executor="fibers"))
+
+    def test_adaptive_tasks(self, parser):
+        report = LoadBalanceReport()
+        results = list(parser.parse_pages(self.PAGES, workers=2, report=report))
+
+        assert results == self.parse_sequential(parser, self.PAGES)
+        assert report.wall_seconds > 0
+        assert sum(w.pages for w in report.workers.values()) == len(self.PAGES)
+        assert 0 < max(report.utilization().values()) <= 1
+
+    @pytest.mark.parametrize("executor", ["process", "thread"])
+    def test_quarantine(self, parser, tmp_path, executor):
+        failing_parser = WiktionaryParser(where={"language": fails_for_english})
+        quarantine = tmp_path / "quarantine.jsonl"
+        report = LoadBalanceReport()
+        results = list(
+            failing_parser.parse_pages(
+                self.PAGES,
+                workers=2,
+                chunk_size=5,
+                executor=executor,
+                quarantine=quarantine,
+                report=report,
+            )
+        )
+        expected = self.parse_sequential(parser, self.PAGES)
+
+        # The other entries of the pages are still parsed
+        assert results == [r for r in expected if r.language.lang_code != "en"]
+
+        failures = list(map(json.loads, quarantine.read_text().splitlines()))
+        english = [r for r in expected if r.language.lang_code == "en"]
+        assert len(failures) == report.failures == len(english)
+        page = next(p for p in self.PAGES if p.name == failures[0]["name"])
+        assert failures[0]["page_id"] == page.page_id
+        assert failures[0]["wikitext"] == page.wikitext
+        assert failures[0]["entry"] == 0
+        assert failures[0]["error"] == "ValueError: Broken entry"
+        assert "fails_for_english" in failures[0]["traceback"]
+
+    def test_page_error(self):
+        failing_parser = WiktionaryParser(where={"language": fails_for_english})
+
+        with pytest.raises(PageError, match="'house' \\(7, entry 0\\)"):
+            list(failing_parser.parse_pages(self.PAGES, workers=2))
+
+    @pytest.mark.parametrize("decode", [True, False])
+    def test_worker_crash(self, parser, tmp_path, decode):
+        crashing_parser = WiktionaryParser(where={"name": crashes_worker})
+        crash = WiktionaryPage(
+            page_id=9999, name="Absturz", wikitext=TestWhere.PAGE.wikitext
+        )
+        quarantine = tmp_path / "quarantine.jsonl"
+        report = LoadBalanceReport()
+        results = crashing_parser.parse_pages(
+            [*self.PAGES[:30], crash, *self.PAGES[30:]],
+            workers=2,
+            chunk_size=4,
+            decode=decode,
+            retries=1,
+            quarantine=quarantine,
+            report=report,
+        )
+        if not decode:
+            results = (result.to_model() for result in results)
+
+        assert list(results) == self.parse_sequential(parser, self.PAGES)
+
+        (failure,) = map(json.loads, quarantine.read_text().splitlines())
+        assert failure["page_id"] == 9999
+        assert failure["entry"] is None
+        assert failure["error"].startswith("BrokenProcessPool")
+        # The crash of the task, of the page alone and of its retry
+        assert report.restarts >= 3
+
+    @pytest.mark.parametrize("executor", ["process", "thread"])
+    def test_checkpoint(self, parser, multistream_dump, tmp_path, executor):
+        path = tmp_path / "checkpoint.json"
+        output = []
+        writer = CheckpointWriter(
+            multistream_dump, path, every=1, state=lambda: len(output)
+        )
+        results = parser.parse_pages(
+            multistream_dump.pages(),
+            workers=2,
+            chunk_size=1,
+            executor=executor,
+            checkpoint=writer,
+        )
+
+        for result in results:
+            output.append(result)
+            if result.name == "Haus":
+                # Killed before the page was done
+                break
+        results.close()
+
+        checkpoint = Checkpoint.load(path)
+        assert checkpoint.page_id == 1
+        del output[checkpoint.state :]
+        output.extend(
+            parser.parse_pages(
+                multistream_dump.pages(resume_from=checkpoint),
+                workers=2,
+                chunk_size=1,
+                executor=executor,
+            )
+        )
+
+        assert output == self.parse_sequential(parser, multistream_dump.pages())
+
+    def test_checkpoint_unordered(self, parser, multistream_dump, tmp_path):
+        writer = CheckpointWriter(multistream_dump, tmp_path / "checkpoint")
+
+        with pytest.raises(ValueError, match="ordered"):
+            next(
+                parser.parse_pages(self.PAGES, ordered=False, checkpoint=writer)
+            )
+
+    def test_pages_are_streamed(self, parser):
+        read = 0
+
+        def generate_pages():
+            nonlocal read
+            for page in self.PAGES:
+                read += 1
+                yield page
+
+        results = parser.parse_pages(generate_pages(), workers=2, chunk_size=2)
+        next(results)
+
+        # At most two tasks per worker (and the next task) are read ahead
+        assert read <= 2 * 2 * 2 + 2
+        results.close()
+
+
+class ParseUppercaseName(Parser):
+    name = "uppercase_name"
+
+    def run(self):
+        return self.entry.page.name.upper()
+
+
+@pytest.fixture
+def plugin_entry_points(monkeypatch):
+    def set_entry_points(*values: str):
+        monkeypatch.setattr(
+            registry,
+            "entry_points",
+            lambda group: [
+                EntryPoint(name=value, value=value, group=group)
+                for value in values
+            ],
+        )
+        registry.get_parser_classes.cache_clear()
+
+    yield set_entry_points
+
+    registry.get_parser_classes.cache_clear()
+
+
+class TestParserRegistry:
+    def test_parser_classes(self):
+        classes = WiktionaryParser().parser_classes
+
+        assert [parser_class.name for parser_class in classes] == [
+            "flexion",
+            "hyphenation",
+            "ipa",
+            "language",
+            "lemma",
+            "meanings",
+            "pos",
+            "rhymes",
+        ]
+        # Same class as the regular import
+        assert ParseIpa in classes
+
+    def test_classes_are_loaded_once(self):
+        assert registry.get_parser_classes() is registry.get_parser_classes()
+
+    @pytest.mark.parametrize("validate", [True, False])
+    def test_entry_point(self, plugin_entry_points, validate):
+        plugin_entry_points("test.test_wiktionary_parser:ParseUppercaseName")
+        parser = WiktionaryParser(validate=validate)
+        entry = next(parser.entries_from_page(pages[0]))
+        result = parser.parse_entry(entry)
+
+        assert ParseUppercaseName in parser.parser_classes
+        assert result.uppercase_name == "ABEND"
+        assert result.name == "Abend"
+
+    def test_invalid_entry_point(self, plugin_entry_points):
+        plugin_entry_points("test.test_wiktionary_parser:pages")
+
+        with pytest.raises(TypeError):
+            WiktionaryParser()
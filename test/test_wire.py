@@ -0,0 +1,152 @@
+import pickle
+from test.test_data.dump_data import dump_pages
+
+import pytest
+
+from wiktionary_de_parser import WiktionaryParser
+from wiktionary_de_parser.models import (
+    NOT_COMPUTED,
+    Language,
+    Lemma,
+    ParsedWiktionaryPageEntry,
+    ReferenceType,
+    WiktionaryPage,
+)
+from wiktionary_de_parser.wire import (
+    EncodedResult,
+    ResultDecoder,
+    ResultEncoder,
+)
+
+pages = [
+    WiktionaryPage(page_id=page_id, name=title, wikitext=text)
+    for page_id, title, _, model, text, redirect_to in dump_pages
+    if model == "wikitext" and not redirect_to
+]
+
+
+def parse(parser, include_meanings=True):
+    return [
+        parser.parse_entry(entry, include_meanings=include_meanings)
+        for page in pages
+        for entry in parser.entries_from_page(page)
+    ]
+
+
+def round_trip(results):
+    encoder = ResultEncoder()
+    decoder = ResultDecoder()
+
+    return list(decoder.decode_all(encoder.encode_all(results)))
+
+
+class TestWire:
+    @pytest.mark.parametrize("validate", [True, False])
+    @pytest.mark.parametrize("include_meanings", [True, False])
+    def test_round_trip(self, validate, include_meanings):
+        results = parse(WiktionaryParser(validate=validate), include_meanings)
+        decoded = round_trip(results)
+
+        assert decoded == results
+        if validate:
+            # Validated models have their fields in the order of the model
+            assert list(map(repr, decoded)) == list(map(repr, results))
+
+    def test_not_computed_and_extra_fields(self):
+        result = ParsedWiktionaryPageEntry(
+            name="Abend",
+            hyphenation=NOT_COMPUTED,
+            flexion=None,
+            ipa=NOT_COMPUTED,
+            language=Language(lang="Deutsch", lang_code="de"),
+            lemma=Lemma(lemma="Abend", reference_type=ReferenceType.VARIANT),
+            pos={"Substantiv": ["Toponym"]},
+            rhymes=None,
+            meanings=[{"text": "a", "sublist": [{"tags": ["b"]}]}],
+            plugin={"x": 1},
+        )
+
+        (decoded,) = round_trip([result])
+
+        assert decoded == result
+        assert decoded.hyphenation is NOT_COMPUTED
+        assert decoded.lemma.reference_type is ReferenceType.VARIANT
+        assert decoded.plugin == {"x": 1}
+
+    def test_strings_are_sent_once(self):
+        results = parse(WiktionaryParser())
+        encoder = ResultEncoder()
+        decoder = ResultDecoder()
+
+        first = encoder.encode_all(results)
+        second = encoder.encode_all(results)
+
+        assert first[1] == 0
+        assert "Deutsch" in first[2]
+        assert second[1] == len(first[2])
+        assert second[2] == []
+        assert list(decoder.decode_all(first)) == results
+        assert list(decoder.decode_all(second)) == results
+
+        # The strings of the first task are missing
+        with pytest.raises(ValueError, match="start at"):
+            ResultDecoder().decode_all(second)
+
+    def test_new_encoder(self):
+        # A restarted worker may get the process id of a crashed worker,
+        # its encoder still gets its own string table
+        results = parse(WiktionaryParser())
+        decoder = ResultDecoder()
+
+        decoder.add_results(ResultEncoder().encode_all(results))
+        encoded = ResultEncoder().encode_all(results)
+
+        assert list(decoder.decode_all(encoded)) == results
+
+
+@pytest.fixture(scope="module")
+def results():
+    return parse(WiktionaryParser(), include_meanings=True)
+
+
+@pytest.fixture(scope="module")
+def encoded(results):
+    encoder = ResultEncoder()
+    decoder = ResultDecoder()
+
+    return decoder.wrap_all(encoder.encode_all(results))
+
+
+class TestEncodedResult:
+    def test_fields(self, results, encoded):
+        for result, encoded_result in zip(results, encoded, strict=True):
+            assert isinstance(encoded_result, EncodedResult)
+            assert encoded_result.name == result.name
+            assert encoded_result.language == result.language
+            assert encoded_result.meanings == result.meanings
+            assert encoded_result.to_model() == result
+
+    def test_extra_fields(self):
+        encoder = ResultEncoder()
+        decoder = ResultDecoder()
+        result = ParsedWiktionaryPageEntry(
+            name="Abend",
+            hyphenation=None,
+            flexion=None,
+            ipa=None,
+            language=Language(lang=None, lang_code=None),
+            lemma=Lemma(lemma="Abend"),
+            pos=None,
+            rhymes=None,
+            plugin=[1],
+        )
+        (encoded,) = decoder.wrap_all(encoder.encode_all([result]))
+
+        assert encoded.plugin == [1]
+        with pytest.raises(AttributeError):
+            encoded.missing  # noqa: B018
+
+    def test_pickle(self, encoded):
+        assert pickle.loads(pickle.dumps(encoded[0])).to_model() == (
+            encoded[0].to_model()
+        )
@@ -1,55 +1,107 @@
-import importlib.util
-import inspect
-import re
-from pathlib import Path
-from typing import Type
-
-from wiktionary_de_parser.models import (
-    ParsedWiktionaryPageEntry,
-    WiktionaryPage,
-    WiktionaryPageEntry,
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import time
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from typing import TYPE_CHECKING, Any, Type
+
+from wiktionary_de_parser.lazy import LazyParsedWiktionaryPageEntry
+from wiktionary_de_parser.parallel import (
+    AdaptiveBatcher,
+    LoadBalanceReport,
+    PageError,
+    PageFailure,
+    WorkerInitError,
+    chunked,
+    init_worker,
+    page_id_of,
+    parse_pages_chunk,
+    parse_pages_with,
+    release_shared_pages,
+    share_pages,
+    split_task,
+    unshare_pages,
 )
-from wiktionary_de_parser.parser import Parser
+from wiktionary_de_parser.parser.context import EntryContext
+from wiktionary_de_parser.parser.registry import get_parser_classes
+from wiktionary_de_parser.records import WiktionaryPage, WiktionaryPageEntry
+from wiktionary_de_parser.utils.concurrency import TaskRunner
+from wiktionary_de_parser.utils.entries import entry_spans
+from wiktionary_de_parser.utils.time_budget import EntryTimer
+
+if TYPE_CHECKING:
+    from wiktionary_de_parser.dump_processor.checkpoint import CheckpointWriter
+    from wiktionary_de_parser.models import ParsedWiktionaryPageEntry
+    from wiktionary_de_parser.parser import Parser
+
+# Executors of "WiktionaryParser.parse_pages"
+PROCESS = "process"
+THREAD = "thread"
+
+# Size of the shared memory of "WiktionaryParser.parse_pages"
+DEFAULT_SHARED_MEMORY_SIZE = 64 * 1024 * 1024
+
+# Predicates by field, e.g. {"language": lambda lang: lang.lang_code == "de"}
+Where = Mapping[str, Callable[[Any], bool]]
 
 
 class WiktionaryParser:
     parser_classes: list[Type[Parser]]
 
-    def __init__(self):
+    def __init__(
+        self,
+        validate: bool = True,
+        fields: Iterable[str] | None = None,
+        where: Where | None = None,
+        entry_time_budget: float | None = None,
+        parser_time_budget: float | None = None,
+    ):
+        """
+        If "validate" is False, results of "parse_entry" are created without
+        pydantic validation. The parsers already return the correct types,
+        so this only skips (redundant) work.
+
+        "fields" and "where" are the defaults for "parse_entry".
+
+        "entry_time_budget" and "parser_time_budget" limit the seconds that
+        "parse_entry" spends on an entry, and on every parser of it. An
+        entry that exceeds its budget is cut off with TimeBudgetExceeded
+        (with the page name, the parser and the elapsed time). In the main
+        thread (e.g. of the worker processes of "parse_pages") the parser
+        is interrupted when the budget runs out, in other threads the time
+        is checked after every parser (see EntryTimer).
+        """
         self.parser_classes = self.find_parser_classes()
+        self.validate = validate
+        self.fields = self.check_fields(fields)
+        self.where = where
+        self.check_fields(where)
+        self.entry_time_budget = entry_time_budget
+        self.parser_time_budget = parser_time_budget
 
     @staticmethod
     def find_parser_classes():
-        path = Path(__file__).parent / "parser"
-        parent_class = Parser
-        classes: list[Type[Parser]] = []
-
-        for child in path.iterdir():
-            if (
-                child.is_file()
-                and child.name.endswith(".py")
-                and child.name != "__init__.py"
-            ):
-                module_name = child.stem  # Entfernen Sie die .py-Endung
-                spec = importlib.util.spec_from_file_location(
-                    module_name, child
-                )
+        return list(get_parser_classes())
 
-                if not spec or not spec.loader:
-                    raise Exception(f"Could not load {child}")
+    def check_fields(self, fields: Iterable[str] | None) -> set[str] | None:
+        """
+        Raise a ValueError if a field has no parser.
+        """
+        if fields is None:
+            return None
 
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
+        fields = set(fields)
+        unknown = fields - {"name"} - {c.name for c in self.parser_classes}
 
-                for _, obj in inspect.getmembers(module):
-                    if (
-                        inspect.isclass(obj)
-                        and issubclass(obj, parent_class)
-                        and (obj != parent_class)
-                    ):
-                        classes.append(obj)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
 
-        return classes
+        return fields
 
     def entries_from_page(self, page: WiktionaryPage):
         """
@@ -64,35 +116,363 @@ class WiktionaryParser:
         if not page.wikitext:
             return
 
-        entries: list[str] = re.findall(
-            r"(=== {{Wortart(?:[\w\W](?!^===? ))+)", page.wikitext, re.MULTILINE
-        )
-
-        for index, entry in enumerate(entries):
+        for index, (start, end) in enumerate(entry_spans(page.wikitext)):
             yield WiktionaryPageEntry(
                 page=page,
                 index=index,
-                wikitext=entry,
+                wikitext=page.wikitext[start:end],
             )
 
     def parse_entry(
         self,
         wiktionary_entry: WiktionaryPageEntry,
         include_meanings: bool = False,
-    ):
+        validate: bool | None = None,
+        fields: Iterable[str] | None = None,
+        where: Where | None = None,
+    ) -> ParsedWiktionaryPageEntry | None:
         """
         Parses an entry of a page.
+
+        "validate" overrides the "validate" setting of the parser.
+
+        If "fields" is set (here or for the parser), only the parsers of these
+        fields run, e.g. fields={"lemma", "pos"}. The other fields are set to
+        NOT_COMPUTED. "include_meanings" adds "meanings" to the fields.
+
+        "where" maps fields to predicates, which are called with the result of
+        the field, e.g.:
+            where={"language": lambda language: language.lang_code == "de"}
+        The parsers of these fields run first (cheapest first). If a predicate
+        returns False, None is returned without running the other parsers.
         """
+        # Imported here, so importing the package doesn't import pydantic
+        from wiktionary_de_parser.models import NOT_COMPUTED
 
-        # Instantiate all subclasses and run them
-        results = {
-            instance.name: instance.run()
-            for subclass in self.parser_classes
-            if (instance := subclass(wiktionary_entry))
-            and (include_meanings or instance.name != "meanings")
-        }
+        if fields is None:
+            fields = self.fields
+        else:
+            fields = self.check_fields(fields)
+
+        if fields is not None and include_meanings:
+            fields = fields | {"meanings"}
+
+        if where is None:
+            where = self.where
+        else:
+            self.check_fields(where)
+
+        if where and "name" in where:
+            if not where["name"](wiktionary_entry.page.name):
+                return None
+
+        # Instantiate the subclasses and run them. The context (e.g. the
+        # sections of the entry) is shared by all parsers.
+        context = EntryContext(wiktionary_entry.wikitext)
+        results = {}
+        timer = self.entry_timer(wiktionary_entry)
+
+        with timer or nullcontext():
+            if where:
+                filter_classes = sorted(
+                    (c for c in self.parser_classes if c.name in where),
+                    key=lambda parser_class: parser_class.cost,
+                )
+                for subclass in filter_classes:
+                    result = self.run_parser(
+                        subclass, wiktionary_entry, context, timer
+                    )
+                    if not where[subclass.name](result):
+                        return None
+                    results[subclass.name] = result
+
+            for subclass in self.parser_classes:
+                name = subclass.name
+
+                if name in results:
+                    continue
+                if fields is not None and name not in fields:
+                    results[name] = NOT_COMPUTED
+                elif (
+                    fields is not None or include_meanings or name != "meanings"
+                ):
+                    results[name] = self.run_parser(
+                        subclass, wiktionary_entry, context, timer
+                    )
 
         # Add the page name
         results["name"] = wiktionary_entry.page.name
 
+        return self.create_result(results, validate)
+
+    def entry_timer(
+        self, wiktionary_entry: WiktionaryPageEntry
+    ) -> EntryTimer | None:
+        if self.entry_time_budget is None and self.parser_time_budget is None:
+            return None
+
+        return EntryTimer(
+            self.entry_time_budget,
+            self.parser_time_budget,
+            wiktionary_entry.page.name,
+            wiktionary_entry.index,
+        )
+
+    @staticmethod
+    def run_parser(
+        parser_class: Type[Parser],
+        wiktionary_entry: WiktionaryPageEntry,
+        context: EntryContext,
+        timer: EntryTimer | None,
+    ):
+        parser = parser_class(wiktionary_entry, context)
+
+        if timer is None:
+            return parser.run()
+
+        return timer.run(parser_class.name, parser.run)
+
+    def parse_pages(
+        self,
+        pages: Iterable[WiktionaryPage],
+        workers: int | None = None,
+        chunk_size: int | None = None,
+        ordered: bool = True,
+        include_meanings: bool = False,
+        report: LoadBalanceReport | None = None,
+        executor: str = PROCESS,
+        shared_memory_size: int = DEFAULT_SHARED_MEMORY_SIZE,
+        decode: bool = True,
+        retries: int = 2,
+        quarantine: str | os.PathLike | None = None,
+        checkpoint: CheckpointWriter | None = None,
+    ):
+        """
+        Parse the entries of pages in multiple processes (or threads, see
+        below) and yield the results. Pages are read from "pages" (e.g.
+        "WiktionaryDump.pages()") while they are parsed, and sent to the
+        workers in tasks. At most two tasks per worker are in flight, so
+        memory usage stays bounded.
+
+        By default, tasks are sized by the wikitext size of their pages and
+        adapt to the measured parsing speed (see AdaptiveBatcher). With
+        "chunk_size", every task has this number of pages instead.
+
+        Statistics about the workers are collected in "report" (see
+        LoadBalanceReport).
+
+        Every worker creates one parser with the settings of this parser
+        ("validate", "fields", "where", whose predicates must be picklable
+        if processes are spawned, and the time budgets). Entries that don't
+        match "where" are skipped, entries that exceed their time budget
+        fail (see below).
+
+        If "ordered" is True, results are yielded in the order of the pages.
+        Otherwise they are yielded as soon as a task is done, so one slow
+        task doesn't hold back the others.
+
+        Errors are caught for every entry, the other entries of the page and
+        the task are still yielded. A task that fails as a whole is split
+        into its pages, which are retried up to "retries" times. If a worker
+        process crashes (e.g. segfaults or runs out of memory), the pool is
+        restarted and the tasks that were running are repeated one at a
+        time, to find the page that crashes it. Pages (or entries) that fail
+        are written to "quarantine" as JSON lines (see PageFailure, with the
+        page_id and wikitext to reproduce the error), without "quarantine"
+        the first failure is raised as PageError.
+
+        Worker processes get the wikitext of the pages through a shared
+        memory ring buffer of "shared_memory_size" bytes: only offsets are
+        pickled, and the workers decode the text directly from the shared
+        memory. Tasks that don't fit into the buffer (while it is filled
+        with the tasks in flight) are pickled. Set "shared_memory_size" to
+        0 to pickle all pages.
+
+        With decode=False, worker processes send their results in a compact
+        format with interned strings instead of pickled models (see
+        wire.py), and results are yielded as EncodedResult, whose fields are
+        decoded when they are accessed ("to_model()" decodes all fields).
+        The parent process then only unpickles small tuples, so it doesn't
+        limit the throughput on many cores. This only applies to worker
+        processes, threads always yield ParsedWiktionaryPageEntry.
+
+        With executor="thread", pages are parsed in a thread pool instead.
+        All threads share this parser, the parser classes and the lookup
+        tables, and pages and results aren't pickled. This scales across
+        cores on free-threaded Python builds (3.13t and later) with much
+        less memory than processes. With the GIL, threads parse one page at
+        a time.
+
+        "checkpoint" (a CheckpointWriter of the dump that "pages" are read
+        from) is told about the pages of every task once all results of the
+        task were yielded and the caller asked for the next one. Resume with
+        "WiktionaryDump.pages(resume_from=...)" as "pages". Checkpoints need
+        "ordered".
+        """
+        if checkpoint is not None and not ordered:
+            raise ValueError("Checkpoints need ordered=True.")
+
+        workers = workers or os.cpu_count() or 1
+        shared_buffer = None
+        on_done = None
+        on_result = None
+        decoder = None
+
+        if executor == PROCESS:
+            if shared_memory_size > 0:
+                from wiktionary_de_parser.utils.shared_memory import (
+                    SharedRingBuffer,
+                )
+
+                shared_buffer = SharedRingBuffer(shared_memory_size)
+                on_done = partial(release_shared_pages, shared_buffer)
+
+            if not decode:
+                from wiktionary_de_parser.wire import ResultDecoder
+
+                decoder = ResultDecoder()
+
+                # Strings must be added in the order in which every worker
+                # sent them, which is the order the tasks are completed in
+                def on_result(result):
+                    decoder.add_results(result[0])
+
+            make_pool = partial(
+                ProcessPoolExecutor,
+                max_workers=workers,
+                initializer=init_worker,
+                initargs=(
+                    self.validate,
+                    self.fields,
+                    self.where,
+                    include_meanings,
+                    shared_buffer.name if shared_buffer else None,
+                    not decode,
+                    self.entry_time_budget,
+                    self.parser_time_budget,
+                ),
+            )
+            parse_task = parse_pages_chunk
+        elif executor == THREAD:
+            make_pool = partial(
+                ThreadPoolExecutor,
+                max_workers=workers,
+                thread_name_prefix="parse_pages",
+            )
+            parse_task = partial(parse_pages_with, self, include_meanings)
+        else:
+            raise ValueError(
+                f"Unknown executor {executor!r} "
+                f"(expected {PROCESS!r} or {THREAD!r})."
+            )
+
+        batcher = AdaptiveBatcher()
+        tasks = (
+            chunked(pages, chunk_size)
+            if chunk_size is not None
+            else batcher.batches(pages)
+        )
+        if shared_buffer is not None:
+            tasks = (share_pages(shared_buffer, *task) for task in tasks)
+        runner = TaskRunner(
+            make_pool,
+            parse_task,
+            tasks,
+            max_in_flight=workers * 2,
+            ordered=ordered,
+            retries=retries,
+            split=split_task,
+            on_result=on_result,
+            on_done=on_done,
+            fatal=(WorkerInitError,),
+        )
+        task_parts = iter(runner)
+        quarantine_file = None
+        start = time.perf_counter()
+
+        try:
+            if quarantine is not None:
+                quarantine_file = open(quarantine, "a", encoding="utf-8")
+
+            for parts in task_parts:
+                for (task_pages,), outcome, error in parts:
+                    if error is not None:
+                        # The region of the task is released after this loop
+                        failures = [
+                            PageFailure.from_error(page, error)
+                            for page in unshare_pages(
+                                shared_buffer.memory if shared_buffer else None,
+                                task_pages,
+                            )
+                        ]
+                        results = []
+                    else:
+                        results, stats, failures = outcome
+                        batcher.record(stats.seconds, stats.size)
+                        if report is not None:
+                            report.add_task(stats)
+
+                        if decoder is not None:
+                            results = decoder.wrap(results)
+
+                    for failure in failures:
+                        if quarantine_file is None:
+                            raise PageError(failure)
+
+                        quarantine_file.write(
+                            json.dumps(
+                                dataclasses.asdict(failure), ensure_ascii=False
+                            )
+                            + "\n"
+                        )
+
+                    if report is not None:
+                        report.failures += len(failures)
+
+                    yield from results
+
+                if checkpoint is not None:
+                    (last_pages,), _, _ = parts[-1]
+                    checkpoint.done(
+                        page_id_of(last_pages[-1]),
+                        sum(len(task_pages) for (task_pages,), _, _ in parts),
+                    )
+
+            if checkpoint is not None:
+                checkpoint.save()
+        finally:
+            # Stop the workers before the shared memory is closed
+            task_parts.close()
+            if report is not None:
+                report.wall_seconds = time.perf_counter() - start
+                report.retried = runner.retried
+                report.restarts = runner.broken
+            if quarantine_file is not None:
+                quarantine_file.close()
+            if shared_buffer is not None:
+                shared_buffer.close()
+
+    def parse_entry_lazy(
+        self, wiktionary_entry: WiktionaryPageEntry
+    ) -> LazyParsedWiktionaryPageEntry:
+        """
+        Like "parse_entry", but the fields of the result are only parsed
+        when they are accessed (see LazyParsedWiktionaryPageEntry).
+        """
+        return LazyParsedWiktionaryPageEntry(self, wiktionary_entry)
+
+    def create_result(
+        self, results: dict, validate: bool | None = None
+    ) -> ParsedWiktionaryPageEntry:
+        from wiktionary_de_parser.models import (
+            ParsedWiktionaryPageEntry,
+            construct_trusted,
+        )
+
+        if validate is None:
+            validate = self.validate
+
+        if not validate:
+            return construct_trusted(ParsedWiktionaryPageEntry, results)
+
         return ParsedWiktionaryPageEntry(**results)
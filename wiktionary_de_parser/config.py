@@ -2,3 +2,5 @@ from pathlib import Path
 
 
 PACKAGE_PATH = Path(__file__).parent.absolute()
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
@@ -1,17 +1,41 @@
 import bz2
+import os
 import shutil
 import subprocess
+from collections.abc import Iterable
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import chain
 from pathlib import Path
 
-import requests
 from lxml import etree
-from tqdm import tqdm
 
-from wiktionary_de_parser.models import WiktionaryPage
+from wiktionary_de_parser.config import DEFAULT_CHUNK_SIZE
+from wiktionary_de_parser.dump_processor.checkpoint import (
+    Checkpoint,
+    CheckpointWriter,
+    checkpointed,
+    skip_done,
+)
+from wiktionary_de_parser.dump_processor.multistream import (
+    StreamsReader,
+    index_path_for,
+    read_index,
+    read_stream,
+    wrap_stream_data,
+)
+from wiktionary_de_parser.records import WiktionaryPage, validate_page
+from wiktionary_de_parser.utils.concurrency import bounded_map, prefetched
 
 # Credits: https://github.com/tatuylonen/wikitextprocessor/blob/958098c50df1a116ee5549f7e4d9352f349265d7/src/wikitextprocessor/dumpparser.py
 
 DEFAULT_WIKTIONARY_DUMP_URL = "https://dumps.wikimedia.org/dewiktionary/latest/dewiktionary-latest-pages-articles-multistream.xml.bz2"  # noqa: E501
+MEDIAWIKI_NAMESPACE = "http://www.mediawiki.org/xml/export-0.11/"
+# see https://de.wiktionary.org/wiki/Hilfe:Namensr%C3%A4ume
+NAMESPACE_IDS = {0}
+# Multi-threaded bz2 tools, used instead of the "bz2" module if installed
+EXTERNAL_DECOMPRESSORS = ("lbzip2", "pbzip2")
 
 
 class WiktionaryDump:
@@ -20,8 +44,19 @@ class WiktionaryDump:
         dump_dir_path: Path | str | None = None,
         dump_download_url: str = DEFAULT_WIKTIONARY_DUMP_URL,
         dump_file_path: Path | str | None = None,
+        index_download_url: str | None = None,
+        index_file_path: Path | str | None = None,
+        validate: bool = False,
     ):
         self.dump_download_url = dump_download_url
+        # Validate pages with pydantic. Pages are created from the XML dump
+        # and have the correct types anyway, so validation is off by default.
+        self.validate = validate
+        self.index_download_url = index_download_url
+        if not self.index_download_url and self.is_multistream(
+            dump_download_url
+        ):
+            self.index_download_url = index_path_for(dump_download_url)
 
         if dump_file_path:
             self.dump_file_path = Path(dump_file_path)
@@ -38,33 +73,115 @@ class WiktionaryDump:
                 "Either dump_dir_path or dump_file_path must be provided."
             )
 
-    def download_dump(self):
+        self.index_file_path: Path | None = None
+        if index_file_path:
+            self.index_file_path = Path(index_file_path)
+        elif self.is_multistream(self.dump_file_path.name):
+            self.index_file_path = self.dump_file_path.with_name(
+                index_path_for(self.dump_file_path.name)
+            )
+
+        self._index: dict[str, tuple[int, int]] | None = None
+        self._stream_offsets: list[int] | None = None
+        self._page_offsets: dict[int, int] | None = None
+
+    @staticmethod
+    def is_multistream(path: str) -> bool:
+        return path.endswith("-multistream.xml.bz2")
+
+    def download_dump(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        verify_checksum: str | None = None,
+        checksums_url: str | None = None,
+        connections: int = 1,
+    ):
         """
         Download the dump file to the directory specified by "dump_dir_path".
+
+        Interrupted downloads are resumed. Set "verify_checksum" to "md5" or
+        "sha1" to verify the file against the Wikimedia checksum file (also
+        an existing file, which is never replaced).
+
+        With "connections" > 1 the file is split into byte ranges, which are
+        downloaded over multiple connections at the same time. This helps if
+        the mirror limits the speed per connection.
         """
+        self.download(
+            self.dump_download_url,
+            self.dump_file_path,
+            desc="Downloading Wiktionary dump",
+            chunk_size=chunk_size,
+            verify_checksum=verify_checksum,
+            checksums_url=checksums_url,
+            connections=connections,
+        )
 
-        # Check if dump file already exists
-        if self.dump_file_path.exists():
+    def download_index(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        verify_checksum: str | None = None,
+        checksums_url: str | None = None,
+        connections: int = 1,
+    ):
+        """
+        Download the multistream index file next to the dump file.
+        """
+        if not self.index_download_url or not self.index_file_path:
+            raise ValueError("The dump file has no multistream index.")
+
+        self.download(
+            self.index_download_url,
+            self.index_file_path,
+            desc="Downloading Wiktionary dump index",
+            chunk_size=chunk_size,
+            verify_checksum=verify_checksum,
+            checksums_url=checksums_url,
+            connections=connections,
+        )
+
+    @staticmethod
+    def download(
+        url: str,
+        file_path: Path,
+        desc: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        verify_checksum: str | None = None,
+        checksums_url: str | None = None,
+        connections: int = 1,
+    ):
+        # An existing file is kept, and verified by "download_file"
+        if file_path.exists() and not verify_checksum:
             return
 
-        response = requests.get(self.dump_download_url, stream=True)
-        total = int(response.headers.get("content-length", 0))
-        bar = tqdm(
-            total=total,
-            unit="iB",
-            unit_scale=True,
-            unit_divisor=1024,
-            desc="Downloading Wiktionary dump",
+        # Imported here, so reading a local dump doesn't import requests
+        from wiktionary_de_parser.dump_processor.download import (
+            download_file,
+            fetch_checksum,
         )
 
-        with open(self.dump_file_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=1024):
-                size = f.write(chunk)
-                bar.update(size)
+        checksum = None
+        if verify_checksum:
+            checksum = (
+                verify_checksum,
+                fetch_checksum(url, verify_checksum, checksums_url),
+            )
+
+        download_file(
+            url,
+            file_path,
+            desc,
+            chunk_size=chunk_size,
+            checksum=checksum,
+            connections=connections,
+        )
 
     @staticmethod
     def process_page_data(
-        page_element, namespaces: dict[None, str], namespace_ids: set[int]
+        page_element,
+        namespaces: dict[None, str],
+        namespace_ids: set[int],
+        validate: bool = False,
     ):
         page_id = int(page_element.findtext("id", "", namespaces))
         title = page_element.findtext("title", "", namespaces)
@@ -94,16 +211,133 @@ class WiktionaryDump:
                 return
             text = page_element.findtext("revision/text", "", namespaces)
 
-        return WiktionaryPage(
-            page_id=page_id,
-            name=title,
-            wikitext=text,
-            redirect_to=redirect_to,
-        )
+        page_data = {
+            "page_id": page_id,
+            "name": title,
+            "wikitext": text,
+            "redirect_to": redirect_to,
+        }
+
+        if validate:
+            return validate_page(page_data)
+
+        return WiktionaryPage(**page_data)
+
+    def iter_pages(self, xml_file):
+        """
+        Iterates over the pages of an (uncompressed) XML file object.
+        """
+        namespaces = {None: MEDIAWIKI_NAMESPACE}
+
+        for _, page_element in etree.iterparse(
+            xml_file, tag=f"{{{MEDIAWIKI_NAMESPACE}}}page"
+        ):
+            page = self.process_page_data(
+                page_element, namespaces, NAMESPACE_IDS, self.validate
+            )
+
+            if not page:
+                continue
+
+            yield page
+
+            page_element.clear()
+            while page_element.getprevious() is not None:
+                del page_element.getparent()[0]
+
+            # Or: page_element.clear(keep_tail=True) ?
 
-    def pages(self):
+    @staticmethod
+    def find_decompressor(decompressor: str = "auto") -> str | None:
+        """
+        Return the path of the external decompressor to use, or None to use
+        the "bz2" module.
+            - "auto": lbzip2 or pbzip2, if one of them is installed
+            - "bz2": always use the "bz2" module
+            - any other value: name or path of the tool
+        """
+        if decompressor == "bz2":
+            return None
+
+        if decompressor == "auto":
+            for name in EXTERNAL_DECOMPRESSORS:
+                if path := shutil.which(name):
+                    return path
+            return None
+
+        if path := shutil.which(decompressor):
+            return path
+
+        raise FileNotFoundError(f"Decompressor {decompressor} not found.")
+
+    @contextmanager
+    def open_dump(self, decompressor: str = "auto", start: int = 0):
+        """
+        Open the dump file for reading decompressed data, from the bz2
+        stream at byte offset "start" on. Decompression runs in a
+        multi-threaded external tool (see "find_decompressor") if available,
+        which is several times faster than the "bz2" module.
+        """
+        path = self.find_decompressor(decompressor)
+
+        if not path:
+            with open(self.dump_file_path, "rb") as raw:
+                raw.seek(start)
+                with bz2.open(raw) as f:
+                    yield f
+            return
+
+        with open(self.dump_file_path, "rb") as raw:
+            if start:
+                # The tool reads the rest of the file from stdin
+                raw.seek(start)
+                process = subprocess.Popen(
+                    [path, "-d", "-c"], stdin=raw, stdout=subprocess.PIPE
+                )
+            else:
+                process = subprocess.Popen(
+                    [path, "-d", "-c", str(self.dump_file_path)],
+                    stdout=subprocess.PIPE,
+                )
+        assert process.stdout is not None
+
+        try:
+            yield process.stdout
+        except GeneratorExit:
+            # Stopped reading before the end
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            process.wait()
+
+            # A failing tool leads to invalid XML, report the actual cause
+            # (negative return codes: killed by a signal)
+            if process.returncode > 0:
+                raise subprocess.CalledProcessError(process.returncode, path)
+
+    def pages(
+        self,
+        decompressor: str = "auto",
+        prefetch: int = 0,
+        resume_from: Checkpoint | str | os.PathLike | None = None,
+        checkpoint: CheckpointWriter | None = None,
+    ):
         """
         Iterates over dump file.
+
+        "decompressor" selects the bz2 decompressor, see "find_decompressor".
+
+        If "prefetch" is greater than 0, the dump is read in a background
+        thread, which keeps up to "prefetch" pages in a queue. Decompression
+        and XML parsing then overlap with the work of the caller.
+
+        Long runs can be resumed in multistream dumps (see CheckpointWriter):
+        "checkpoint" saves a Checkpoint after every processed page (a page
+        is processed when the caller asks for the next one), and
+        "resume_from" (a Checkpoint, or the path of a checkpoint file, which
+        may not exist yet) starts at its bz2 stream and yields the pages
+        after it.
         """
 
         # Check if dump file exists
@@ -113,28 +347,270 @@ class WiktionaryDump:
                 "Please download the dump file first."
             )
 
-        namespace_ids = {
-            0
-        }  # see https://de.wiktionary.org/wiki/Hilfe:Namensr%C3%A4ume
+        pages = self.read_pages(decompressor, self.load_checkpoint(resume_from))
+
+        if prefetch > 0:
+            pages = prefetched(pages, prefetch)
+        if checkpoint is not None:
+            pages = checkpointed(pages, checkpoint)
+
+        yield from pages
+
+    def read_pages(
+        self, decompressor: str = "auto", resume: Checkpoint | None = None
+    ):
+        """
+        Iterates over the pages of the dump file, or over the pages after
+        the checkpoint "resume".
+        """
+        if resume is None:
+            with self.open_dump(decompressor) as p:
+                yield from self.iter_pages(p)
+            return
+
+        with self.open_dump(decompressor, resume.offset) as p:
+            yield from skip_done(
+                self.iter_pages(StreamsReader(p, MEDIAWIKI_NAMESPACE)), resume
+            )
+
+    def download_pages(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        verify_checksum: str | None = None,
+        checksums_url: str | None = None,
+    ):
+        """
+        Download the dump file and iterate over its pages at the same time.
+        The downloaded data is written to disk and parsed right away, so
+        pages are available before the download is finished.
 
-        with bz2.open(self.dump_file_path) as p:
-            namespace_str = "http://www.mediawiki.org/xml/export-0.11/"
-            namespaces = {None: namespace_str}
+        If the iteration is stopped early, the download can be resumed later.
+        If the dump file already exists, this is the same as "pages()" (after
+        verifying the file, with "verify_checksum").
 
-            for _, page_element in etree.iterparse(
-                p, tag=f"{{{namespace_str}}}page"
-            ):
-                page = self.process_page_data(
-                    page_element, namespaces, namespace_ids
+        Note: a checksum mismatch is only detected after all pages have been
+        yielded.
+        """
+        if self.dump_file_path.exists() and not verify_checksum:
+            yield from self.pages()
+            return
+
+        from wiktionary_de_parser.dump_processor.download import (
+            StreamingDownload,
+            fetch_checksum,
+            verify_existing_file,
+        )
+
+        checksum = None
+        if verify_checksum:
+            checksum = (
+                verify_checksum,
+                fetch_checksum(
+                    self.dump_download_url, verify_checksum, checksums_url
+                ),
+            )
+
+        if self.dump_file_path.exists():
+            verify_existing_file(
+                self.dump_file_path, self.dump_download_url, checksum
+            )
+            yield from self.pages()
+            return
+
+        with StreamingDownload(
+            self.dump_download_url,
+            self.dump_file_path,
+            desc="Downloading Wiktionary dump",
+            chunk_size=chunk_size,
+            checksum=checksum,
+        ) as download:
+            with bz2.open(download) as p:
+                yield from self.iter_pages(p)
+
+            download.finish()
+
+    def load_index(self):
+        """
+        Load the multistream index file (title -> stream offset, page id).
+        The index is only read once.
+        """
+        if self._index is not None:
+            return self._index
+
+        if not self.index_file_path or not self.index_file_path.exists():
+            raise FileNotFoundError(
+                f"Index file {self.index_file_path} does not exist. "
+                "Please download the index file first."
+            )
+
+        self._index = read_index(self.index_file_path)
+
+        return self._index
+
+    def stream_offsets(self) -> list[int]:
+        """
+        Sorted byte offsets of all bz2 streams that contain pages.
+        """
+        if self._stream_offsets is None:
+            self._stream_offsets = sorted(
+                {offset for offset, _ in self.load_index().values()}
+            )
+
+        return self._stream_offsets
+
+    def page_offsets(self) -> dict[int, int]:
+        """
+        Byte offset of the bz2 stream of every page id.
+        """
+        if self._page_offsets is None:
+            self._page_offsets = {
+                page_id: offset
+                for offset, page_id in self.load_index().values()
+            }
+
+        return self._page_offsets
+
+    def load_checkpoint(
+        self, resume_from: Checkpoint | str | os.PathLike | None
+    ) -> Checkpoint | None:
+        """
+        Return the checkpoint to resume from: "resume_from" itself, or the
+        checkpoint saved in the file "resume_from" (None if there is none).
+        """
+        if resume_from is None or isinstance(resume_from, Checkpoint):
+            resume = resume_from
+        else:
+            resume = Checkpoint.load(resume_from)
+
+        if (
+            resume is not None
+            and self.page_offsets().get(resume.page_id) != resume.offset
+        ):
+            raise ValueError(
+                f"Page {resume.page_id} of the checkpoint is not in the bz2 "
+                f"stream at offset {resume.offset} of {self.dump_file_path}."
+            )
+
+        return resume
+
+    def read_streams(self, start: int, end: int | None = None):
+        """
+        Decompress and parse all bz2 streams between the byte offsets "start"
+        and "end" (end of file if None). "start" must be a stream offset.
+        """
+        with open(self.dump_file_path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start if end is not None else -1)
+
+        xml_file = wrap_stream_data(bz2.decompress(data), MEDIAWIKI_NAMESPACE)
+
+        return list(self.iter_pages(xml_file))
+
+    def pages_parallel(
+        self,
+        workers: int | None = None,
+        ordered: bool = True,
+        streams_per_task: int = 10,
+        resume_from: Checkpoint | str | os.PathLike | None = None,
+        checkpoint: CheckpointWriter | None = None,
+    ):
+        """
+        Iterates over dump file using multiple processes. The dump is split
+        at its bz2 stream boundaries (see multistream index) and every worker
+        decompresses and parses its own range of streams.
+
+        If "ordered" is True, pages are yielded in dump order.
+
+        "resume_from" and "checkpoint" work like in "pages()", checkpoints
+        need "ordered".
+        """
+        if not self.dump_file_path.exists():
+            raise FileNotFoundError(
+                f"Dump file {self.dump_file_path} does not exist. "
+                "Please download the dump file first."
+            )
+
+        if checkpoint is not None and not ordered:
+            raise ValueError("Checkpoints need ordered=True.")
+
+        resume = self.load_checkpoint(resume_from)
+        offsets = self.stream_offsets()
+        if resume is not None:
+            offsets = offsets[bisect_left(offsets, resume.offset) :]
+
+        workers = workers or os.cpu_count() or 1
+        tasks = (
+            (
+                self.dump_file_path,
+                offsets[i],
+                offsets[i + streams_per_task]
+                if i + streams_per_task < len(offsets)
+                else None,
+                self.validate,
+            )
+            for i in range(0, len(offsets), streams_per_task)
+        )
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pages = chain.from_iterable(
+                bounded_map(
+                    executor,
+                    read_stream_range,
+                    tasks,
+                    max_in_flight=workers * 2,
+                    ordered=ordered,
                 )
+            )
+
+            if resume is not None:
+                pages = skip_done(pages, resume)
+            if checkpoint is not None:
+                pages = checkpointed(pages, checkpoint)
+
+            yield from pages
+
+    def get_page(self, title: str) -> WiktionaryPage | None:
+        """
+        Get a single page by its title. Only the bz2 stream containing the
+        page is decompressed.
+        """
+        return next(self.get_pages([title]), None)
+
+    def get_pages(self, titles: Iterable[str]):
+        """
+        Get multiple pages by their titles. Pages are yielded in dump order,
+        titles that are not part of the dump are skipped. Every bz2 stream is
+        decompressed at most once.
+        """
+        index = self.load_index()
+        titles_by_offset: dict[int, set[str]] = {}
 
-                if not page:
-                    continue
+        for title in titles:
+            if title in index:
+                offset, _ = index[title]
+                titles_by_offset.setdefault(offset, set()).add(title)
+
+        if not titles_by_offset:
+            return
+
+        with open(self.dump_file_path, "rb") as f:
+            for offset in sorted(titles_by_offset):
+                wanted_titles = titles_by_offset[offset]
+                xml_file = wrap_stream_data(
+                    read_stream(f, offset), MEDIAWIKI_NAMESPACE
+                )
 
-                yield page
+                for page in self.iter_pages(xml_file):
+                    if page.name in wanted_titles:
+                        yield page
 
-                page_element.clear()
-                while page_element.getprevious() is not None:
-                    del page_element.getparent()[0]
 
-                # Or: page_element.clear(keep_tail=True) ?
+def read_stream_range(
+    dump_file_path: Path, start: int, end: int | None, validate: bool = False
+):
+    """
+    Worker function of "WiktionaryDump.pages_parallel".
+    """
+    return WiktionaryDump(
+        dump_file_path=dump_file_path, validate=validate
+    ).read_streams(start, end)
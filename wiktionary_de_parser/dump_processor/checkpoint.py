@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from wiktionary_de_parser.dump_processor import WiktionaryDump
+    from wiktionary_de_parser.records import WiktionaryPage
+
+
+@dataclass(frozen=True, slots=True)
+class Checkpoint:
+    """
+    Position in a multistream dump: the byte offset of the bz2 stream that
+    contains the last processed page, and the id of that page. A run that
+    resumes from it starts at the stream and skips the pages up to and
+    including "page_id".
+
+    "state" is saved with the checkpoint (any JSON value, see
+    CheckpointWriter), e.g. the size of the output file at this position.
+    """
+
+    offset: int
+    page_id: int
+    state: Any = None
+
+    def save(self, path: str | os.PathLike):
+        """
+        Write the checkpoint as JSON. The file is replaced atomically, so a
+        run that is killed while saving leaves the previous checkpoint.
+        """
+        path = Path(path)
+        temp_path = path.with_name(path.name + ".tmp")
+
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> Checkpoint | None:
+        """
+        Read a checkpoint saved with "save", or None if there is none yet.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+
+class CheckpointWriter:
+    """
+    Saves a Checkpoint of "dump" to "path" after every "every" pages that
+    were processed. Pass it as "checkpoint" to "WiktionaryDump.pages()",
+    "WiktionaryDump.pages_parallel()" or "WiktionaryParser.parse_pages()",
+    which report a page as done once the caller asked for the item after
+    it (the page, or all results of the page).
+
+    "state" is called for every checkpoint and its result is saved with it.
+    Return the position of the output there (e.g. flush the output file and
+    return its size): a resumed run repeats the pages after the checkpoint,
+    so truncating the output to "state" gives every result exactly once.
+    Without a checkpoint (a run that was killed before the first one was
+    saved), truncate the output to its start. Delete the checkpoint file
+    after a complete run, or the next run resumes at the end of the dump.
+
+    The multistream index of the dump is loaded when the writer is created,
+    so a missing index is reported before the run starts, and pages that
+    aren't in the index (of another dump) when they are done.
+    """
+
+    def __init__(
+        self,
+        dump: WiktionaryDump,
+        path: str | os.PathLike,
+        every: int = 1000,
+        state: Callable[[], Any] | None = None,
+    ):
+        try:
+            self.page_offsets = dump.page_offsets()
+        except FileNotFoundError as error:
+            raise FileNotFoundError(
+                f"Checkpoints need the multistream index of the dump: {error}"
+            ) from error
+
+        offsets = dump.stream_offsets()
+        if (
+            offsets
+            and dump.dump_file_path.exists()
+            and offsets[-1] >= dump.dump_file_path.stat().st_size
+        ):
+            raise ValueError(
+                f"The index {dump.index_file_path} doesn't belong to the dump "
+                f"{dump.dump_file_path} (its offsets are beyond the end)."
+            )
+
+        self.dump = dump
+        self.path = path
+        self.every = every
+        self.state = state
+        self.last_page_id: int | None = None
+        # Pages that were done since the last checkpoint
+        self.pending = 0
+
+    def done(self, page_id: int, pages: int = 1):
+        """
+        Report that all pages up to "page_id" (in dump order) are processed,
+        "pages" of them since the last call.
+        """
+        if page_id not in self.page_offsets:
+            raise ValueError(
+                f"Page {page_id} is not in the index "
+                f"{self.dump.index_file_path} of the dump "
+                f"{self.dump.dump_file_path}."
+            )
+
+        self.last_page_id = page_id
+        self.pending += pages
+
+        if self.pending >= self.every:
+            self.save()
+
+    def save(self):
+        """
+        Save a checkpoint at the last page that was done (if there is a new
+        one).
+        """
+        if self.last_page_id is None or not self.pending:
+            return
+
+        Checkpoint(
+            self.page_offsets[self.last_page_id],
+            self.last_page_id,
+            self.state() if self.state is not None else None,
+        ).save(self.path)
+        self.pending = 0
+
+
+def checkpointed(
+    pages: Iterable[WiktionaryPage], writer: CheckpointWriter
+) -> Iterator[WiktionaryPage]:
+    """
+    Yield "pages" and report every page to "writer" when the caller asks for
+    the next one. The last checkpoint is saved when all pages are done.
+    """
+    for page in pages:
+        yield page
+        writer.done(page.page_id)
+
+    writer.save()
+
+
+def skip_done(
+    pages: Iterable[WiktionaryPage], checkpoint: Checkpoint
+) -> Iterator[WiktionaryPage]:
+    """
+    Skip the pages up to and including the page of "checkpoint", for pages
+    read from the stream of the checkpoint on (in any order, pages are
+    sorted by id in the dump).
+    """
+    return (page for page in pages if page.page_id > checkpoint.page_id)
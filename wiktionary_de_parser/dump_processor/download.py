@@ -0,0 +1,641 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import BinaryIO
+
+import requests
+from tqdm import tqdm
+
+from wiktionary_de_parser.config import DEFAULT_CHUNK_SIZE
+
+DEFAULT_RETRIES = 3
+DOWNLOAD_TIMEOUT = 60
+CHECKSUM_ALGORITHMS = ("md5", "sha1")
+# Interval (seconds) in which the progress of segmented downloads is saved
+SEGMENTS_SAVE_INTERVAL = 5
+
+
+def part_path_for(file_path: Path) -> Path:
+    """
+    Downloads are written to a ".part" file first and renamed when complete,
+    so an interrupted download is never mistaken for a complete file.
+    """
+    return file_path.with_name(file_path.name + ".part")
+
+
+def segments_path_for(part_path: Path) -> Path:
+    """
+    Segmented downloads store the byte ranges that are still missing next to
+    the ".part" file, so they can be resumed.
+    """
+    return part_path.with_name(part_path.name + ".segments")
+
+
+def checksums_url_for(url: str, algorithm: str) -> str:
+    """
+    Return the URL of the Wikimedia checksum file for a dump file URL, e.g.
+        .../dewiktionary-latest-pages-articles-multistream.xml.bz2 ->
+        .../dewiktionary-latest-md5sums.txt
+    """
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise ValueError(
+            f"Unsupported checksum algorithm {algorithm}, "
+            f"use one of {', '.join(CHECKSUM_ALGORITHMS)}."
+        )
+
+    base_url, file_name = url.rsplit("/", 1)
+    # "<wiki>-<date>-...", date can be "latest"
+    prefix = "-".join(file_name.split("-")[:2])
+
+    return f"{base_url}/{prefix}-{algorithm}sums.txt"
+
+
+def find_checksum(checksums: str, file_name: str) -> str | None:
+    """
+    Find the checksum of a file in a Wikimedia checksum file (lines of
+    "<checksum>  <file name>"). The checksum files in the "latest" directory
+    list dated file names, so "latest" matches any date.
+    """
+    pattern = re.compile(re.escape(file_name).replace("latest", r"\d{8}"))
+
+    for line in checksums.splitlines():
+        parts = line.split()
+        if len(parts) != 2:
+            continue
+
+        checksum, name = parts
+        if name == file_name or pattern.fullmatch(name):
+            return checksum.lower()
+
+    return None
+
+
+def fetch_checksum(url: str, algorithm: str, checksums_url: str | None = None):
+    checksums_url = checksums_url or checksums_url_for(url, algorithm)
+    response = requests.get(checksums_url, timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+
+    file_name = url.rsplit("/", 1)[-1]
+    checksum = find_checksum(response.text, file_name)
+
+    if not checksum:
+        raise ValueError(f"No checksum for {file_name} in {checksums_url}.")
+
+    return checksum
+
+
+def file_checksum(file_path: Path, algorithm: str) -> str:
+    digest = hashlib.new(algorithm)
+
+    with open(file_path, "rb") as f:
+        while chunk := f.read(DEFAULT_CHUNK_SIZE):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def verify_file(file_path: Path, url: str, checksum: tuple[str, str]):
+    """
+    Raise a ValueError if the checksum of the file downloaded from "url"
+    doesn't match "checksum" (algorithm, expected hex digest).
+    """
+    algorithm, expected = checksum
+    actual = file_checksum(file_path, algorithm)
+
+    if actual != expected:
+        raise ValueError(
+            f"{algorithm} checksum mismatch for {url}: "
+            f"expected {expected}, got {actual}."
+        )
+
+
+def verify_existing_file(file_path: Path, url: str, checksum: tuple[str, str]):
+    """
+    Like "verify_file", for a complete file that was downloaded before. It is
+    never deleted, the error says how to download it again.
+    """
+    try:
+        verify_file(file_path, url, checksum)
+    except ValueError as error:
+        raise ValueError(
+            f"{error} Delete {file_path} to download it again."
+        ) from None
+
+
+def file_size(file_path: Path) -> int:
+    return file_path.stat().st_size if file_path.exists() else 0
+
+
+def download_part(
+    url: str, part_path: Path, desc: str, chunk_size: int
+) -> bool:
+    """
+    Download "url" into "part_path", resuming with a HTTP range request if
+    the file already contains data. Returns True if the file is complete.
+    """
+    downloaded = part_path.stat().st_size if part_path.exists() else 0
+    headers = {"Range": f"bytes={downloaded}-"} if downloaded else {}
+
+    with requests.get(
+        url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+    ) as response:
+        if response.status_code == 416:
+            # Range not satisfiable: the part file is already complete,
+            # unless the file on the server changed ("bytes */<size>")
+            total = response.headers.get("content-range", "").split("/")[-1]
+            if total == str(downloaded):
+                return True
+
+            part_path.unlink()
+            return False
+
+        response.raise_for_status()
+
+        if response.status_code != 206:
+            # Server ignored the range request, start from the beginning
+            downloaded = 0
+
+        total = downloaded + int(response.headers.get("content-length", 0))
+
+        with (
+            open(part_path, "ab" if downloaded else "wb") as f,
+            tqdm(
+                total=total,
+                initial=downloaded,
+                unit="iB",
+                unit_scale=True,
+                unit_divisor=1024,
+                desc=desc,
+            ) as bar,
+        ):
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                size = f.write(chunk)
+                bar.update(size)
+
+    return part_path.stat().st_size == total
+
+
+class SegmentedDownload:
+    """
+    Download a file over multiple connections. The file is split into byte
+    ranges ("segments"), every segment is fetched with its own HTTP range
+    request and written to its position in the preallocated ".part" file.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        part_path: Path,
+        size: int,
+        connections: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        retries: int = DEFAULT_RETRIES,
+    ):
+        self.url = url
+        self.part_path = part_path
+        self.segments_path = segments_path_for(part_path)
+        self.size = size
+        self.connections = connections
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.lock = threading.Lock()
+        # Set when a segment failed or the download was interrupted, so the
+        # other segments stop instead of downloading until they are complete
+        self.stop = threading.Event()
+        # Missing byte ranges [start, end)
+        self.segments = self.load_segments()
+
+    def load_segments(self) -> list[list[int]]:
+        if self.segments_path.exists():
+            state = json.loads(self.segments_path.read_text())
+            if state["size"] == self.size:
+                return state["segments"]
+
+            self.part_path.unlink(missing_ok=True)
+            self.segments_path.unlink()
+
+        # A part file of a single connection download is complete up to its
+        # current size
+        done = 0
+        if self.part_path.exists():
+            done = min(self.part_path.stat().st_size, self.size)
+
+        remaining = self.size - done
+        segment_size = -(-remaining // self.connections)
+
+        return [
+            [start, min(start + segment_size, self.size)]
+            for start in range(done, self.size, max(segment_size, 1))
+        ]
+
+    def save_segments(self):
+        with self.lock:
+            state = {"size": self.size, "segments": self.segments}
+            self.segments_path.write_text(json.dumps(state))
+
+    @property
+    def remaining(self) -> int:
+        return sum(end - start for start, end in self.segments)
+
+    def fetch_segment(self, segment: list[int], bar: tqdm):
+        attempt = 0
+
+        while True:
+            start = segment[0]
+            try:
+                self.fetch_segment_range(segment, bar)
+                return
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout,
+            ):
+                # Only attempts without any progress count as retries
+                attempt = 0 if segment[0] > start else attempt + 1
+                if attempt > self.retries or self.stop.is_set():
+                    raise
+
+    def fetch_segment_range(self, segment: list[int], bar: tqdm):
+        start, end = segment
+        if start >= end:
+            return
+
+        headers = {"Range": f"bytes={start}-{end - 1}"}
+
+        with (
+            requests.get(
+                self.url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+            ) as response,
+            # Unbuffered, so the saved segments never run ahead of the file
+            open(self.part_path, "r+b", buffering=0) as f,
+        ):
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise OSError(f"{self.url} does not support range requests.")
+
+            f.seek(start)
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if self.stop.is_set():
+                    return
+
+                chunk = chunk[: end - segment[0]]
+                f.write(chunk)
+
+                with self.lock:
+                    segment[0] += len(chunk)
+                    bar.update(len(chunk))
+
+        if segment[0] < end:
+            raise requests.exceptions.ChunkedEncodingError(
+                f"Segment {start}-{end} of {self.url} is incomplete."
+            )
+
+    def run(self, desc: str):
+        # Preallocate the file, so segments can be written to their position
+        with open(self.part_path, "ab") as f:
+            f.truncate(self.size)
+
+        self.stop.clear()
+        try:
+            with (
+                tqdm(
+                    total=self.size,
+                    initial=self.size - self.remaining,
+                    unit="iB",
+                    unit_scale=True,
+                    unit_divisor=1024,
+                    desc=desc,
+                ) as bar,
+                ThreadPoolExecutor(max_workers=self.connections) as executor,
+            ):
+                futures = [
+                    executor.submit(self.fetch_segment, segment, bar)
+                    for segment in self.segments
+                ]
+
+                try:
+                    pending = set(futures)
+                    while pending:
+                        done, pending = wait(
+                            pending,
+                            timeout=SEGMENTS_SAVE_INTERVAL,
+                            return_when=FIRST_EXCEPTION,
+                        )
+                        for future in done:
+                            # Raise errors of failed segments
+                            future.result()
+                        self.save_segments()
+                finally:
+                    # Stop the running segments after their current chunk
+                    # (the executor waits for them)
+                    self.stop.set()
+                    for future in futures:
+                        future.cancel()
+        finally:
+            # Including the bytes the segments wrote until they stopped
+            self.save_segments()
+
+        self.segments_path.unlink()
+
+
+def content_length(url: str) -> tuple[int, bool]:
+    """
+    Return the size of the file at "url" and whether the server supports
+    range requests.
+    """
+    response = requests.head(
+        url, allow_redirects=True, timeout=DOWNLOAD_TIMEOUT
+    )
+    response.raise_for_status()
+
+    return (
+        int(response.headers.get("content-length", 0)),
+        response.headers.get("accept-ranges") == "bytes",
+    )
+
+
+def download_file(
+    url: str,
+    file_path: Path,
+    desc: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    retries: int = DEFAULT_RETRIES,
+    checksum: tuple[str, str] | None = None,
+    connections: int = 1,
+):
+    """
+    Download "url" to "file_path". Interrupted downloads are resumed (also
+    across calls), the file is only moved to "file_path" when complete.
+
+    With "connections" > 1 the file is split into byte ranges that are
+    downloaded in parallel (if the server supports range requests).
+
+    "checksum" is a tuple of (algorithm, expected hex digest). An existing
+    file is kept, and verified if "checksum" is given.
+    """
+    # Check if file already exists
+    if file_path.exists():
+        if checksum:
+            verify_existing_file(file_path, url, checksum)
+        return
+
+    part_path = part_path_for(file_path)
+    segmented = connections > 1 or segments_path_for(part_path).exists()
+
+    if segmented:
+        size, accepts_ranges = content_length(url)
+        segmented = bool(size) and accepts_ranges
+
+    if segmented:
+        SegmentedDownload(
+            url,
+            part_path,
+            size,
+            connections=connections,
+            chunk_size=chunk_size,
+            retries=retries,
+        ).run(desc)
+    else:
+        segments_path_for(part_path).unlink(missing_ok=True)
+        download_single(url, part_path, desc, chunk_size, retries)
+
+    if checksum:
+        try:
+            verify_file(part_path, url, checksum)
+        except ValueError:
+            part_path.unlink()
+            raise
+
+    os.replace(part_path, file_path)
+
+
+def download_single(
+    url: str, part_path: Path, desc: str, chunk_size: int, retries: int
+):
+    attempt = 0
+
+    while True:
+        size = file_size(part_path)
+        try:
+            if download_part(url, part_path, desc, chunk_size):
+                return
+            error = OSError(f"Download of {url} is incomplete.")
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.ChunkedEncodingError,
+            requests.exceptions.Timeout,
+        ) as e:
+            error = e
+
+        # Only attempts without any progress count as retries
+        attempt = 0 if file_size(part_path) > size else attempt + 1
+        if attempt > retries:
+            raise error
+
+
+class StreamingDownload:
+    """
+    File-like object that downloads "url" to "file_path" and returns the
+    downloaded bytes from "read()" at the same time, so the dump can be
+    parsed while it is downloaded.
+
+    Data of an existing ".part" file is read first, then the download is
+    resumed from its end. The file is moved to "file_path" by "finish()".
+    """
+
+    def __init__(
+        self,
+        url: str,
+        file_path: Path,
+        desc: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        retries: int = DEFAULT_RETRIES,
+        checksum: tuple[str, str] | None = None,
+    ):
+        self.url = url
+        self.file_path = file_path
+        self.part_path = part_path_for(file_path)
+        self.desc = desc
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.checksum = checksum
+        self.digest = hashlib.new(checksum[0]) if checksum else None
+
+        self.downloaded = 0
+        self.total: int | None = None
+        # Bytes to skip, if the server ignores a range request
+        self.skip = 0
+        # Failed attempts since bytes were received last
+        self.attempt = 0
+        self.buffer = b""
+        self.response: requests.Response | None = None
+        self.chunks = None
+        self.bar: tqdm | None = None
+        self.local_file: BinaryIO | None = None
+
+    def __enter__(self):
+        # A segmented download has holes, it can't be read sequentially
+        segments_path = segments_path_for(self.part_path)
+        if segments_path.exists():
+            segments_path.unlink()
+            self.part_path.unlink(missing_ok=True)
+
+        self.local_file = None
+        if self.part_path.exists():
+            self.downloaded = self.part_path.stat().st_size
+            self.local_file = open(self.part_path, "rb")
+        self.part_file = open(self.part_path, "ab")
+
+        return self
+
+    def __exit__(self, *args):
+        self.close_response()
+        if self.local_file:
+            self.local_file.close()
+        self.part_file.close()
+        if self.bar:
+            self.bar.close()
+
+    def close_response(self):
+        if self.response is not None:
+            self.response.close()
+        self.response = None
+        self.chunks = None
+
+    def connect(self):
+        headers = (
+            {"Range": f"bytes={self.downloaded}-"} if self.downloaded else {}
+        )
+        self.response = requests.get(
+            self.url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+        )
+
+        if self.response.status_code == 416:
+            # Range not satisfiable: the part file is already complete
+            self.total = self.downloaded
+            return
+
+        self.response.raise_for_status()
+        length = int(self.response.headers.get("content-length", 0))
+
+        if self.response.status_code == 206:
+            self.total = self.downloaded + length
+        else:
+            # Server ignored the range request, skip what we already have
+            self.skip = self.downloaded
+            self.total = length
+
+        if self.bar is None:
+            self.bar = tqdm(
+                total=self.total,
+                initial=self.downloaded,
+                unit="iB",
+                unit_scale=True,
+                unit_divisor=1024,
+                desc=self.desc,
+            )
+
+        self.chunks = self.response.iter_content(chunk_size=self.chunk_size)
+
+    def next_response_chunk(self) -> bytes | None:
+        if self.chunks is None:
+            if self.total is not None and self.downloaded >= self.total:
+                return None
+
+            self.connect()
+            if self.chunks is None:
+                return None
+
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.close_response()
+            if self.downloaded < (self.total or 0):
+                raise requests.exceptions.ChunkedEncodingError(
+                    f"Download of {self.url} is incomplete."
+                )
+
+        return chunk
+
+    def next_chunk(self) -> bytes | None:
+        while True:
+            try:
+                chunk = self.next_response_chunk()
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout,
+            ):
+                # Resume from the data written so far
+                self.close_response()
+                self.part_file.flush()
+                self.attempt += 1
+                if self.attempt > self.retries:
+                    raise
+                continue
+
+            if chunk is None:
+                return None
+
+            if self.skip:
+                skipped = min(self.skip, len(chunk))
+                self.skip -= skipped
+                chunk = chunk[skipped:]
+                if not chunk:
+                    continue
+
+            self.part_file.write(chunk)
+            self.downloaded += len(chunk)
+            self.attempt = 0
+            if self.bar:
+                self.bar.update(len(chunk))
+
+            return chunk
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            size = self.chunk_size
+
+        if self.local_file:
+            data = self.local_file.read(size)
+            if data:
+                if self.digest:
+                    self.digest.update(data)
+                return data
+
+            self.local_file.close()
+            self.local_file = None
+
+        if not self.buffer:
+            self.buffer = self.next_chunk() or b""
+            if self.digest:
+                self.digest.update(self.buffer)
+
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+
+        return data
+
+    def finish(self):
+        """
+        Read the rest of the download, verify it and move it to "file_path".
+        """
+        while self.read(self.chunk_size):
+            pass
+
+        self.part_file.close()
+
+        if self.digest and self.checksum:
+            algorithm, expected = self.checksum
+            actual = self.digest.hexdigest()
+
+            if actual != expected:
+                self.part_path.unlink()
+                raise ValueError(
+                    f"{algorithm} checksum mismatch for {self.url}: "
+                    f"expected {expected}, got {actual}."
+                )
+
+        os.replace(self.part_path, self.file_path)
@@ -0,0 +1,95 @@
+import bz2
+import io
+from pathlib import Path
+from typing import BinaryIO
+
+# Multistream dumps consist of many independent bz2 streams (100 pages each).
+# The index file lists the byte offset of the stream that contains a page:
+#   https://meta.wikimedia.org/wiki/Data_dumps/Dump_format#Multistream_dumps
+
+STREAM_READ_SIZE = 256 * 1024
+
+MEDIAWIKI_CLOSING_TAG = b"</mediawiki>"
+
+
+def index_path_for(path: str) -> str:
+    """
+    Return the name of the index file that belongs to a multistream dump, e.g.
+        dewiktionary-latest-pages-articles-multistream.xml.bz2 ->
+        dewiktionary-latest-pages-articles-multistream-index.txt.bz2
+    """
+    if not path.endswith("-multistream.xml.bz2"):
+        raise ValueError(f"{path} is not a multistream dump file.")
+
+    return path.removesuffix(".xml.bz2") + "-index.txt.bz2"
+
+
+def read_index(index_file_path: Path) -> dict[str, tuple[int, int]]:
+    """
+    Read a multistream index file. Every line has the format
+    "offset:page_id:title" (titles can contain colons).
+
+    Returns a dict mapping page titles to (stream offset, page id).
+    """
+    index: dict[str, tuple[int, int]] = {}
+
+    with bz2.open(index_file_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            offset, page_id, title = line.rstrip("\n").split(":", 2)
+            index[title] = (int(offset), int(page_id))
+
+    return index
+
+
+def read_stream(f: BinaryIO, offset: int) -> bytes:
+    """
+    Decompress the single bz2 stream starting at byte "offset" of the dump
+    file. Reading stops at the end of that stream.
+    """
+    f.seek(offset)
+    decompressor = bz2.BZ2Decompressor()
+    chunks: list[bytes] = []
+
+    while not decompressor.eof:
+        data = f.read(STREAM_READ_SIZE)
+        if not data:
+            raise EOFError(f"bz2 stream at offset {offset} is truncated")
+        chunks.append(decompressor.decompress(data))
+
+    return b"".join(chunks)
+
+
+def root_start_tag(namespace: str) -> bytes:
+    return b'<mediawiki xmlns="' + namespace.encode() + b'">'
+
+
+def wrap_stream_data(data: bytes, namespace: str) -> io.BytesIO:
+    """
+    Page streams only contain a sequence of "<page>" elements. Wrap them in a
+    root element, so they can be parsed like a complete dump file.
+    """
+    data = data.rstrip()
+    if data.endswith(MEDIAWIKI_CLOSING_TAG):
+        # The last stream of a dump also contains the closing root tag
+        data = data[: -len(MEDIAWIKI_CLOSING_TAG)]
+
+    return io.BytesIO(root_start_tag(namespace) + data + MEDIAWIKI_CLOSING_TAG)
+
+
+class StreamsReader:
+    """
+    Reads the decompressed page streams from a stream offset to the end of
+    the dump as a complete dump file: the root element is prepended (the
+    last stream contains the closing root tag).
+    """
+
+    def __init__(self, f: BinaryIO, namespace: str):
+        self.f = f
+        self.head = root_start_tag(namespace)
+
+    def read(self, size: int = -1) -> bytes:
+        if self.head:
+            head, self.head = self.head, b""
+            return head
+
+        return self.f.read(size)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any
+
+from wiktionary_de_parser.parser.context import EntryContext
+
+if TYPE_CHECKING:
+    from wiktionary_de_parser import WiktionaryParser
+    from wiktionary_de_parser.models import ParsedWiktionaryPageEntry
+    from wiktionary_de_parser.records import WiktionaryPageEntry
+
+
+class LazyParsedWiktionaryPageEntry:
+    """
+    Result of "WiktionaryParser.parse_entry_lazy". The fields have the same
+    names as in ParsedWiktionaryPageEntry, but every field is parsed when it
+    is accessed for the first time (and then cached):
+
+        result = parser.parse_entry_lazy(entry)
+        result.ipa  # Only the IPA parser runs
+
+    All parsers of the entry share one EntryContext, so sections are
+    indexed and tokenized only once, no matter which fields are accessed.
+    """
+
+    def __init__(self, parser: WiktionaryParser, entry: WiktionaryPageEntry):
+        self.parser = parser
+        self.entry = entry
+        self.context = EntryContext(entry.wikitext)
+
+    @property
+    def name(self) -> str:
+        return self.entry.page.name
+
+    @property
+    def computed_fields(self) -> set[str]:
+        """
+        Names of the fields that have been parsed already
+        """
+        return self.field_names() & self.__dict__.keys()
+
+    def field_names(self) -> set[str]:
+        return {
+            parser_class.name for parser_class in self.parser.parser_classes
+        }
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called if "name" is not cached in the instance dict yet
+        parser = self.__dict__.get("parser")
+
+        if parser is not None:
+            for parser_class in parser.parser_classes:
+                if parser_class.name == name:
+                    # Every field gets the time budgets of an entry
+                    timer = parser.entry_timer(self.entry)
+                    with timer or nullcontext():
+                        value = parser.run_parser(
+                            parser_class, self.entry, self.context, timer
+                        )
+                    self.__dict__[name] = value
+                    return value
+
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def __dir__(self):
+        return [*super().__dir__(), *self.field_names()]
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{name}={self.__dict__[name]!r}"
+            for name in sorted(self.computed_fields)
+        )
+        return f"{type(self).__name__}(name={self.name!r}, {fields})"
+
+    def to_model(
+        self, include_meanings: bool = False, validate: bool | None = None
+    ) -> ParsedWiktionaryPageEntry:
+        """
+        Parse all fields that haven't been parsed yet and return the same
+        result as "WiktionaryParser.parse_entry". Meanings are included if
+        "include_meanings" is True or if they have been accessed already.
+        """
+        # In the order of the parser classes (like "parse_entry"), so the
+        # order of the fields doesn't depend on the hash seed
+        results = {
+            name: getattr(self, name)
+            for name in (c.name for c in self.parser.parser_classes)
+            if include_meanings or name != "meanings" or name in self.__dict__
+        }
+        results["name"] = self.name
+
+        return self.parser.create_result(results, validate)
@@ -1,20 +1,14 @@
 from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing_extensions import TypedDict
 
-
-class WiktionaryPage(BaseModel):
-    page_id: int
-    name: str
-    wikitext: str | None
-    redirect_to: str | None = None
-
-
-class WiktionaryPageEntry(BaseModel):
-    page: WiktionaryPage
-    index: int
-    wikitext: str
+from wiktionary_de_parser.records import (  # noqa: F401
+    WiktionaryPage,
+    WiktionaryPageEntry,
+    validate_page,
+)
+from wiktionary_de_parser.utils.concurrency import thread_safe_cache
 
 
 class Language(BaseModel):
@@ -61,6 +55,24 @@ class Lemma(BaseModel):
     reference_type: ReferenceType = ReferenceType.NONE
 
 
+class NotComputed(Enum):
+    """
+    Marks the results of parsers that were not run, because their field was
+    not requested (see "fields" of "WiktionaryParser.parse_entry"). It is
+    falsy, like "None", but can be told apart from a result of "None".
+    """
+
+    NOT_COMPUTED = "not computed"
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return "NOT_COMPUTED"
+
+
+NOT_COMPUTED = NotComputed.NOT_COMPUTED
+
 ParseFlexionResult = dict | None
 ParseIpaResult = list[str] | None
 ParseLanuageResult = Language
@@ -80,13 +92,69 @@ class MeaningDict(TypedDict, total=False):
 ParseMeaningsResults = list[MeaningDict] | None
 
 
+def construct_trusted(model_class: type[BaseModel], values: dict):
+    """
+    Create a ParsedWiktionaryPageEntry from trusted parse results without
+    validation (2-6x faster, see "benchmarks/bench_models.py"). Only use it
+    for the top-level result: for small models like Language and Lemma, it
+    is slower than validation, so create those with their constructor.
+    """
+    instance = model_class.__new__(model_class)
+    fields_set = set(values)
+    defaults = model_defaults(model_class)
+    allow_extra = model_class.model_config.get("extra") == "allow"
+    extra = {} if allow_extra else None
+
+    # In the order of the model fields, like validated models (the parsers
+    # return their results in a different order)
+    fields = {
+        name: values[name] if name in values else defaults[name]
+        for name in model_field_names(model_class)
+        if name in values or name in defaults
+    }
+
+    if values.keys() - fields.keys():
+        others = {
+            key: value for key, value in values.items() if key not in fields
+        }
+        if allow_extra:
+            extra = others
+        else:
+            fields.update(others)
+
+    object.__setattr__(instance, "__dict__", fields)
+    object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+    object.__setattr__(instance, "__pydantic_extra__", extra)
+    object.__setattr__(instance, "__pydantic_private__", None)
+
+    return instance
+
+
+@thread_safe_cache
+def model_field_names(model_class: type[BaseModel]) -> tuple[str, ...]:
+    # "model_fields" is slow to access on the class
+    return tuple(model_class.model_fields)
+
+
+@thread_safe_cache
+def model_defaults(model_class: type[BaseModel]) -> dict:
+    return {
+        name: field.get_default(call_default_factory=True)
+        for name, field in model_class.model_fields.items()
+        if not field.is_required()
+    }
+
+
 class ParsedWiktionaryPageEntry(BaseModel):
+    # Keep results of third-party parsers (see parser/registry.py)
+    model_config = ConfigDict(extra="allow")
+
     name: str
-    hyphenation: ParseHyphenationResult
-    flexion: ParseFlexionResult
-    ipa: ParseIpaResult
-    language: ParseLanuageResult
-    lemma: ParseLemmaResult
-    pos: ParsePosResult
-    rhymes: ParseRhymesResult
-    meanings: ParseMeaningsResults | None = None
+    hyphenation: ParseHyphenationResult | NotComputed
+    flexion: ParseFlexionResult | NotComputed
+    ipa: ParseIpaResult | NotComputed
+    language: ParseLanuageResult | NotComputed
+    lemma: ParseLemmaResult | NotComputed
+    pos: ParsePosResult | NotComputed
+    rhymes: ParseRhymesResult | NotComputed
+    meanings: ParseMeaningsResults | NotComputed | None = None
@@ -0,0 +1,479 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+import traceback
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from wiktionary_de_parser.records import WiktionaryPage
+
+if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
+
+    from wiktionary_de_parser import WiktionaryParser, Where
+    from wiktionary_de_parser.models import ParsedWiktionaryPageEntry
+    from wiktionary_de_parser.utils.shared_memory import SharedRingBuffer
+    from wiktionary_de_parser.wire import EncodedResults, ResultEncoder
+
+# Parser of the current worker process (see "init_worker")
+worker_parser: WiktionaryParser | None = None
+worker_include_meanings = False
+# Shared memory with the wikitext of the pages (see "share_pages")
+worker_shared_memory: SharedMemory | None = None
+# Encodes the results of the worker in the compact format (see wire.py)
+worker_encoder: ResultEncoder | None = None
+# Error of "init_worker", raised by every task of the worker
+worker_init_error: Exception | None = None
+
+# A page whose wikitext is in shared memory:
+# (page_id, name, redirect_to, offset, length)
+SharedPage = tuple[int, str, "str | None", int, int]
+
+# Every page costs something, even if it has no wikitext (e.g. redirects)
+PAGE_OVERHEAD = 200
+
+
+def page_size(page: WiktionaryPage) -> int:
+    """
+    Size of a page for scheduling: the length of its wikitext
+    """
+    return len(page.wikitext or "") + PAGE_OVERHEAD
+
+
+def chunked(
+    pages: Iterable[WiktionaryPage], chunk_size: int
+) -> Iterator[tuple[list[WiktionaryPage]]]:
+    """
+    Split pages into tasks of "chunk_size" pages, without reading more pages
+    than needed for the next task.
+    """
+    pages = iter(pages)
+
+    while chunk := list(itertools.islice(pages, chunk_size)):
+        yield (chunk,)
+
+
+class AdaptiveBatcher:
+    """
+    Split pages into tasks by the size of their wikitext instead of their
+    number, because a few pages are thousands of times bigger than most.
+
+    The size of the tasks adapts to the measured time per byte, so every
+    task takes about "task_seconds". Pages that are at least as big as a
+    task are sent in their own task. Idle workers take the next task from
+    the pool, so short tasks keep all workers busy until the end of a run.
+    """
+
+    def __init__(
+        self,
+        task_seconds: float = 0.2,
+        initial_task_size: int = 256 * 1024,
+        min_task_size: int = 16 * 1024,
+        max_task_size: int = 16 * 1024 * 1024,
+    ):
+        self.task_seconds = task_seconds
+        self.task_size = initial_task_size
+        self.min_task_size = min_task_size
+        self.max_task_size = max_task_size
+        # Exponential moving average of the measured seconds per byte
+        self.seconds_per_byte: float | None = None
+
+    def batches(
+        self, pages: Iterable[WiktionaryPage]
+    ) -> Iterator[tuple[list[WiktionaryPage]]]:
+        batch: list[WiktionaryPage] = []
+        size = 0
+
+        for page in pages:
+            current_page_size = page_size(page)
+
+            if current_page_size >= self.task_size:
+                # Big pages get their own task
+                if batch:
+                    yield (batch,)
+                    batch = []
+                    size = 0
+
+                yield ([page],)
+                continue
+
+            batch.append(page)
+            size += current_page_size
+
+            if size >= self.task_size:
+                yield (batch,)
+                batch = []
+                size = 0
+
+        if batch:
+            yield (batch,)
+
+    def record(self, seconds: float, size: int):
+        """
+        Update the task size with the duration of a finished task.
+        """
+        seconds_per_byte = seconds / size
+
+        if self.seconds_per_byte is None:
+            self.seconds_per_byte = seconds_per_byte
+        else:
+            self.seconds_per_byte += 0.3 * (
+                seconds_per_byte - self.seconds_per_byte
+            )
+
+        if self.seconds_per_byte > 0:
+            self.task_size = int(
+                min(
+                    max(
+                        self.task_seconds / self.seconds_per_byte,
+                        self.min_task_size,
+                    ),
+                    self.max_task_size,
+                )
+            )
+
+
+@dataclass(slots=True)
+class TaskStats:
+    # Native id of the thread that ran the task. Unique across processes, so
+    # it identifies the worker process or thread.
+    worker: int
+    pages: int
+    size: int
+    seconds: float
+
+
+@dataclass(slots=True)
+class WorkerStats:
+    tasks: int = 0
+    pages: int = 0
+    size: int = 0
+    busy_seconds: float = 0.0
+
+
+@dataclass(slots=True)
+class LoadBalanceReport:
+    """
+    Pass an instance to "WiktionaryParser.parse_pages" to collect statistics
+    about the workers. Print it after the run:
+
+        report = LoadBalanceReport()
+        for result in parser.parse_pages(pages, report=report):
+            ...
+        print(report)
+    """
+
+    wall_seconds: float = 0.0
+    # Sizes of the tasks (see page_size)
+    task_sizes: list[int] = field(default_factory=list)
+    workers: dict[int, WorkerStats] = field(default_factory=dict)
+    # Pages (or entries) that failed, tasks that were repeated and worker
+    # pools that were restarted after a crash
+    failures: int = 0
+    retried: int = 0
+    restarts: int = 0
+
+    def add_task(self, stats: TaskStats):
+        worker = self.workers.setdefault(stats.worker, WorkerStats())
+        worker.tasks += 1
+        worker.pages += stats.pages
+        worker.size += stats.size
+        worker.busy_seconds += stats.seconds
+        self.task_sizes.append(stats.size)
+
+    def utilization(self) -> dict[int, float]:
+        """
+        Share of the wall time every worker was busy (by worker id, see
+        TaskStats)
+        """
+        if not self.wall_seconds:
+            return {worker_id: 0.0 for worker_id in self.workers}
+
+        return {
+            worker_id: worker.busy_seconds / self.wall_seconds
+            for worker_id, worker in self.workers.items()
+        }
+
+    def __str__(self):
+        utilization = self.utilization()
+        lines = [
+            f"{len(self.workers)} workers, {len(self.task_sizes)} tasks, "
+            f"{self.wall_seconds:.2f} s",
+            f"{'worker':>8} {'tasks':>7} {'pages':>9} {'MB':>9} "
+            f"{'busy s':>9} {'util':>6}",
+        ]
+
+        for worker_id, worker in sorted(self.workers.items()):
+            lines.append(
+                f"{worker_id:>8} {worker.tasks:>7} {worker.pages:>9} "
+                f"{worker.size / 1e6:>9.1f} {worker.busy_seconds:>9.2f} "
+                f"{utilization[worker_id]:>6.0%}"
+            )
+
+        if self.failures or self.retried or self.restarts:
+            lines.append(
+                f"{self.failures} failures, {self.retried} tasks retried, "
+                f"{self.restarts} restarts"
+            )
+
+        return "\n".join(lines)
+
+
+@dataclass(slots=True)
+class PageFailure:
+    """
+    A page (or one entry of it, if "entry" is set) that couldn't be parsed
+    by "WiktionaryParser.parse_pages". Written to the quarantine file.
+    """
+
+    page_id: int
+    name: str
+    wikitext: str | None
+    # Index of the entry in the page (None if the whole page failed)
+    entry: int | None
+    error: str
+    traceback: str
+
+    @classmethod
+    def from_error(
+        cls,
+        page: WiktionaryPage,
+        error: BaseException,
+        entry: int | None = None,
+    ) -> PageFailure:
+        return cls(
+            page_id=page.page_id,
+            name=page.name,
+            wikitext=page.wikitext,
+            entry=entry,
+            error=f"{type(error).__name__}: {error}",
+            traceback="".join(traceback.format_exception(error)),
+        )
+
+
+class WorkerInitError(Exception):
+    """
+    Raised by every task of a worker process whose setup failed.
+    """
+
+
+class PageError(Exception):
+    """
+    Raised by "WiktionaryParser.parse_pages" for a page that couldn't be
+    parsed, if there is no quarantine file.
+    """
+
+    def __init__(self, failure: PageFailure):
+        entry = "" if failure.entry is None else f", entry {failure.entry}"
+        super().__init__(
+            f"Page {failure.name!r} ({failure.page_id}{entry}) failed: "
+            f"{failure.error}\n{failure.traceback}"
+        )
+        self.failure = failure
+
+
+def split_task(pages: list) -> list[tuple[list]]:
+    """
+    Split a task into tasks of one page, to find the page that fails.
+    """
+    return [([page],) for page in pages]
+
+
+def share_pages(
+    buffer: SharedRingBuffer, pages: list[WiktionaryPage]
+) -> tuple[list[WiktionaryPage | SharedPage]]:
+    """
+    Write the wikitext of "pages" into one region of "buffer" and replace
+    the pages with SharedPage tuples, so only offsets are pickled and sent
+    to the workers. If the buffer is full, the pages are sent as they are.
+    """
+    shared = [(page, page.wikitext.encode()) for page in pages if page.wikitext]
+    offsets = buffer.write([data for _, data in shared])
+
+    if offsets is None:
+        return (pages,)
+
+    shared_pages = {
+        id(page): (page.page_id, page.name, page.redirect_to, offset, len(data))
+        for (page, data), offset in zip(shared, offsets, strict=True)
+    }
+
+    return ([shared_pages.get(id(page), page) for page in pages],)
+
+
+def unshare_pages(
+    memory: SharedMemory | None, pages: list[WiktionaryPage | SharedPage]
+) -> list[WiktionaryPage]:
+    """
+    Replace the SharedPage tuples of a task created by "share_pages" with
+    pages, decoding their wikitext from shared memory (in the worker, or in
+    the parent before the region is released).
+    """
+    return [
+        page
+        if isinstance(page, WiktionaryPage)
+        else WiktionaryPage(
+            page_id=page[0],
+            name=page[1],
+            wikitext=str(memory.buf[page[3] : page[3] + page[4]], "utf-8"),
+            redirect_to=page[2],
+        )
+        for page in pages
+    ]
+
+
+def page_id_of(page: WiktionaryPage | SharedPage) -> int:
+    """
+    Page id of a page of a task created by "share_pages".
+    """
+    return page.page_id if isinstance(page, WiktionaryPage) else page[0]
+
+
+def release_shared_pages(
+    buffer: SharedRingBuffer, pages: list[WiktionaryPage | SharedPage]
+):
+    """
+    Release the region of a task created by "share_pages".
+    """
+    for page in pages:
+        if isinstance(page, tuple):
+            buffer.release(page[3])
+            return
+
+
+def init_worker(
+    validate: bool,
+    fields: set[str] | None,
+    where: Where | None,
+    include_meanings: bool,
+    shared_memory_name: str | None = None,
+    compact_results: bool = False,
+    entry_time_budget: float | None = None,
+    parser_time_budget: float | None = None,
+):
+    """
+    Create the parser of a worker process once, it is used for all tasks of
+    the worker. With time budgets, SIGALRM is handled for the whole process
+    (see "install_alarm_handler").
+
+    Errors are raised by the tasks of the worker (as WorkerInitError),
+    because a process pool can't tell a failed setup from a crash.
+    """
+    from wiktionary_de_parser import WiktionaryParser
+
+    global worker_parser, worker_include_meanings
+    global worker_shared_memory, worker_encoder, worker_init_error
+
+    worker_init_error = None
+    worker_encoder = None
+
+    try:
+        worker_parser = WiktionaryParser(
+            validate=validate,
+            fields=fields,
+            where=where,
+            entry_time_budget=entry_time_budget,
+            parser_time_budget=parser_time_budget,
+        )
+        worker_include_meanings = include_meanings
+
+        if entry_time_budget is not None or parser_time_budget is not None:
+            from wiktionary_de_parser.utils.time_budget import (
+                install_alarm_handler,
+            )
+
+            install_alarm_handler()
+
+        if compact_results:
+            from wiktionary_de_parser.wire import ResultEncoder
+
+            worker_encoder = ResultEncoder()
+
+        if shared_memory_name is not None:
+            from wiktionary_de_parser.utils.shared_memory import (
+                attach_shared_memory,
+            )
+
+            worker_shared_memory = attach_shared_memory(shared_memory_name)
+    except Exception as error:
+        worker_init_error = error
+
+
+def parse_pages_chunk(
+    pages: list[WiktionaryPage | SharedPage],
+) -> tuple[
+    list[ParsedWiktionaryPageEntry] | EncodedResults,
+    TaskStats,
+    list[PageFailure],
+]:
+    """
+    Worker function of "WiktionaryParser.parse_pages" (process pool).
+    The wikitext of SharedPage tuples is decoded from shared memory.
+    Results are encoded in the compact format if the worker was started
+    with "compact_results".
+    """
+    if worker_init_error is not None:
+        raise WorkerInitError(
+            f"Setup of the worker failed: {worker_init_error!r}"
+        ) from worker_init_error
+
+    pages = unshare_pages(worker_shared_memory, pages)
+
+    results, stats, failures = parse_pages_with(
+        worker_parser, worker_include_meanings, pages
+    )
+
+    if worker_encoder is not None:
+        return worker_encoder.encode_all(results), stats, failures
+
+    return results, stats, failures
+
+
+def parse_pages_with(
+    parser: WiktionaryParser,
+    include_meanings: bool,
+    pages: list[WiktionaryPage],
+) -> tuple[list[ParsedWiktionaryPageEntry], TaskStats, list[PageFailure]]:
+    """
+    Parse the entries of "pages" with "parser". In the thread pool of
+    "WiktionaryParser.parse_pages", all threads share the same parser.
+
+    Errors are caught for every entry, so one broken entry doesn't stop the
+    other entries of the task. They are returned as PageFailure.
+    """
+    start = time.perf_counter()
+    results = []
+    failures = []
+
+    for page in pages:
+        try:
+            entries = list(parser.entries_from_page(page))
+        except Exception as error:
+            failures.append(PageFailure.from_error(page, error))
+            continue
+
+        for entry in entries:
+            try:
+                result = parser.parse_entry(
+                    entry, include_meanings=include_meanings
+                )
+            except Exception as error:
+                failures.append(
+                    PageFailure.from_error(page, error, entry=entry.index)
+                )
+                continue
+
+            if result is not None:
+                results.append(result)
+
+    stats = TaskStats(
+        worker=threading.get_native_id(),
+        pages=len(pages),
+        size=sum(map(page_size, pages)),
+        seconds=time.perf_counter() - start,
+    )
+
+    return results, stats, failures
@@ -1,18 +1,35 @@
 import re
 from dataclasses import dataclass, field
+from typing import ClassVar
 
-from wiktionary_de_parser.models import WiktionaryPageEntry
+from wiktionary_de_parser.parser.context import EntryContext
+from wiktionary_de_parser.records import WiktionaryPageEntry
 
 
 @dataclass(slots=True)
 class Parser:
     entry: WiktionaryPageEntry
     name: str = field(init=False)
+    # Relative cost of "run", cheap parsers run first when entries are
+    # filtered (see "where" of "WiktionaryParser.parse_entry")
+    cost: ClassVar[int] = 10
+    # Shared by all parsers of an entry (created if not passed)
+    context: EntryContext | None = None
+
+    def __post_init__(self):
+        if self.context is None:
+            self.context = EntryContext(self.entry.wikitext)
 
     def run(self):
         # Raise to be implemented error
         raise NotImplementedError
 
+    def section(self, heading: str) -> str | None:
+        """
+        Return the text of the section "{{heading}}" of the entry.
+        """
+        return self.context.section(heading)
+
     @staticmethod
     def find_paragraph(heading: str, wikitext: str) -> str | None:
         pattern = re.compile(
@@ -25,4 +42,5 @@ class Parser:
 
     @staticmethod
     def strip_html_tags(text: str):
-        return re.sub(r"<[^>]+>", " ", text)
+        # Tags can't contain "<", so every "<" is scanned up to the next one
+        return re.sub(r"<[^<>]+>", " ", text)
@@ -0,0 +1,87 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+MWPARSERFROMHELL = "mwparserfromhell"
+WIKITEXTPARSER = "wikitextparser"
+
+# Sections begin with a template on its own line, e.g. "{{Aussprache}}"
+SECTION_HEADING = re.compile(r"{{([^{}|\n]*)}}\n")
+
+
+def index_sections(wikitext: str) -> dict[str, tuple[int, int]]:
+    """
+    Map the heading of every section to the (start, end) positions of its
+    text in a single pass. A section ends before the next line that begins
+    with a template (or at the end of the text). If a heading occurs more
+    than once, the first section is used.
+    """
+    sections: dict[str, tuple[int, int]] = {}
+
+    for match in SECTION_HEADING.finditer(wikitext):
+        heading = match.group(1)
+        if heading in sections:
+            continue
+
+        start = match.end()
+        end = wikitext.find("\n{{", start)
+        sections[heading] = (start, end if end != -1 else len(wikitext))
+
+    return sections
+
+
+def parse_wikitext(library: str, wikitext: str) -> Any:
+    # The libraries are imported here, so they are only imported when needed
+    if library == MWPARSERFROMHELL:
+        import mwparserfromhell
+
+        return mwparserfromhell.parse(wikitext)
+
+    if library == WIKITEXTPARSER:
+        import wikitextparser
+
+        return wikitextparser.parse(wikitext)
+
+    raise ValueError(f"Unknown library: {library}")
+
+
+@dataclass(slots=True)
+class EntryContext:
+    """
+    Data about an entry that is shared by all parsers of the entry, so it is
+    only computed once.
+    """
+
+    wikitext: str
+    sections: dict[str, tuple[int, int]] = field(init=False)
+    # Parse trees by (library, heading)
+    trees: dict[tuple[str, str], Any] = field(init=False, default_factory=dict)
+
+    def __post_init__(self):
+        self.sections = index_sections(self.wikitext)
+
+    def section(self, heading: str) -> str | None:
+        """
+        Return the text of the section with the heading "{{heading}}".
+        """
+        span = self.sections.get(heading)
+
+        return self.wikitext[span[0] : span[1]] if span else None
+
+    def tree(self, library: str, heading: str) -> Any:
+        """
+        Return the parse tree of the section "{{heading}}" (None if the entry
+        has no such section). Every section is parsed at most once per
+        library, so parsers must not modify the tree.
+
+        "library" is MWPARSERFROMHELL or WIKITEXTPARSER.
+        """
+        key = (library, heading)
+
+        if key not in self.trees:
+            section = self.section(heading)
+            self.trees[key] = (
+                parse_wikitext(library, section) if section else None
+            )
+
+        return self.trees[key]
@@ -1,8 +1,13 @@
+from __future__ import annotations
+
 import re
+from typing import TYPE_CHECKING
 
-from wiktionary_de_parser.models import ParseFlexionResult
 from wiktionary_de_parser.parser import Parser
 
+if TYPE_CHECKING:
+    from wiktionary_de_parser.models import ParseFlexionResult
+
 WANTED_TABLE_NAMES = [
     "Deutsch Adjektiv Übersicht",
     "Deutsch Adverb Übersicht",
@@ -16,25 +21,44 @@ WANTED_TABLE_NAMES = [
     "Deutsch Verb Übersicht",
 ]
 
+# Start of a wanted table, the table ends at the first "}}" (see find_table)
+TABLE_START = re.compile(
+    "{{(?:" + "|".join(map(re.escape, WANTED_TABLE_NAMES)) + ")"
+)
+# Parameters of a table: "|key=value", keys can't contain "|". Without the
+# "|", every "|" of a line without "=" would scan to the end of the line.
+TABLE_VALUE = re.compile(r"\|([^=\n|]+)=([^\n|}]+)")
+
 
 class ParseFlexion(Parser):
     name = "flexion"
+    cost = 1
 
     @staticmethod
     def find_table(text):
-        re_string = "({{(" + "|".join(WANTED_TABLE_NAMES) + ")[^}]+}})"
-        match_table = re.search(re_string, text)
+        """
+        Return the first wanted table: "{{<name>" followed by text up to the
+        first "}", which must be "}}". Tables that start before the same "}"
+        end there, too, so every character is scanned once (a regular
+        expression would scan to the end of the text for every unclosed
+        table).
+        """
+        position = 0
 
-        if not match_table:
-            return
+        while match_table := TABLE_START.search(text, position):
+            end = text.find("}", match_table.end())
+
+            if end == -1:
+                return
+
+            if end > match_table.end() and text.startswith("}", end + 1):
+                return text[match_table.start() : end + 2]
 
-        return match_table.group(1)
+            position = end + 1
 
     @staticmethod
     def parse_table_values(table_string):
-        table_values = re.findall(
-            r"(?:\|([^=\n]+)=([^\n|}]+))+?", table_string, re.MULTILINE
-        )
+        table_values = TABLE_VALUE.findall(table_string)
 
         if not table_values:
             return
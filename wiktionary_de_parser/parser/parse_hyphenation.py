@@ -1,17 +1,24 @@
+from __future__ import annotations
+
 import re
+from typing import TYPE_CHECKING
 
-from wiktionary_de_parser.models import ParseHyphenationResult
 from wiktionary_de_parser.parser import Parser
+from wiktionary_de_parser.parser.context import EntryContext
+
+if TYPE_CHECKING:
+    from wiktionary_de_parser.models import ParseHyphenationResult
 
 
 class ParseHyphenation(Parser):
     name = "hyphenation"
+    cost = 1
 
     @classmethod
-    def parse_hyphenation(cls, name: str, wikitext: str):
+    def parse_hyphenation(cls, name: str, paragraph: str | None):
         """
         Parse hyphenation
-        "{{Worttrennung}}"-template.
+        "{{Worttrennung}}"-paragraph.
 
         Problem:
         Commas can be part of the "title", but we don't know where they are and are not.
@@ -27,12 +34,11 @@ class ParseHyphenation(Parser):
 
         Reference: https://de.wiktionary.org/wiki/Hilfe:Worttrennung
         """
-        text = cls.strip_html_tags(wikitext)
-        paragraph = cls.find_paragraph("Worttrennung", text)
-
         if not paragraph:
             return
 
+        paragraph = cls.strip_html_tags(paragraph)
+
         # remove false mid dot at the beginning that breaks the parser (":·nutz·lo·se")
         paragraph = paragraph.lstrip(":·")
 
@@ -46,7 +52,7 @@ class ParseHyphenation(Parser):
             # test if title can be inserted from current index
             # remove mid dots for testing
             if start_index == -1:
-                if paragraph[index:].replace("·", "").startswith(name):
+                if cls.starts_with_name(paragraph, index, name):
                     start_index = index
                     end_index = index
                 continue
@@ -76,9 +82,47 @@ class ParseHyphenation(Parser):
         if result:
             return result
 
+    @staticmethod
+    def starts_with_name(paragraph: str, index: int, name: str) -> bool:
+        """
+        Same as 'paragraph[index:].replace("·", "").startswith(name)', but
+        without copying the rest of the paragraph for every index.
+        """
+        position = index
+
+        for char in name:
+            while position < len(paragraph) and paragraph[position] == "·":
+                position += 1
+
+            if position == len(paragraph) or paragraph[position] != char:
+                return False
+
+            position += 1
+
+        return True
+
+    @classmethod
+    def find_section(
+        cls, wikitext: str, context: EntryContext | None = None
+    ) -> str | None:
+        """
+        Find the "{{Worttrennung}}" section after removing html tags, as
+        html comments can contain (outdated) headings. The sections of
+        "context" are only used if the wikitext has no tags.
+        """
+        if context is not None and "<" not in wikitext:
+            return context.section("Worttrennung")
+
+        text = cls.strip_html_tags(wikitext)
+
+        return EntryContext(text).section("Worttrennung")
+
     @classmethod
     def parse(cls, name: str, wikitext: str):
-        return cls.parse_hyphenation(name, wikitext)
+        return cls.parse_hyphenation(name, cls.find_section(wikitext))
 
     def run(self) -> ParseHyphenationResult:
-        return self.parse(self.entry.page.name, self.entry.wikitext)
+        return self.parse_hyphenation(
+            self.entry.page.name,
+            self.find_section(self.entry.wikitext, self.context),
+        )
@@ -1,11 +1,17 @@
-import mwparserfromhell
-from mwparserfromhell.nodes.tag import Tag
-from mwparserfromhell.nodes.template import Template
-from mwparserfromhell.nodes.text import Text
-from mwparserfromhell.wikicode import Wikicode
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
-from wiktionary_de_parser.models import ParseIpaResult
 from wiktionary_de_parser.parser import Parser
+from wiktionary_de_parser.parser.context import (
+    MWPARSERFROMHELL,
+    parse_wikitext,
+)
+
+if TYPE_CHECKING:
+    from mwparserfromhell.wikicode import Wikicode
+
+    from wiktionary_de_parser.models import ParseIpaResult
 
 WANTED_TABLE_NAMES = [
     "Deutsch Adjektiv Übersicht",
@@ -44,6 +50,7 @@ class ParseIpa(Parser):
 
         Reference: https://de.wiktionary.org/wiki/Hilfe:Aussprache
         """
+        from mwparserfromhell.nodes import Tag, Template, Text
 
         found_ipa: list[str] = []
         found_ipa_tmpl = False
@@ -86,7 +93,10 @@ class ParseIpa(Parser):
 
     @classmethod
     def parse(cls, wikitext: str):
-        parsed_paragraph = mwparserfromhell.parse(wikitext)
+        return cls.parse_tree(parse_wikitext(MWPARSERFROMHELL, wikitext))
+
+    @classmethod
+    def parse_tree(cls, parsed_paragraph: Wikicode | None):
         result = None
 
         if parsed_paragraph:
@@ -97,10 +107,7 @@ class ParseIpa(Parser):
         return result
 
     def run(self) -> ParseIpaResult:
-        paragraph = self.find_paragraph("Aussprache", self.entry.wikitext)
-        result = None
-
-        if paragraph:
-            result = self.parse(paragraph)
-
-        return result
+        # The tree is shared with the rhymes parser
+        return self.parse_tree(
+            self.context.tree(MWPARSERFROMHELL, "Aussprache")
+        )
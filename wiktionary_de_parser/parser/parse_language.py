@@ -1,26 +1,49 @@
+from __future__ import annotations
+
 import re
+from typing import TYPE_CHECKING
 
 from wiktionary_de_parser.config import PACKAGE_PATH
-from wiktionary_de_parser.models import Language, ParseLanuageResult
 from wiktionary_de_parser.parser import Parser
+from wiktionary_de_parser.utils.concurrency import thread_safe_cache
+
+if TYPE_CHECKING:
+    from wiktionary_de_parser.models import ParseLanuageResult
+
+
+@thread_safe_cache
+def get_lang_codes() -> dict[str, str]:
+    """
+    Language names (lower case) mapped to ISO 639-1 codes, loaded on first use.
+    https://de.wiktionary.org/wiki/Hilfe:Sprachcodes
+    """
+    lang_codes = {}
+    with open(
+        PACKAGE_PATH.joinpath("assets/sprachcodes_iso639-1.txt"),
+        encoding="utf-8",
+    ) as f:
+        lines = f.read().split("\n")
+        for line in lines:
+            x = line.split(",")
+            lang_codes[x[0]] = x[1]
 
-# https://de.wiktionary.org/wiki/Hilfe:Sprachcodes
-LANG_CODES = {}
-with open(
-    PACKAGE_PATH.joinpath("assets/sprachcodes_iso639-1.txt"), encoding="utf-8"
-) as f:
-    lines = f.read().split("\n")
-    for line in lines:
-        x = line.split(",")
-        LANG_CODES[x[0]] = x[1]
+    return lang_codes
+
+
+# Parameters end at the end of the line and can't contain other templates,
+# so a heading that isn't closed is only scanned up to the next template
+WORTART_LANGUAGE = re.compile(
+    r"=== ?{{Wortart\|[^{}|\n]+\|([^{}|\n]+)(?:\|[^{}|\n]+)*}}"
+)
 
 
 class ParseLanguage(Parser):
     name = "language"
+    cost = 1
 
     @staticmethod
     def parse_language(text: str):
-        match_lang = re.search(r"=== ?{{Wortart\|[^}|]+\|([^}|]+)(?:\|[^}|]+)*}}", text)
+        match_lang = WORTART_LANGUAGE.search(text)
 
         if not match_lang:
             return
@@ -38,13 +61,16 @@ class ParseLanguage(Parser):
         if result["lang"]:
             # get language code
             lang_lower = result["lang"].lower()
+            lang_codes = get_lang_codes()
 
-            if lang_lower in LANG_CODES:
-                result["lang_code"] = LANG_CODES[lang_lower]
+            if lang_lower in lang_codes:
+                result["lang_code"] = lang_codes[lang_lower]
 
         return result
 
     def run(self) -> ParseLanuageResult:
+        from wiktionary_de_parser.models import Language
+
         result = self.parse(self.entry.wikitext)
 
         return Language(**result)
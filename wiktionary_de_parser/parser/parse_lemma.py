@@ -1,18 +1,21 @@
-import re
+from __future__ import annotations
 
-import mwparserfromhell
-from mwparserfromhell.nodes.template import Template
+import re
+from typing import TYPE_CHECKING
 
-from wiktionary_de_parser.models import (
-    Lemma,
-    ParseLemmaResult,
-    ReferenceType,
-)
 from wiktionary_de_parser.parser import Parser
 
+if TYPE_CHECKING:
+    from wiktionary_de_parser.models import (
+        Lemma,
+        ParseLemmaResult,
+        ReferenceType,
+    )
+
 
 class ParseLemma(Parser):
     name = "lemma"
+    cost = 2
 
     @staticmethod
     def parse_lemma(text) -> tuple[str | None, ReferenceType]:
@@ -37,6 +40,11 @@ class ParseLemma(Parser):
             {{Lemmaverweis|mild}} → ("mild", VARIANT)
             No template → (None, NONE)
         """
+        import mwparserfromhell
+        from mwparserfromhell.nodes import Template
+
+        from wiktionary_de_parser.models import ReferenceType
+
         # Search for either Grundformverweis or Lemmaverweis templates
         match = re.search(r"({{(?:Grundformverweis|Lemmaverweis).+)", text)
         if not match:
@@ -83,6 +91,8 @@ class ParseLemma(Parser):
         Returns:
             Lemma object with canonical form and reference type
         """
+        from wiktionary_de_parser.models import Lemma, ReferenceType
+
         found_lemma = page_name
         reference_type = ReferenceType.NONE
 
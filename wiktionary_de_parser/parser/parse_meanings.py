@@ -1,15 +1,20 @@
-import wikitextparser as wtp
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
-from wiktionary_de_parser.models import MeaningDict, ParseMeaningsResults
 from wiktionary_de_parser.parser import Parser
-from wiktionary_de_parser.utils.meanings.wiki_list import (
-    WikiList,
-    WikiListItem,
-)
+from wiktionary_de_parser.parser.context import WIKITEXTPARSER, parse_wikitext
+
+if TYPE_CHECKING:
+    import wikitextparser as wtp
+
+    from wiktionary_de_parser.models import MeaningDict, ParseMeaningsResults
+    from wiktionary_de_parser.utils.meanings.wiki_list import WikiList
 
 
 class ParseMeanings(Parser):
     name = "meanings"
+    cost = 20
 
     @classmethod
     def parse_wiki_list(cls, wiki_lists: list[wtp.WikiList]) -> WikiList | None:
@@ -20,6 +25,10 @@ class ParseMeanings(Parser):
         Lists could have a depth of 3 (or more?)
         Example: https://de.wiktionary.org/wiki/wegen
         """
+        from wiktionary_de_parser.utils.meanings.wiki_list import (
+            WikiList,
+            WikiListItem,
+        )
 
         list_items: list[WikiListItem] = []
 
@@ -76,7 +85,10 @@ class ParseMeanings(Parser):
 
     @classmethod
     def parse(cls, wikitext: str):
-        parsed_paragraph = wtp.parse(wikitext)
+        return cls.parse_tree(parse_wikitext(WIKITEXTPARSER, wikitext))
+
+    @classmethod
+    def parse_tree(cls, parsed_paragraph: wtp.WikiText | None):
         result = None
 
         if parsed_paragraph:
@@ -87,13 +99,7 @@ class ParseMeanings(Parser):
         return result
 
     def run(self) -> ParseMeaningsResults:
-        paragraph = self.find_paragraph("Bedeutungen", self.entry.wikitext)
-        result = None
-
-        if paragraph:
-            result = self.parse(paragraph)
-
-        return result
+        return self.parse_tree(self.context.tree(WIKITEXTPARSER, "Bedeutungen"))
 
 
 def format_meaning_dict(meaning_dict: MeaningDict, level: int = 0) -> str:
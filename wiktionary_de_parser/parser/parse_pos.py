@@ -1,9 +1,15 @@
+from __future__ import annotations
+
 import itertools
 import re
+import threading
+from typing import TYPE_CHECKING
 
-from wiktionary_de_parser.models import ParsePosResult
 from wiktionary_de_parser.parser import Parser
 
+if TYPE_CHECKING:
+    from wiktionary_de_parser.models import ParsePosResult
+
 DEBUG = False
 
 # Mapping from genitive forms in "Grammatische Merkmale" to (POS, subtype)
@@ -123,7 +129,10 @@ POS_MAP = {
     "Wortverbindung": [],
 }
 
+# POS names missing in POS_MAP that were printed already (only with DEBUG).
+# Parsers may run in several threads (see "WiktionaryParser.parse_pages").
 NOT_IN_MAP = set()
+NOT_IN_MAP_LOCK = threading.Lock()
 
 if DEBUG is True:
     all_pos_names = list(POS_MAP.keys()) + list(
@@ -134,6 +143,7 @@ if DEBUG is True:
 
 class ParsePos(Parser):
     name = "pos"
+    cost = 1
 
     @staticmethod
     def find_pos(pos_names, text):
@@ -191,13 +201,15 @@ class ParsePos(Parser):
                         result[key].append(value)
 
         if DEBUG is True:
-            not_found_names = [
-                x
-                for x in pos_names
-                if x.lower() not in all_pos_names and x not in NOT_IN_MAP
-            ]
-            if not_found_names:
+            with NOT_IN_MAP_LOCK:
+                not_found_names = [
+                    x
+                    for x in pos_names
+                    if x.lower() not in all_pos_names and x not in NOT_IN_MAP
+                ]
                 NOT_IN_MAP.update(not_found_names)
+
+            if not_found_names:
                 for name in not_found_names:
                     print(
                         '"{}" not in POS-map (all: {})'.format(
@@ -263,8 +275,10 @@ class ParsePos(Parser):
         if match_line:
             # can have multiple POS values
             line = match_line.group(1)
+            # Parameters can't contain templates, otherwise every unclosed
+            # template would be scanned to the end of the line
             pos_names = re.findall(
-                r"{{Wortart(?:-Test)?\|([^}|]+)(?:\|[^}|]+)*}}", line
+                r"{{Wortart(?:-Test)?\|([^{}|]+)(?:\|[^{}|]+)*}}", line
             )
 
             if pos_names:
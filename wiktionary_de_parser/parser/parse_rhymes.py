@@ -1,11 +1,17 @@
-import mwparserfromhell
-from mwparserfromhell.nodes.tag import Tag
-from mwparserfromhell.nodes.template import Template
-from mwparserfromhell.nodes.text import Text
-from mwparserfromhell.wikicode import Wikicode
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
-from wiktionary_de_parser.models import ParseRhymesResult
 from wiktionary_de_parser.parser import Parser
+from wiktionary_de_parser.parser.context import (
+    MWPARSERFROMHELL,
+    parse_wikitext,
+)
+
+if TYPE_CHECKING:
+    from mwparserfromhell.wikicode import Wikicode
+
+    from wiktionary_de_parser.models import ParseRhymesResult
 
 
 class ParseRhymes(Parser):
@@ -13,6 +19,8 @@ class ParseRhymes(Parser):
 
     @staticmethod
     def parse_rhymes(parsed_paragraph: Wikicode):
+        from mwparserfromhell.nodes import Tag, Template, Text
+
         found_rhymes: list[str] = []
         found_rhyme_tmpl = False
 
@@ -50,7 +58,10 @@ class ParseRhymes(Parser):
 
     @classmethod
     def parse(cls, wikitext: str):
-        parsed_paragraph = mwparserfromhell.parse(wikitext)
+        return cls.parse_tree(parse_wikitext(MWPARSERFROMHELL, wikitext))
+
+    @classmethod
+    def parse_tree(cls, parsed_paragraph: Wikicode | None):
         result = None
 
         if parsed_paragraph:
@@ -61,10 +72,7 @@ class ParseRhymes(Parser):
         return result
 
     def run(self) -> ParseRhymesResult:
-        paragraph = self.find_paragraph("Aussprache", self.entry.wikitext)
-        result = None
-
-        if paragraph:
-            result = self.parse(paragraph)
-
-        return result
+        # The tree is shared with the IPA parser
+        return self.parse_tree(
+            self.context.tree(MWPARSERFROMHELL, "Aussprache")
+        )
@@ -0,0 +1,54 @@
+from importlib import import_module
+from importlib.metadata import entry_points
+from typing import Type
+
+from wiktionary_de_parser.parser import Parser
+from wiktionary_de_parser.utils.concurrency import thread_safe_cache
+
+# Third-party packages can add parsers by registering a Parser subclass in
+# this entry point group, e.g. with Poetry:
+#   [tool.poetry.plugins."wiktionary_de_parser.parsers"]
+#   "my_parser" = "my_package.my_module:MyParser"
+# The result of a parser is available as "result.<parser name>".
+ENTRY_POINT_GROUP = "wiktionary_de_parser.parsers"
+
+BUILTIN_PARSERS = [
+    "wiktionary_de_parser.parser.parse_flexion:ParseFlexion",
+    "wiktionary_de_parser.parser.parse_hyphenation:ParseHyphenation",
+    "wiktionary_de_parser.parser.parse_ipa:ParseIpa",
+    "wiktionary_de_parser.parser.parse_language:ParseLanguage",
+    "wiktionary_de_parser.parser.parse_lemma:ParseLemma",
+    "wiktionary_de_parser.parser.parse_meanings:ParseMeanings",
+    "wiktionary_de_parser.parser.parse_pos:ParsePos",
+    "wiktionary_de_parser.parser.parse_rhymes:ParseRhymes",
+]
+
+
+def load_parser_class(path: str) -> Type[Parser]:
+    module_name, class_name = path.split(":")
+
+    return getattr(import_module(module_name), class_name)
+
+
+@thread_safe_cache
+def get_parser_classes() -> tuple[Type[Parser], ...]:
+    """
+    Return all parser classes. Modules are imported the regular way (once
+    per process), so every parser class has a single identity.
+    """
+    classes = [load_parser_class(path) for path in BUILTIN_PARSERS]
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        parser_class = entry_point.load()
+
+        if not (
+            isinstance(parser_class, type) and issubclass(parser_class, Parser)
+        ):
+            raise TypeError(
+                f"Entry point {entry_point.name} ({entry_point.value}) is not "
+                "a Parser subclass."
+            )
+
+        classes.append(parser_class)
+
+    return tuple(classes)
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+
+from wiktionary_de_parser.utils.concurrency import thread_safe_cache
+
+# Pages and entries are created for every page of the dump, so they are plain
+# dataclasses (cheaper to create and to pickle than pydantic models).
+# This module doesn't import pydantic, so reading the dump doesn't need it.
+# Use "validate_page" to create a page with validation.
+
+
+@dataclass(slots=True)
+class WiktionaryPage:
+    page_id: int
+    name: str
+    wikitext: str | None
+    redirect_to: str | None = None
+
+
+@dataclass(slots=True)
+class WiktionaryPageEntry:
+    page: WiktionaryPage
+    index: int
+    wikitext: str
+
+
+def validate_page(page_data: dict) -> WiktionaryPage:
+    return page_adapter().validate_python(page_data)
+
+
+@thread_safe_cache
+def page_adapter():
+    from pydantic import TypeAdapter
+
+    return TypeAdapter(WiktionaryPage)
@@ -0,0 +1,392 @@
+import queue
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    BrokenExecutor,
+    Executor,
+    Future,
+    wait,
+)
+from functools import wraps
+from typing import Any
+
+
+def bounded_map(
+    executor: Executor,
+    fn: Callable,
+    tasks: Iterable[tuple],
+    max_in_flight: int,
+    ordered: bool = True,
+    on_done: Callable[..., None] | None = None,
+):
+    """
+    Like "executor.map(fn, *zip(*tasks))", but tasks are consumed lazily and
+    at most "max_in_flight" tasks are submitted at the same time. This keeps
+    memory bounded when "tasks" is a (large) generator.
+
+    If "ordered" is False, results are yielded as soon as they are done
+    (tasks that are done at the same time in the order of submission).
+
+    "on_done" is called with the arguments of every task as soon as it is
+    done or cancelled (in the thread that completes the task).
+    """
+    tasks = iter(tasks)
+    pending: deque[Future] = deque()
+
+    def submit_next() -> bool:
+        task = next(tasks, None)
+        if task is None:
+            return False
+        future = executor.submit(fn, *task)
+        if on_done is not None:
+            future.add_done_callback(lambda _: on_done(*task))
+        pending.append(future)
+        return True
+
+    try:
+        while len(pending) < max_in_flight and submit_next():
+            pass
+
+        while pending:
+            if ordered:
+                yield pending.popleft().result()
+                submit_next()
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            # In the order of submission, not in the (random) order of a set
+            for future in [future for future in pending if future in done]:
+                pending.remove(future)
+                yield future.result()
+                submit_next()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+class TaskPart:
+    # A task, or a part of a task that was split (see TaskRunner)
+    __slots__ = ("args", "future", "attempts", "result", "error", "done")
+
+    def __init__(self, args: tuple):
+        self.args = args
+        self.future: Future | None = None
+        self.attempts = 0
+        self.result = None
+        self.error: BaseException | None = None
+        self.done = False
+
+
+class TaskRunner:
+    """
+    Like "bounded_map", but for long runs in which single tasks may fail:
+
+    - A task that raises is split into smaller tasks with "split" (if it
+      returns more than one task), otherwise it is retried up to "retries"
+      times.
+    - If the executor breaks (e.g. a worker process crashed), a new one is
+      created with "make_executor". The tasks that were running are
+      repeated one at a time, until all of them are done, so the task that
+      crashes the executor can be told apart from the others.
+
+    Errors of the types in "fatal" are raised instead (e.g. errors in the
+    setup of a worker, which would fail every task).
+
+    Iterating yields every task as a list of (args, result, error) for its
+    parts, with "error" set if the part failed after all retries. "on_result"
+    is called with every result as soon as it is done (in the thread that
+    completes the task, in the order the tasks are completed). "on_done" is
+    called with the arguments of every task after it was yielded.
+    """
+
+    def __init__(
+        self,
+        make_executor: Callable[[], Executor],
+        fn: Callable,
+        tasks: Iterable[tuple],
+        max_in_flight: int,
+        ordered: bool = True,
+        retries: int = 2,
+        split: Callable[..., list[tuple]] | None = None,
+        on_result: Callable[[Any], None] | None = None,
+        on_done: Callable[..., None] | None = None,
+        fatal: tuple[type[BaseException], ...] = (),
+    ):
+        self.make_executor = make_executor
+        self.fn = fn
+        self.tasks = iter(tasks)
+        self.max_in_flight = max_in_flight
+        self.ordered = ordered
+        self.retries = retries
+        self.split = split
+        self.on_result = on_result
+        self.on_done = on_done
+        self.fatal = fatal
+        # Number of parts that were repeated, and of executors that broke
+        self.retried = 0
+        self.broken = 0
+
+    def submit(self, executor: Executor, part: TaskPart):
+        part.future = executor.submit(self.fn, *part.args)
+
+        if self.on_result is not None:
+            part.future.add_done_callback(self.report_result)
+
+    def report_result(self, future: Future):
+        if not future.cancelled() and future.exception() is None:
+            self.on_result(future.result())
+
+    def fail(self, parts: list[TaskPart], part: TaskPart, error: BaseException):
+        """
+        Split or retry a part that failed. Return the parts to run next.
+        """
+        if self.split is not None:
+            split_args = self.split(*part.args)
+
+            if len(split_args) > 1:
+                index = parts.index(part)
+                new_parts = [TaskPart(args) for args in split_args]
+                parts[index : index + 1] = new_parts
+                self.retried += len(new_parts)
+                return new_parts
+
+        part.attempts += 1
+
+        if part.attempts > self.retries:
+            part.error = error
+            part.done = True
+            return []
+
+        self.retried += 1
+        return [part]
+
+    def __iter__(self):
+        executor = self.make_executor()
+        # Parts of every task, in the order of the tasks
+        pending: deque[tuple[tuple, list[TaskPart]]] = deque()
+        # Parts to submit (again)
+        ready: deque[TaskPart] = deque()
+        # Parts that were running when the executor broke, they run alone
+        suspects: deque[TaskPart] = deque()
+        exhausted = False
+
+        def running() -> list[TaskPart]:
+            return [
+                part
+                for _, parts in pending
+                for part in parts
+                if not part.done and part.future is not None
+            ]
+
+        def submit_parts() -> bool:
+            """
+            Submit the next parts, return False if the executor is broken.
+            """
+            nonlocal exhausted
+
+            try:
+                if suspects:
+                    if not running():
+                        self.submit(executor, suspects[0])
+                        suspects.popleft()
+                    return True
+
+                while not exhausted and len(pending) < self.max_in_flight:
+                    args = next(self.tasks, None)
+
+                    if args is None:
+                        exhausted = True
+                        break
+
+                    part = TaskPart(args)
+                    pending.append((args, [part]))
+                    ready.append(part)
+
+                while ready:
+                    self.submit(executor, ready[0])
+                    ready.popleft()
+            except BrokenExecutor:
+                return False
+
+            return True
+
+        try:
+            while True:
+                broken = not submit_parts()
+
+                if not pending:
+                    break
+
+                in_flight = running()
+
+                if in_flight and not broken:
+                    wait(
+                        [part.future for part in in_flight],
+                        return_when=FIRST_COMPLETED,
+                    )
+
+                for _, parts in pending:
+                    for part in list(parts):
+                        if part.future is None or not part.future.done():
+                            continue
+
+                        future = part.future
+                        part.future = None
+
+                        if future.cancelled():
+                            suspects.append(part)
+                        elif (error := future.exception()) is None:
+                            part.result = future.result()
+                            part.done = True
+                        elif isinstance(error, BrokenExecutor):
+                            broken = True
+                            if len(in_flight) == 1:
+                                # The only running task broke the executor
+                                suspects.extendleft(
+                                    reversed(self.fail(parts, part, error))
+                                )
+                            else:
+                                suspects.append(part)
+                        elif isinstance(error, self.fatal):
+                            raise error
+                        else:
+                            ready.extend(self.fail(parts, part, error))
+
+                if broken:
+                    self.broken += 1
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    executor = self.make_executor()
+                    # Everything else that was submitted failed, too
+                    for part in running():
+                        part.future = None
+                        suspects.append(part)
+                    suspects.extend(ready)
+                    ready.clear()
+
+                while pending:
+                    index = next(
+                        (
+                            index
+                            for index, (_, parts) in enumerate(pending)
+                            if all(part.done for part in parts)
+                        ),
+                        None,
+                    )
+                    if index is None or (self.ordered and index > 0):
+                        break
+
+                    args, parts = pending[index]
+                    del pending[index]
+
+                    yield [
+                        (part.args, part.result, part.error) for part in parts
+                    ]
+
+                    if self.on_done is not None:
+                        self.on_done(*args)
+        finally:
+            for part in running():
+                part.future.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+class PrefetchError:
+    # Wraps an exception of the producer thread of "prefetched"
+    __slots__ = ("exception",)
+
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+PREFETCH_DONE = object()
+
+
+def prefetched(iterable: Iterable, size: int, batch_size: int = 64):
+    """
+    Iterate over "iterable" in a background thread and buffer up to "size"
+    items in a queue. The work of the iterable (e.g. decompression and XML
+    parsing in C code, which releases the GIL) overlaps with the work of the
+    caller.
+
+    Items are passed in lists of up to "batch_size" items, so the queue isn't
+    locked for every item. Exceptions of the iterable are raised in the
+    caller. If the caller stops early, the thread stops and closes the
+    iterable.
+    """
+    batch_size = max(1, min(batch_size, size))
+    batches: queue.Queue = queue.Queue(maxsize=max(1, size // batch_size))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+    def produce():
+        iterator = iter(iterable)
+        batch: list = []
+
+        try:
+            for item in iterator:
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    if not put(batch):
+                        return
+                    batch = []
+
+            if batch and not put(batch):
+                return
+            put(PREFETCH_DONE)
+        except BaseException as e:
+            put(PrefetchError(e))
+        finally:
+            # Generators must be closed in the thread that iterates them
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+
+    try:
+        while (batch := batches.get()) is not PREFETCH_DONE:
+            if isinstance(batch, PrefetchError):
+                raise batch.exception
+            yield from batch
+    finally:
+        stop.set()
+        thread.join()
+
+
+def thread_safe_cache(function: Callable) -> Callable:
+    """
+    Like "functools.cache", but "function" runs only once per arguments,
+    even if several threads call it at the same time ("functools.cache" may
+    run it in every thread and keep the last result). Cached results are
+    read without locking.
+    """
+    results: dict = {}
+    lock = threading.RLock()
+
+    @wraps(function)
+    def wrapper(*args):
+        try:
+            return results[args]
+        except KeyError:
+            pass
+
+        with lock:
+            if args not in results:
+                results[args] = function(*args)
+
+            return results[args]
+
+    wrapper.cache_clear = results.clear
+
+    return wrapper
@@ -0,0 +1,32 @@
+import re
+from collections.abc import Iterator
+
+ENTRY_START = "=== {{Wortart"
+# New entries begin at "==" and "===" headings
+ENTRY_BOUNDARY = re.compile(r"^===? ", re.MULTILINE)
+
+
+def entry_spans(wikitext: str) -> Iterator[tuple[int, int]]:
+    """
+    Find the entries of a page and yield their (start, end) positions.
+
+    An entry starts at "=== {{Wortart" and ends before the line break in front
+    of the next "==" or "===" heading (or at the end of the page). The page is
+    scanned once, so this takes linear time. The spans are the same as the
+    matches of the regular expression that was used before:
+        (=== {{Wortart(?:[\\w\\W](?!^===? ))+)
+    """
+    pos = 0
+
+    while (start := wikitext.find(ENTRY_START, pos)) != -1:
+        body = start + len(ENTRY_START)
+        boundary = ENTRY_BOUNDARY.search(wikitext, body + 1)
+        end = boundary.start() - 1 if boundary else len(wikitext)
+
+        if end <= body:
+            # Nothing follows "=== {{Wortart", so this isn't an entry
+            pos = start + 1
+            continue
+
+        yield start, end
+        pos = end
@@ -0,0 +1,116 @@
+import threading
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing shared memory block without registering it with
+    the resource tracker (Python 3.13+), because the creating process
+    unlinks it. Older versions share the resource tracker of the parent in
+    child processes, so registering it again is harmless.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedRingBuffer:
+    """
+    Ring buffer in a shared memory block. Every allocation is a contiguous
+    region, that is released when the reader is done with it (in any order).
+    Space is reused in the order of the allocations, so a region that is
+    released early waits for the older regions.
+
+    Allocations are thread-safe, because regions are usually released by
+    the callbacks of futures.
+    """
+
+    def __init__(self, size: int):
+        self.memory = shared_memory.SharedMemory(create=True, size=size)
+        # The block may be larger than requested (rounded up to pages)
+        self.size = size
+        self.lock = threading.Lock()
+        # Start of the oldest allocation and end of the newest allocation
+        self.head = 0
+        self.tail = 0
+        # Start of every allocation mapped to [end, released]
+        self.allocations: OrderedDict[int, list] = OrderedDict()
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def allocate(self, length: int) -> int | None:
+        """
+        Return the offset of a free region of "length" bytes, or None if
+        there is no space left.
+        """
+        if not 0 < length <= self.size:
+            return None
+
+        with self.lock:
+            if not self.allocations:
+                self.head = self.tail = 0
+
+            if not self.allocations or self.tail > self.head:
+                # Free space after the tail and before the head
+                if self.size - self.tail >= length:
+                    start = self.tail
+                elif self.head >= length:
+                    start = 0
+                else:
+                    return None
+            elif self.head - self.tail >= length:
+                # Wrapped around, the free space is between tail and head
+                start = self.tail
+            else:
+                return None
+
+            self.allocations[start] = [start + length, False]
+            self.tail = start + length
+
+            return start
+
+    def write(self, data: list[bytes]) -> list[int] | None:
+        """
+        Copy "data" into one region and return the offset of every item, or
+        None if there is no space left.
+        """
+        start = self.allocate(sum(map(len, data)))
+
+        if start is None:
+            return None
+
+        offsets = []
+        offset = start
+        for item in data:
+            self.memory.buf[offset : offset + len(item)] = item
+            offsets.append(offset)
+            offset += len(item)
+
+        return offsets
+
+    def release(self, start: int):
+        with self.lock:
+            allocation = self.allocations.get(start)
+            if allocation is None:
+                return
+
+            allocation[1] = True
+
+            while self.allocations:
+                oldest_start, (end, released) = next(
+                    iter(self.allocations.items())
+                )
+                if not released:
+                    self.head = oldest_start
+                    break
+
+                del self.allocations[oldest_start]
+                self.head = end
+
+    def close(self):
+        self.memory.close()
+        self.memory.unlink()
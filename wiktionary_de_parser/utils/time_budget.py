@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import math
+import signal
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+# Timer of the entry that is parsed in the main thread (see "on_alarm")
+active_timer: EntryTimer | None = None
+
+
+class TimeBudgetExceeded(TimeoutError):
+    """
+    Raised when an entry, or one parser of it, takes longer than its time
+    budget (see "entry_time_budget" and "parser_time_budget" of
+    WiktionaryParser).
+    """
+
+    def __init__(
+        self,
+        page_name: str,
+        entry_index: int,
+        parser_name: str,
+        scope: str,
+        seconds: float,
+        budget: float,
+    ):
+        super().__init__(
+            f"Time budget of the {scope} exceeded ({seconds:.3f} s, budget "
+            f"{budget} s) in parser {parser_name!r} of entry {entry_index} "
+            f"of page {page_name!r}"
+        )
+        self.page_name = page_name
+        self.entry_index = entry_index
+        self.parser_name = parser_name
+        # "entry" or "parser"
+        self.scope = scope
+        self.seconds = seconds
+        self.budget = budget
+
+
+def on_alarm(signum, frame):
+    timer = active_timer
+
+    # The alarm may be late, after the parser is done
+    if timer is not None and timer.parser_name is not None:
+        raise timer.exceeded()
+
+
+def can_interrupt() -> bool:
+    """
+    Signals are only handled in the main thread, and not on Windows.
+    """
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+
+
+def install_alarm_handler():
+    """
+    Handle SIGALRM for all entries parsed in this process (e.g. in worker
+    processes), instead of installing the handler for every entry.
+    """
+    if can_interrupt():
+        signal.signal(signal.SIGALRM, on_alarm)
+
+
+class EntryTimer:
+    """
+    Limits the time of the parsers of one entry to "entry_seconds" in total,
+    and to "parser_seconds" for every parser:
+
+        with EntryTimer(5.0, 1.0, page.name, entry.index) as timer:
+            ipa = timer.run("ipa", ParseIpa(entry, context).run)
+
+    In the main thread, a SIGALRM timer interrupts the parser that runs out
+    of time, even in the middle of a regular expression (the regular
+    expression engine checks for signals). Elsewhere (in other threads, on
+    Windows or if the process has a timer already), the time is checked
+    after every parser: a slow parser isn't interrupted, but the entry is
+    still cut off.
+    """
+
+    def __init__(
+        self,
+        entry_seconds: float | None,
+        parser_seconds: float | None,
+        page_name: str,
+        entry_index: int,
+    ):
+        self.entry_seconds = entry_seconds
+        self.parser_seconds = parser_seconds
+        self.page_name = page_name
+        self.entry_index = entry_index
+        self.start = 0.0
+        # The parser that is running, when it started and which budget
+        # runs out first
+        self.parser_name: str | None = None
+        self.parser_start = 0.0
+        self.scope = "entry"
+        self.interrupt = False
+        self.previous_handler: Any = None
+
+    def __enter__(self) -> EntryTimer:
+        global active_timer
+
+        self.start = time.perf_counter()
+        self.interrupt = (
+            can_interrupt()
+            and active_timer is None
+            and signal.getitimer(signal.ITIMER_REAL)[0] == 0
+        )
+
+        if self.interrupt:
+            if signal.getsignal(signal.SIGALRM) is not on_alarm:
+                self.previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+            active_timer = self
+
+        return self
+
+    def __exit__(self, *exc_info):
+        global active_timer
+
+        if not self.interrupt:
+            return
+
+        self.parser_name = None
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        active_timer = None
+
+        if self.previous_handler is not None:
+            signal.signal(signal.SIGALRM, self.previous_handler)
+            self.previous_handler = None
+
+    def run(self, parser_name: str, run: Callable[[], Any]) -> Any:
+        """
+        Call "run" (of the parser "parser_name") within the budgets.
+        """
+        now = time.perf_counter()
+        deadline = math.inf
+        self.scope = "entry"
+
+        if self.entry_seconds is not None:
+            deadline = self.start + self.entry_seconds
+        if (
+            self.parser_seconds is not None
+            and now + self.parser_seconds < deadline
+        ):
+            deadline = now + self.parser_seconds
+            self.scope = "parser"
+
+        self.parser_name = parser_name
+        self.parser_start = now
+
+        if now >= deadline:
+            raise self.exceeded()
+
+        if self.interrupt:
+            signal.setitimer(signal.ITIMER_REAL, deadline - now)
+
+        try:
+            result = run()
+        finally:
+            if time.perf_counter() < deadline:
+                self.parser_name = None
+
+        # Not interrupted (or interrupted too late)
+        if self.parser_name is not None:
+            raise self.exceeded()
+
+        return result
+
+    def exceeded(self) -> TimeBudgetExceeded:
+        now = time.perf_counter()
+
+        if self.scope == "parser":
+            seconds = now - self.parser_start
+            budget = self.parser_seconds
+        else:
+            seconds = now - self.start
+            budget = self.entry_seconds
+
+        return TimeBudgetExceeded(
+            self.page_name,
+            self.entry_index,
+            self.parser_name,
+            self.scope,
+            seconds,
+            budget,
+        )
@@ -0,0 +1,366 @@
+"""
+Compact format of parse results for sending them from worker processes to
+the parent (see "WiktionaryParser.parse_pages").
+
+Pickling a ParsedWiktionaryPageEntry pickles every nested model with its
+class, fields set and extras. Instead, a result is encoded as a tuple of
+its fields (in the order of FIELDS, followed by the extra fields of
+third-party parsers) with nested models as tuples, too. Strings that repeat
+across entries (languages, parts of speech, tags, table headers and rhymes)
+are interned: every worker numbers them and sends new strings with the
+results of a task, so the parent receives every string once per worker.
+"""
+
+import uuid
+from collections.abc import Iterator
+from typing import Any
+
+from wiktionary_de_parser.models import (
+    NOT_COMPUTED,
+    Language,
+    Lemma,
+    ParsedWiktionaryPageEntry,
+    ReferenceType,
+    construct_trusted,
+)
+
+FIELDS = (
+    "name",
+    "hyphenation",
+    "flexion",
+    "ipa",
+    "language",
+    "lemma",
+    "pos",
+    "rhymes",
+    "meanings",
+)
+REFERENCE_TYPES = tuple(ReferenceType)
+REFERENCE_TYPE_INDEX = {
+    reference_type: index
+    for index, reference_type in enumerate(REFERENCE_TYPES)
+}
+
+# Results of a task: (id of the encoder, index of the first new string, new
+# strings, records)
+EncodedResults = tuple[str, int, list[str], list[tuple]]
+
+
+class ResultEncoder:
+    """
+    Encodes the results of one worker. The numbers of interned strings are
+    only valid together with the strings sent before.
+    """
+
+    def __init__(self):
+        # Identifies the string table of the encoder in the decoder. Process
+        # and thread ids can be reused by a new worker (e.g. after a crash).
+        self.encoder_id = uuid.uuid4().hex
+        self.string_ids: dict[str, int] = {}
+        self.new_strings: list[str] = []
+        # Encoders of the values of FIELDS, except for None and NOT_COMPUTED.
+        # All of them return tuples.
+        self.encoders = (
+            str,
+            tuple,
+            self.encode_flexion,
+            tuple,
+            self.encode_language,
+            self.encode_lemma,
+            self.encode_pos,
+            self.intern_all,
+            self.encode_meanings,
+        )
+
+    def intern(self, string: str | None) -> int | None:
+        if string is None:
+            return None
+
+        string_id = self.string_ids.get(string)
+
+        if string_id is None:
+            string_id = self.string_ids[string] = len(self.string_ids)
+            self.new_strings.append(string)
+
+        return string_id
+
+    def intern_all(self, strings: list[str]) -> tuple:
+        return tuple(map(self.intern, strings))
+
+    def encode_flexion(self, flexion: dict) -> tuple:
+        return tuple(
+            item
+            for key, form in flexion.items()
+            for item in (self.intern(key), form)
+        )
+
+    def encode_language(self, language: Language) -> tuple:
+        return self.intern(language.lang), self.intern(language.lang_code)
+
+    def encode_lemma(self, lemma: Lemma) -> tuple:
+        return lemma.lemma, REFERENCE_TYPE_INDEX[lemma.reference_type]
+
+    def encode_pos(self, pos: dict[str, list[str]]) -> tuple:
+        return tuple(
+            item
+            for name, subtypes in pos.items()
+            for item in (self.intern(name), self.intern_all(subtypes))
+        )
+
+    def encode_meanings(self, meanings: list[dict]) -> tuple:
+        return tuple(
+            (
+                meaning.get("text"),
+                self.intern_all(meaning["tags"]) if "tags" in meaning else None,
+                self.intern_all(meaning["raw_tags"])
+                if "raw_tags" in meaning
+                else None,
+                self.encode_meanings(meaning["sublist"])
+                if "sublist" in meaning
+                else None,
+            )
+            for meaning in meanings
+        )
+
+    def encode(self, result: ParsedWiktionaryPageEntry) -> tuple:
+        values = result.__dict__
+        record = tuple(
+            value if value is None or value is NOT_COMPUTED else encode(value)
+            for encode, value in zip(
+                self.encoders, map(values.__getitem__, FIELDS), strict=True
+            )
+        )
+
+        # Results of third-party parsers are pickled as they are
+        if result.__pydantic_extra__:
+            return (*record, result.__pydantic_extra__)
+
+        return record
+
+    def encode_all(
+        self, results: list[ParsedWiktionaryPageEntry]
+    ) -> EncodedResults:
+        try:
+            records = [self.encode(result) for result in results]
+        except BaseException:
+            # The new strings are never sent, so they must not be used later
+            for string in self.new_strings:
+                del self.string_ids[string]
+            self.new_strings = []
+            raise
+
+        start = len(self.string_ids) - len(self.new_strings)
+        new_strings = self.new_strings
+        self.new_strings = []
+
+        return self.encoder_id, start, new_strings, records
+
+
+def decode_strings(strings: list[str], string_ids: tuple) -> list[str]:
+    return [strings[string_id] for string_id in string_ids]
+
+
+def decode_flexion(strings: list[str], flexion: tuple) -> dict:
+    return {
+        strings[flexion[index]]: flexion[index + 1]
+        for index in range(0, len(flexion), 2)
+    }
+
+
+def decode_language(strings: list[str], language: tuple) -> Language:
+    lang, lang_code = language
+
+    return Language(
+        lang=None if lang is None else strings[lang],
+        lang_code=None if lang_code is None else strings[lang_code],
+    )
+
+
+def decode_lemma(strings: list[str], lemma: tuple) -> Lemma:
+    return Lemma(lemma=lemma[0], reference_type=REFERENCE_TYPES[lemma[1]])
+
+
+def decode_pos(strings: list[str], pos: tuple) -> dict[str, list[str]]:
+    return {
+        strings[pos[index]]: decode_strings(strings, pos[index + 1])
+        for index in range(0, len(pos), 2)
+    }
+
+
+def decode_meanings(strings: list[str], meanings: tuple) -> list[dict]:
+    results = []
+
+    for text, tags, raw_tags, sublist in meanings:
+        meaning = {}
+        if text is not None:
+            meaning["text"] = text
+        if tags is not None:
+            meaning["tags"] = decode_strings(strings, tags)
+        if raw_tags is not None:
+            meaning["raw_tags"] = decode_strings(strings, raw_tags)
+        if sublist is not None:
+            meaning["sublist"] = decode_meanings(strings, sublist)
+        results.append(meaning)
+
+    return results
+
+
+def decode_list(strings: list[str], values: tuple) -> list:
+    return list(values)
+
+
+# Decoders of the encoded values of FIELDS (the name is not a tuple and is
+# never decoded)
+DECODERS = (
+    None,
+    decode_list,
+    decode_flexion,
+    decode_list,
+    decode_language,
+    decode_lemma,
+    decode_pos,
+    decode_strings,
+    decode_meanings,
+)
+
+
+FIELD_INDEX = {name: index for index, name in enumerate(FIELDS)}
+
+
+def decode_field(strings: list[str], record: tuple, index: int):
+    value = record[index]
+
+    # Encoded values are tuples, None and NOT_COMPUTED are not encoded
+    if type(value) is tuple:
+        return DECODERS[index](strings, value)
+
+    return value
+
+
+def decode_record(
+    strings: list[str], record: tuple
+) -> ParsedWiktionaryPageEntry:
+    values = {
+        name: decode(strings, value) if type(value) is tuple else value
+        # Extra fields after FIELDS are ignored by zip
+        for name, decode, value in zip(FIELDS, DECODERS, record, strict=False)
+    }
+
+    if len(record) > len(FIELDS):
+        values.update(record[len(FIELDS)])
+
+    return construct_trusted(ParsedWiktionaryPageEntry, values)
+
+
+class EncodedResult:
+    """
+    A result in the compact format, see "decode" of
+    "WiktionaryParser.parse_pages". Fields are decoded when they are
+    accessed (every time, use "to_model" to decode all fields once):
+
+        result.name  # Not encoded
+        result.language  # Language(lang="Deutsch", lang_code="de")
+        result.to_model()  # ParsedWiktionaryPageEntry
+    """
+
+    __slots__ = ("strings", "record")
+
+    def __init__(self, strings: list[str], record: tuple):
+        # The string table of the worker (only appended to)
+        self.strings = strings
+        self.record = record
+
+    @property
+    def name(self) -> str:
+        return self.record[0]
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names that aren't attributes. Slots may be unset
+        # (e.g. while unpickling), so special names are never looked up.
+        index = FIELD_INDEX.get(name)
+
+        if index is not None:
+            return decode_field(self.strings, self.record, index)
+
+        if (
+            not name.startswith("__")
+            and len(self.record) > len(FIELDS)
+            and name in self.record[-1]
+        ):
+            return self.record[-1][name]
+
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def __repr__(self):
+        return f"{type(self).__name__}(name={self.name!r})"
+
+    def to_model(self) -> ParsedWiktionaryPageEntry:
+        return decode_record(self.strings, self.record)
+
+
+class ResultDecoder:
+    """
+    Decodes the results of all workers, with one string table per encoder
+    (see "ResultEncoder.encoder_id").
+    """
+
+    def __init__(self):
+        self.strings: dict[str, list[str]] = {}
+
+    def add_strings(self, encoder_id: str, start: int, new_strings: list[str]):
+        strings = self.strings.setdefault(encoder_id, [])
+
+        if start != len(strings):
+            raise ValueError(
+                f"Strings of encoder {encoder_id} start at {start}, expected "
+                f"{len(strings)}."
+            )
+
+        strings.extend(new_strings)
+
+    def add_results(self, results: EncodedResults):
+        """
+        Add the new strings of "results" (without decoding the records).
+        The strings of every encoder must be added in the order in which
+        they were sent.
+        """
+        encoder_id, start, new_strings, _ = results
+        self.add_strings(encoder_id, start, new_strings)
+
+    def decode(
+        self, encoder_id: str, record: tuple
+    ) -> ParsedWiktionaryPageEntry:
+        return decode_record(self.strings[encoder_id], record)
+
+    def decode_all(
+        self, results: EncodedResults
+    ) -> Iterator[ParsedWiktionaryPageEntry]:
+        """
+        Add the new strings of "results" and return an iterator over the
+        decoded results, so every result is decoded when it is consumed.
+        """
+        encoder_id, start, new_strings, records = results
+        self.add_strings(encoder_id, start, new_strings)
+
+        return (self.decode(encoder_id, record) for record in records)
+
+    def wrap_all(self, results: EncodedResults) -> list[EncodedResult]:
+        """
+        Like "decode_all", but return the results as EncodedResult, which
+        decode their fields when they are accessed.
+        """
+        self.add_results(results)
+
+        return self.wrap(results)
+
+    def wrap(self, results: EncodedResults) -> list[EncodedResult]:
+        """
+        Wrap the records of results whose strings were already added (see
+        "add_results").
+        """
+        encoder_id, _, _, records = results
+        strings = self.strings[encoder_id]
+
+        return [EncodedResult(strings, record) for record in records]